@@ -0,0 +1,50 @@
+import hashlib
+import threading
+import structlog
+from collections import OrderedDict
+from agents.cloud_foundry_agent import CfAgent
+from agents.ira_agent import IraAgent
+from backend.model_router import RoutedChatModel
+from core.config import settings
+
+log = structlog.get_logger()
+
+AGENT_CLASSES = {"CF": CfAgent, "IRA": IraAgent}
+
+# Process-wide: (agent type, model config) -> agent, shared by all sessions.
+_agents = OrderedDict()
+_lock = threading.Lock()
+
+
+def _model_config_key(llm) -> tuple:
+    if isinstance(llm, RoutedChatModel):
+        keys = "|".join(
+            secret.get_secret_value() if secret else ""
+            for secret in (llm.openai_api_key, llm.groq_api_key)
+        )
+        # Sessions overriding API keys get their own agent; only a digest is kept.
+        return (llm.model_name, llm.temperature, hashlib.sha256(keys.encode()).hexdigest()[:16])
+    return ("instance", id(llm))
+
+
+def get_shared_agent(agent_type: str, llm):
+    """
+    Returns the shared agent for (agent type, model config), building it on first use.
+
+    Prompt, tools and executor are built once and reused across sessions and context
+    switches; the least recently used agents are evicted past AGENT_FACTORY_MAX_ENTRIES.
+    """
+    key = (agent_type,) + _model_config_key(llm)
+    with _lock:
+        agent = _agents.get(key)
+        if agent is not None:
+            _agents.move_to_end(key)
+            return agent
+
+        log.info("Building shared agent.", agent_type=agent_type, model=key[1])
+        agent = AGENT_CLASSES[agent_type](llm)
+        _agents[key] = agent
+        while len(_agents) > settings.AGENT_FACTORY_MAX_ENTRIES:
+            evicted_key, _ = _agents.popitem(last=False)
+            log.info("Evicted shared agent.", agent_type=evicted_key[0], model=evicted_key[1])
+        return agent
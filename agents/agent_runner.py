@@ -0,0 +1,161 @@
+import contextvars
+import itertools
+import threading
+import time
+import structlog
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, List, Optional
+from langchain_core.callbacks import BaseCallbackHandler
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from agents.agent_streaming import AgentEvent
+from backend.run_context import RunCancelled, use_cancel_event
+from core.config import settings
+
+log = structlog.get_logger()
+
+_run_ids = itertools.count(1)
+
+
+class CancellationCallbackHandler(BaseCallbackHandler):
+    """
+    Aborts an agent run at its next LLM call, streamed token or tool call once cancelled.
+
+    Calls already in flight are not interrupted; mutating tools re-check is_cancelled()
+    right before sending their request.
+    """
+
+    raise_error = True
+
+    def __init__(self, cancel_event: threading.Event):
+        self.cancel_event = cancel_event
+
+    def _check(self):
+        if self.cancel_event.is_set():
+            raise RunCancelled()
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        self._check()
+
+    def on_llm_start(self, serialized, prompts, **kwargs):
+        self._check()
+
+    def on_llm_new_token(self, token, **kwargs):
+        self._check()
+
+    def on_tool_start(self, serialized, input_str, **kwargs):
+        self._check()
+
+
+class AgentRun:
+    """
+    Handle for one agent turn running off the script thread.
+
+    Events are buffered so the UI can poll and re-render them on every rerun; the
+    output is the final answer, or whatever the latest LLM call streamed before the
+    user cancelled, including the results of tool calls that had already run.
+    """
+
+    def __init__(self):
+        self.run_id = next(_run_ids)
+        self.cancel_event = threading.Event()
+        self.events: List[AgentEvent] = []
+        self.final: Optional[str] = None
+        self.started_at = time.time()
+        self.future = None
+        self._lock = threading.Lock()
+
+    def add_event(self, event: AgentEvent):
+        with self._lock:
+            self.events.append(event)
+            if event.kind == "final":
+                self.final = event.content
+
+    def snapshot(self) -> List[AgentEvent]:
+        with self._lock:
+            return list(self.events)
+
+    def cancel(self):
+        if not self.cancel_event.is_set():
+            log.info("Agent run cancellation requested.", run_id=self.run_id)
+            self.cancel_event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    @property
+    def done(self) -> bool:
+        return self.future is not None and self.future.done()
+
+    def streamed_text(self) -> str:
+        """Tokens streamed by the run's latest LLM call; earlier calls' text (e.g. before a tool call) is dropped."""
+        text = []
+        for event in self.snapshot():
+            if event.kind == "llm_start":
+                text = []
+            elif event.kind == "token":
+                text.append(event.content)
+        return "".join(text)
+
+    def output(self) -> str:
+        """The final answer; the latest streamed text only when the run was cancelled or produced none."""
+        if self.final:
+            return self.final
+        text = self.streamed_text()
+        if not self.cancelled:
+            return text
+        # Tool calls that completed before the run stopped (e.g. a restart already sent) are kept.
+        steps = "\n".join(
+            f"- **{event.tool}** returned: {event.content[:300]}" for event in self.snapshot() if event.kind == "tool_end"
+        )
+        note = "⏹️ Cancelled by user."
+        if steps:
+            note += f" Completed before cancelling:\n{steps}"
+        elif not text.strip():
+            note += " No response was produced."
+        return f"{text}\n\n{note}" if text.strip() else note
+
+
+class AgentRunner:
+    """Runs agent turns on a bounded, process-wide pool so the Streamlit script thread never blocks."""
+
+    def __init__(self, max_workers: int):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agent-run")
+
+    def submit(self, run_events: Callable[[AgentRun], Iterator[AgentEvent]]) -> AgentRun:
+        """
+        Starts `run_events(run)` on the pool and returns its handle immediately.
+
+        The worker keeps the submitting session's script context, so session state
+        stays reachable from agent code, and the run's cancel event is visible to
+        backend calls via backend.run_context.is_cancelled().
+        """
+        run = AgentRun()
+        script_ctx = get_script_run_ctx()
+
+        def _job():
+            if script_ctx is not None:
+                add_script_run_ctx(threading.current_thread(), script_ctx)
+            started = time.perf_counter()
+            try:
+                with use_cancel_event(run.cancel_event):
+                    for event in run_events(run):
+                        run.add_event(event)
+            except RunCancelled:
+                pass
+            except Exception as e:
+                log.error("Unexpected error during agent run", run_id=run.run_id, error=str(e), exc_info=True)
+                run.add_event(AgentEvent(kind="final", content=f"⚠️ Unexpected error occurred: {str(e).lower()}."))
+            log.info(
+                "Agent run finished.",
+                run_id=run.run_id,
+                cancelled=run.cancelled,
+                seconds=round(time.perf_counter() - started, 3),
+            )
+
+        run.future = self._pool.submit(contextvars.copy_context().run, _job)
+        log.info("Agent run submitted.", run_id=run.run_id)
+        return run
+
+
+agent_runner = AgentRunner(max_workers=settings.AGENT_RUNNER_POOL_SIZE)
@@ -0,0 +1,83 @@
+import contextvars
+import queue
+import threading
+import structlog
+from dataclasses import dataclass
+from typing import Callable, Iterator, Optional
+from langchain_core.callbacks import BaseCallbackHandler
+from streamlit.runtime.scriptrunner import add_script_run_ctx
+from backend.run_context import RunCancelled
+
+log = structlog.get_logger()
+
+
+@dataclass
+class AgentEvent:
+    """A single incremental event from an agent run."""
+
+    kind: str  # "llm_start" | "tool_start" | "tool_end" | "token" | "final" | "cancelled"
+    content: str = ""
+    tool: Optional[str] = None
+
+
+class AgentEventCallbackHandler(BaseCallbackHandler):
+    """Translates LangChain callbacks into AgentEvents passed to `emit`."""
+
+    def __init__(self, emit: Callable[[AgentEvent], None]):
+        self.emit = emit
+        self._tool_names = {}
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        tool_name = (serialized or {}).get("name") or kwargs.get("name", "tool")
+        self._tool_names[run_id] = tool_name
+        self.emit(AgentEvent(kind="tool_start", content=str(input_str), tool=tool_name))
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        tool_name = self._tool_names.pop(run_id, "tool")
+        self.emit(AgentEvent(kind="tool_end", content=str(getattr(output, "content", output)), tool=tool_name))
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        tool_name = self._tool_names.pop(run_id, "tool")
+        self.emit(AgentEvent(kind="tool_end", content=f"Error: {error}", tool=tool_name))
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        self.emit(AgentEvent(kind="llm_start"))
+
+    def on_llm_start(self, serialized, prompts, **kwargs):
+        self.emit(AgentEvent(kind="llm_start"))
+
+    def on_llm_new_token(self, token, **kwargs):
+        if token:
+            self.emit(AgentEvent(kind="token", content=token))
+
+
+def stream_agent_events(run: Callable[[list], str]) -> Iterator[AgentEvent]:
+    """
+    Runs `run(callbacks)` on a worker thread and yields its events as they arrive.
+
+    `run` receives the callback handlers to pass to the AgentExecutor and returns the
+    final output; the stream ends with a "final" event, or "cancelled" if the user
+    cancelled the run.
+    """
+    events = queue.Queue()
+    handler = AgentEventCallbackHandler(events.put)
+
+    def _worker():
+        try:
+            events.put(AgentEvent(kind="final", content=run([handler])))
+        except RunCancelled:
+            events.put(AgentEvent(kind="cancelled"))
+        except Exception as e:
+            log.error("Unexpected error during streamed agent run", error=str(e), exc_info=True)
+            events.put(AgentEvent(kind="final", content=f"⚠️ Unexpected error occurred: {str(e).lower()}."))
+        finally:
+            events.put(None)
+
+    thread = threading.Thread(
+        target=contextvars.copy_context().run, args=(_worker,), name="agent-stream", daemon=True
+    )
+    add_script_run_ctx(thread)  # Keep Streamlit calls on the worker bound to this session.
+    thread.start()
+
+    while (event := events.get()) is not None:
+        yield event
@@ -0,0 +1,178 @@
+import re
+import json
+import time
+import structlog
+import streamlit as st
+from dataclasses import dataclass, asdict
+from typing import Optional
+from agents.tools.cloud_foundry_tools import CloudFoundryTools
+from agents.tools.tool_cache import invalidating_tool
+from backend.knowledge_base import get_cloud_foundry_app_info
+
+log = structlog.get_logger()
+
+# Command heads, matching the templates advertised by PromptSuggester.
+_HEAD_PATTERNS = [
+    re.compile(r"^(?P<action>restart|start|stop)\s+(?:the\s+)?(?:application|app)\s+(?P<application>[\w.#-]+)", re.I),
+    re.compile(r"^check\s+(?:the\s+)?health\s+(?:for|of)\s+(?:the\s+)?(?:application|app)\s+(?P<application>[\w.#-]+)", re.I),
+    re.compile(r"^check\s+(?:the\s+)?(?:application|app)\s+health\s+(?:for|of)\s+(?P<application>[\w.#-]+)", re.I),
+]
+_SITE_CLAUSE = re.compile(r"^\s*(?:at|on|in)\s+(?:the\s+)?(?:cf|cloud\s+foundry)?\s*site\s+(?P<site>[\w.-]+)", re.I)
+_GROUP_CLAUSE = re.compile(r"^\s*for\s+(?:the\s+)?group\s+(?P<group>[\w.-]+)", re.I)
+
+# Only a bare yes/no answers a pending confirmation; "ok, but use po-r3" goes to the agent.
+_AFFIRMATIVE = re.compile(r"^\s*(yes|y|yeah|yep|confirm(ed)?|proceed|go ahead|ok(ay)?|sure|do it)\s*[.!]*$", re.I)
+_NEGATIVE = re.compile(r"^\s*(no|n|nope|cancel|stop|abort|don't|do not)\s*[.!]*$", re.I)
+
+CONFIRMATION_REQUIRED = {"restart", "start", "stop"}
+PENDING_COMMAND_KEY = "cf_pending_command"
+PENDING_COMMAND_TTL_SECONDS = 300
+
+
+@dataclass
+class CfCommand:
+    """A fully specified Cloud Foundry command parsed from a user message."""
+
+    action: str  # "restart" | "start" | "stop" | "health"
+    application: str
+    cloud_foundry_site: str
+    group_name: str
+    cf_organization: Optional[str] = None
+    cf_space: Optional[str] = None
+
+
+def parse_cf_command(user_input: str) -> Optional[CfCommand]:
+    """
+    Parses a fully specified start/stop/restart/health command.
+
+    Returns None unless the whole message is exactly one command with an application,
+    a CF site and a group; anything else is left to the agent.
+    """
+    text = " ".join(user_input.split()).rstrip(".!")
+    for pattern in _HEAD_PATTERNS:
+        head = pattern.match(text)
+        if head:
+            break
+    else:
+        return None
+
+    remainder = text[head.end():]
+    site = group = None
+    while remainder.strip():
+        site_match = _SITE_CLAUSE.match(remainder) if site is None else None
+        group_match = _GROUP_CLAUSE.match(remainder) if group is None else None
+        clause = site_match or group_match
+        if clause is None:
+            return None  # Unrecognised words: not a plain template command.
+        site = site_match.group("site") if site_match else site
+        group = group_match.group("group") if group_match else group
+        remainder = remainder[clause.end():]
+
+    if not site or not group:
+        return None
+    action = head.groupdict().get("action")
+    return CfCommand(
+        action=action.lower() if action else "health",
+        application=head.group("application"),
+        cloud_foundry_site=site,
+        group_name=group,
+    )
+
+
+# Mutating actions go through the same cache-invalidating wrappers as the agent's tools.
+_TOOLS = {
+    "restart": invalidating_tool("restart_application", CloudFoundryTools.restart_application),
+    "start": invalidating_tool("start_application", CloudFoundryTools.start_application),
+    "stop": invalidating_tool("stop_application", CloudFoundryTools.stop_application),
+    "health": CloudFoundryTools.check_application_health,
+}
+
+
+class CfFastPath:
+    """
+    Handles fully specified CF commands without LLM planning.
+
+    Parsed commands are validated against the user's entitlements with a single
+    app-info lookup, then go straight to confirmation (for mutating actions) and the
+    CloudFoundryTools call. Anything ambiguous returns None so the agent handles it.
+    """
+
+    def handle(self, user_input: str) -> Optional[str]:
+        started = time.perf_counter()
+        pending = st.session_state.pop(PENDING_COMMAND_KEY, None)
+        command = parse_cf_command(user_input)
+        if command is None:
+            # Not a new command: either a bare yes/no to the pending one, or the agent's turn.
+            reply = self._handle_pending(pending, user_input)
+            if reply is None:
+                return None
+        else:
+            # A new command supersedes whatever was awaiting confirmation.
+            command = self._resolve(command)
+            if command is None:
+                return None
+            reply = self._confirm_or_execute(command)
+
+        log.info("CF fast path handled message.", elapsed_ms=round((time.perf_counter() - started) * 1000, 1))
+        return reply
+
+    def _handle_pending(self, pending: Optional[dict], user_input: str) -> Optional[str]:
+        if not pending or time.time() - pending["created_at"] > PENDING_COMMAND_TTL_SECONDS:
+            return None
+        command = CfCommand(**pending["command"])
+        if _AFFIRMATIVE.match(user_input.strip()):
+            return self._execute(command)
+        if _NEGATIVE.match(user_input.strip()):
+            log.info("CF fast path command cancelled by user.", **asdict(command))
+            return f"Okay, I will not {command.action} {command.application}."
+        return None  # Something else entirely: let the agent take over.
+
+    def _resolve(self, command: CfCommand) -> Optional[CfCommand]:
+        """Fills org/space from the user's entitlements; None if not an exact, unique match."""
+        try:
+            entries = json.loads(get_cloud_foundry_app_info(command.application))
+        except (TypeError, ValueError):
+            log.warning("CF fast path could not read application info.", application=command.application)
+            return None
+
+        matches = [
+            detail
+            for entry in entries
+            if entry["APPLICATION"].lower() == command.application.lower()
+            and entry["GROUP_NAME"].lower() == command.group_name.lower()
+            for detail in entry["DETAILS"]
+            if detail["CF_SITE"].lower() == command.cloud_foundry_site.lower()
+        ]
+        if len(matches) != 1:
+            log.info("CF fast path fell back to agent.", reason="no unique entitlement match", matches=len(matches), **asdict(command))
+            return None
+
+        command.cf_organization = matches[0]["CF_ORGANIZATION"]
+        command.cf_space = matches[0]["CF_SPACE"]
+        return command
+
+    def _confirm_or_execute(self, command: CfCommand) -> str:
+        if command.action not in CONFIRMATION_REQUIRED:
+            return self._execute(command)
+        st.session_state[PENDING_COMMAND_KEY] = {"command": asdict(command), "created_at": time.time()}
+        return (
+            f"Please confirm: **{command.action}** application `{command.application}` at CF site "
+            f"`{command.cloud_foundry_site}` (org `{command.cf_organization}`, space `{command.cf_space}`) "
+            f"for the group `{command.group_name}`. Are you sure? (yes/no)"
+        )
+
+    def _execute(self, command: CfCommand) -> str:
+        tool = _TOOLS[command.action]
+        log.info("CF fast path executing command.", **asdict(command))
+        response = tool(
+            application=command.application,
+            group_name=command.group_name,
+            cloud_foundry_site=command.cloud_foundry_site,
+            cf_organization=command.cf_organization,
+            cf_space=command.cf_space,
+        )
+        if isinstance(response, dict) and response.get("status") == "error":
+            return f"⚠️ The {command.action} request for `{command.application}` failed: {response.get('message')}"
+        if isinstance(response, (dict, list)):
+            response = f"```json\n{json.dumps(response, indent=2)}\n```"
+        return f"Result of **{command.action}** for `{command.application}` at `{command.cloud_foundry_site}`:\n\n{response}"
@@ -1,19 +1,28 @@
 import streamlit as st
 import structlog
-from typing import Type # Keep Type if used by other parts of your actual code
-from langchain.agents import AgentExecutor, create_openai_tools_agent
+from typing import Iterator, Type # Keep Type if used by other parts of your actual code
+from langchain.agents import create_openai_tools_agent
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain.tools import StructuredTool
 from langchain.tools.render import render_text_description
 from agents.tools.cloud_foundry_tools import ( # Assuming this import path is correct
     CloudFoundryTools,
     GetAppInfoInput,
+    SearchEntitlementsInput,
     RestartAppInput,
     StartAppInput,
     StopAppInput,
     CheckHealthAppInput
 )
 import os # For path manipulation
+from agents.history_manager import ChatHistoryManager
+from agents.parallel_executor import ParallelAgentExecutor
+from agents.agent_streaming import AgentEvent, stream_agent_events
+from agents.cf_fast_path import CfFastPath
+from agents.tools.tool_cache import memoized_tool, invalidating_tool, prefetchable_tool, get_tool_cache
+from agents.tool_prefetch import CfToolPrefetcher
+from backend.run_context import RunCancelled, RunContext, use_run_context
+from backend.llm_scheduler import LLMSchedulerBusy, is_rate_limit_error
 
 log = structlog.get_logger()
 
@@ -31,15 +40,20 @@ def load_prompt_from_file(file_path: str) -> str:
         log.error(f"Error loading prompt from {file_path}: {e}")
         raise
 
+HISTORY_KEY = "chat_history_cf"
+
 class CfAgent:
-    def __init__(self):
+    def __init__(self, llm):
         """
         Initializes the Cloud Foundry Agent using create_openai_tools_agent
         and StructuredTool for robust handling of tool arguments.
         The system prompt is loaded from a fixed path relative to this file.
+
+        Instances are built once per model config by agents.agent_factory and shared
+        across sessions, so per-session state (chat history, user id) is passed to
+        interact()/stream() at call time.
         """
         log.info("Instantiating Cloud Foundry Agent using StructuredTool.")
-        print("\nInstantiating Cloud Foundry Agent (using StructuredTool)\n")
 
         try:
             current_file_dir = os.path.dirname(os.path.abspath(__file__))
@@ -52,15 +66,26 @@ class CfAgent:
 
 
         # 1. Define Tools using StructuredTool.from_function
+        #    (read-only lookups are memoized per conversation; mutating tools invalidate them)
         self.tools = [
             StructuredTool.from_function(
-                func=CloudFoundryTools.get_application_information,
+                func=memoized_tool("get_application_information", CloudFoundryTools.get_application_information),
                 name="get_application_information",
                 description="Tool used to retrieve the required information for Cloud Foundry tasks, such as cf_organization and cf_space, for a given application.",
                 args_schema=GetAppInfoInput,
             ),
             StructuredTool.from_function(
-                func=CloudFoundryTools.restart_application,
+                func=CloudFoundryTools.search_entitlements,
+                name="search_entitlements",
+                description=(
+                    "Searches the groups, Cloud Foundry sites and applications the user can access. "
+                    "Use it when a group, site or application is not listed in the Context Information "
+                    "before concluding the user has no access to it."
+                ),
+                args_schema=SearchEntitlementsInput,
+            ),
+            StructuredTool.from_function(
+                func=invalidating_tool("restart_application", CloudFoundryTools.restart_application),
                 name="restart_application",
                 description=(
                     "This tool is used to restart an application in Cloud Foundry. "
@@ -74,7 +99,7 @@ class CfAgent:
             ),
             # ... (other tools remain the same) ...
             StructuredTool.from_function(
-                func=CloudFoundryTools.start_application,
+                func=invalidating_tool("start_application", CloudFoundryTools.start_application),
                 name="start_application",
                 description=(
                     "This tool is used to start an application in Cloud Foundry. "
@@ -87,7 +112,7 @@ class CfAgent:
                 args_schema=StartAppInput,
             ),
             StructuredTool.from_function(
-                func=CloudFoundryTools.stop_application,
+                func=invalidating_tool("stop_application", CloudFoundryTools.stop_application),
                 name="stop_application",
                 description=(
                     "This tool is used to stop an application in Cloud Foundry. "
@@ -100,7 +125,7 @@ class CfAgent:
                 args_schema=StopAppInput,
             ),
             StructuredTool.from_function(
-                func=CloudFoundryTools.check_application_health,
+                func=prefetchable_tool("check_application_health", CloudFoundryTools.check_application_health),
                 name="check_application_health",
                 description=(
                     "Use this tool when the user asks about the health of an application. "
@@ -128,25 +153,32 @@ class CfAgent:
         log.info("Prompt template loaded successfully.", prompt_file_path=prompt_file_path)
 
         # 3. Create the Agent
-        if "llm" not in st.session_state:
-            log.error("LLM not found in st.session_state. Please initialize it before CfAgent.")
-            raise ValueError("LLM not initialized in st.session_state. Ensure st.session_state.llm is set.")
+        if llm is None:
+            log.error("LLM not provided. Please initialize it before CfAgent.")
+            raise ValueError("LLM not initialized. Ensure st.session_state.llm is set.")
 
+        self.llm = llm
         self.agent = create_openai_tools_agent(
-            st.session_state.llm, self.tools, self.prompt
+            llm, self.tools, self.prompt
         )
 
-        # 4. Create the Agent Executor
-        self.agent_executor = AgentExecutor(
+        # 4. Create the Agent Executor (independent tool calls in a step run in parallel)
+        self.agent_executor = ParallelAgentExecutor(
             agent=self.agent,
             tools=self.tools,
             verbose=True,
             handle_parsing_errors=True,
             max_iterations=5,
         )
+
+        # 5. Rule-based fast path for fully specified commands (no LLM planning)
+        self.fast_path = CfFastPath()
+
+        # 6. Speculative lookups for apps named in the message, overlapped with the first LLM call
+        self.prefetcher = CfToolPrefetcher()
         log.info(f"Cloud Foundry Agent initialized successfully using internal prompt: {prompt_file_path}")
 
-    def interact(self, user_input: str, context: str) -> str:
+    def interact(self, user_input: str, context: str, chat_history: list = None, user_id: str = None, callbacks: list = None) -> str:
         """
         Handles interaction with the agent using AgentExecutor.invoke.
         """
@@ -158,23 +190,79 @@ class CfAgent:
                 "Error: Agent is not properly initialized. Please check configuration."
             )
 
-        chat_history = st.session_state.get("chat_history_cf", [])
-        log.debug(f"Using chat history from session state: {chat_history}")
+        run_context = self._new_run_context(user_id)
+        with use_run_context(run_context):
+            fast_reply = self.fast_path.handle(user_input)
+        if fast_reply is not None:
+            return fast_reply
+        with use_run_context(run_context):
+            run_context.prefetch = self.prefetcher.start(user_input)
+
+        return self._run(self._build_inputs(user_input, context, chat_history, callbacks), run_context, callbacks)
+
+    def stream(self, user_input: str, context: str, chat_history: list = None, user_id: str = None, callbacks: list = None) -> Iterator[AgentEvent]:
+        """
+        Streams the agent run: tool start/end events and final-answer tokens as they
+        arrive, always ending with a "final" event carrying the complete output.
+        """
+        log.info("Streaming interaction with the CfAgent executor.", user_input=user_input)
 
+        if self.agent_executor is None:
+            log.error("Agent executor not initialized.")
+            yield AgentEvent(kind="final", content="Error: Agent is not properly initialized. Please check configuration.")
+            return
+
+        run_context = self._new_run_context(user_id)
+        with use_run_context(run_context):
+            fast_reply = self.fast_path.handle(user_input)
+        if fast_reply is not None:
+            yield AgentEvent(kind="final", content=fast_reply)
+            return
+        with use_run_context(run_context):
+            run_context.prefetch = self.prefetcher.start(user_input)
+
+        # Build inputs on the calling (script) thread, which owns the session state.
+        inputs = self._build_inputs(user_input, context, chat_history, callbacks)
+        yield from stream_agent_events(lambda handlers: self._run(inputs, run_context, handlers + (callbacks or [])))
+
+    @staticmethod
+    def _new_run_context(user_id: str = None) -> RunContext:
+        return RunContext(
+            user_id=user_id or st.session_state.user_id,
+            history_key=HISTORY_KEY,
+            tool_cache=get_tool_cache(),
+        )
+
+    def _build_inputs(self, user_input: str, context: str, chat_history: list = None, callbacks: list = None) -> dict:
+        if chat_history is None:
+            chat_history = st.session_state.get(HISTORY_KEY, [])
+        chat_history = ChatHistoryManager(
+            HISTORY_KEY, model_name=getattr(self.llm, "model_name", None), llm=self.llm
+        ).prepare(chat_history, user_input=user_input, callbacks=callbacks)
+        log.debug(f"Using windowed chat history: {chat_history}")
+        return {
+            "input": user_input,
+            "context_json": context,
+            "rendered_tools": self.rendered_tools,
+            "chat_history": chat_history,
+        }
+
+    def _run(self, inputs: dict, run_context: RunContext, callbacks: list = None) -> str:
         try:
-            response = self.agent_executor.invoke(
-                {
-                    "input": user_input,
-                    "context_json": context,
-                    "rendered_tools": self.rendered_tools,
-                    "chat_history": chat_history,
-                }
-            )
+            with use_run_context(run_context):
+                response = self.agent_executor.invoke(inputs, config={"callbacks": callbacks})
             output = response.get("output", "Sorry, I didn't get a valid response.")
             log.info("AgentExecutor response generated.", response=output)
             return output
 
+        except RunCancelled:
+            log.info("CfAgent run cancelled by user.")
+            raise
+
         except Exception as e:
+            if isinstance(e, LLMSchedulerBusy) or is_rate_limit_error(e):
+                log.warning("LLM capacity exhausted during interaction", error=str(e))
+                return "⏳ The language models are busy right now (rate limit reached). Please try again in a moment."
             error_message = str(e).lower()
             if (
                 "invalid api key" in error_message
@@ -190,3 +278,7 @@ class CfAgent:
                     exc_info=True,
                 )
                 return f"⚠️ Unexpected error occurred: {error_message}. Please check the logs or try again later."
+
+        finally:
+            if run_context.prefetch is not None:
+                run_context.prefetch.discard()
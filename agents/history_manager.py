@@ -0,0 +1,237 @@
+import contextvars
+import threading
+import streamlit as st
+import structlog
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Optional
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from backend.utilities import count_tokens, count_message_tokens
+from backend.model_router import for_task
+from backend.run_context import RunCancelled
+from backend.usage_tracker import UsageCallbackHandler, record_turn
+from core.config import settings
+
+log = structlog.get_logger()
+
+# Summary updates run off the request path so no turn waits on them before planning.
+_summary_pool = ThreadPoolExecutor(max_workers=settings.HISTORY_SUMMARY_POOL_SIZE, thread_name_prefix="history-summary")
+
+SUMMARY_PROMPT = ChatPromptTemplate.from_template(
+    """
+    You maintain a running summary of a conversation between a user and an operations assistant.
+    Update the existing summary with the new messages below. Keep application names, groups,
+    Cloud Foundry sites, incident ids, decisions taken and open questions. Drop greetings and raw tool output.
+    Respond with the updated summary only, in at most {max_words} words.
+
+    ### Existing Summary:
+    {summary}
+
+    ### New Messages:
+    {new_messages}
+    """
+)
+
+
+class RollingSummary:
+    """Summary of the first `folded` messages of one chat history, kept in session state."""
+
+    def __init__(self, head: str):
+        self.head = head  # Content of the history's first message, to notice a cleared or replaced history.
+        self.summary = ""
+        self.folded = 0
+        self.job: Optional[Future] = None
+        self.lock = threading.Lock()
+
+
+class ChatHistoryManager:
+    """
+    Keeps the chat history sent to an agent within a per-model token budget.
+
+    The last few turns are passed verbatim, older turns are folded into a running
+    summary that is updated incrementally (only newly aged-out messages are sent to
+    the LLM), and tool outputs that were already acted on are dropped or truncated.
+
+    Folding runs in the background, a batch of turns at a time, and never holds up a
+    turn; until a batch is folded its turns are sent compacted alongside the previous
+    summary.
+    """
+
+    def __init__(self, history_key: str, model_name: str = None, llm=None):
+        self.history_key = history_key
+        self.model_name = model_name or st.session_state.get("selected_llm_name", "")
+        self.llm = for_task(llm, "summary")
+        self.token_budget = settings.HISTORY_TOKEN_BUDGETS.get(
+            self.model_name, settings.HISTORY_TOKEN_BUDGET_DEFAULT
+        )
+        self.summary_state_key = f"{history_key}_summary"
+        self._state: Optional[RollingSummary] = None
+
+    def prepare(self, chat_history: list, user_input: str = None, callbacks: list = None) -> list:
+        """
+        Returns the windowed history (summary message + recent turns) for the next agent call.
+
+        `callbacks` are the run's handlers; the summary call keeps its cancellation but reports
+        usage as its own turn, since it may finish after the run does.
+        """
+        messages = list(chat_history)
+        # The current input is appended to the session history before the agent runs; it is
+        # already passed as `input`, so don't send it twice.
+        if user_input and messages and isinstance(messages[-1], HumanMessage) and messages[-1].content == user_input:
+            messages = messages[:-1]
+
+        original_tokens = count_message_tokens(messages)
+        turns = self._split_turns(messages)
+        verbatim_turns = min(settings.HISTORY_VERBATIM_TURNS, len(turns))
+
+        # Shrink the verbatim window until the recent turns alone fit in the budget (keep at least one).
+        while verbatim_turns > 1 and count_message_tokens(self._compact(turns[-verbatim_turns:])) > self.token_budget:
+            verbatim_turns -= 1
+
+        older_end = sum(len(turn) for turn in turns[: len(turns) - verbatim_turns])
+        state = self._summary_state(messages)
+        with state.lock:
+            if self.llm is None:
+                state.folded = max(state.folded, older_end)  # Nothing to summarize with: drop aged-out turns.
+            summary, folded = state.summary, state.folded
+
+        # Messages are tracked by their index in the history, so a verbatim window that shrinks
+        # and grows back only re-sends already summarized turns; it never resets the summary.
+        unfolded = self._split_turns(messages[folded:older_end]) if older_end > folded else []
+        if len(unfolded) >= settings.HISTORY_SUMMARY_BATCH_TURNS:
+            self._fold_in_background(state, messages[folded:older_end], folded, older_end, callbacks)
+        recent_turns = unfolded + turns[len(turns) - verbatim_turns:]
+        recent = self._compact(recent_turns) if recent_turns else []
+
+        windowed = ([SystemMessage(content=f"Summary of the earlier conversation: {summary}")] if summary else []) + recent
+
+        windowed_tokens = count_message_tokens(windowed)
+        log.info(
+            "Chat history windowed.",
+            history_key=self.history_key,
+            model=self.model_name,
+            token_budget=self.token_budget,
+            original_tokens=original_tokens,
+            windowed_tokens=windowed_tokens,
+            saved_tokens=original_tokens - windowed_tokens,
+            verbatim_messages=len(recent),
+            folded_messages=folded,
+        )
+        return windowed
+
+    def wait(self):
+        """Waits for this history's background summary job (agents never do; tests and scripts may)."""
+        job = self._state.job if self._state is not None else None
+        if job is not None:
+            wait([job], timeout=settings.HISTORY_SUMMARY_WAIT_SECONDS)
+
+    @staticmethod
+    def _split_turns(messages: list) -> list:
+        """Groups messages into turns, each starting with a human message."""
+        turns = []
+        for message in messages:
+            if isinstance(message, HumanMessage) or not turns:
+                turns.append([message])
+            else:
+                turns[-1].append(message)
+        return turns
+
+    def _compact(self, turns: list) -> list:
+        """Flattens turns, dropping intermediate tool traffic and truncating long messages outside the latest turn."""
+        compacted = []
+        for index, turn in enumerate(turns):
+            is_latest = index == len(turns) - 1
+            for message in turn:
+                if isinstance(message, ToolMessage) or (isinstance(message, AIMessage) and message.tool_calls):
+                    if not is_latest:
+                        continue  # The tool result has already been acted on in the final AI reply.
+                if not is_latest:
+                    message = self._truncate(message)
+                compacted.append(message)
+        return compacted
+
+    @staticmethod
+    def _truncate(message):
+        content = str(message.content)
+        max_tokens = settings.HISTORY_MESSAGE_MAX_TOKENS
+        total_tokens = count_tokens(content)
+        if total_tokens <= max_tokens:
+            return message
+        # Character cut proportional to the token ratio keeps this cheap for large tool dumps.
+        keep_chars = int(len(content) * max_tokens / total_tokens)
+        truncated = f"{content[:keep_chars]} …[truncated {total_tokens - max_tokens} tokens]"
+        return message.model_copy(update={"content": truncated})
+
+    def _summary_state(self, messages: list) -> RollingSummary:
+        head = str(messages[0].content) if messages else ""
+        state = st.session_state.get(self.summary_state_key)
+        if not isinstance(state, RollingSummary) or state.head != head or state.folded > len(messages):
+            state = RollingSummary(head)  # History was reset or replaced.
+            st.session_state[self.summary_state_key] = state
+        self._state = state
+        return state
+
+    def _fold_in_background(self, state: RollingSummary, messages: list, start: int, end: int, callbacks: list = None):
+        """Folds messages[start:end] of the history into the summary on the summary pool (one job at a time)."""
+        script_ctx = get_script_run_ctx(suppress_warning=True)
+        # The run's usage handler is recorded when the run ends; this call may outlive it.
+        callbacks = [callback for callback in callbacks or [] if not isinstance(callback, UsageCallbackHandler)]
+        usage = UsageCallbackHandler(
+            component="summary",
+            context=st.session_state.get("ui_context", "DIRECT"),
+            model=getattr(self.llm, "model_name", "unknown"),
+        )
+
+        def _run():
+            if script_ctx is not None:
+                add_script_run_ctx(threading.current_thread(), script_ctx)
+            try:
+                self._fold(state, messages, start, end, [usage] + callbacks)
+            finally:
+                if usage.turn.llm_calls:
+                    record_turn(usage.turn)
+
+        with state.lock:
+            if state.job is not None and not state.job.done():
+                return  # The next turn picks up whatever this job leaves unfolded.
+            state.job = _summary_pool.submit(contextvars.copy_context().run, _run)
+
+    def _fold(self, state: RollingSummary, messages: list, start: int, end: int, callbacks: list = None):
+        new_messages = [
+            m for m in messages
+            if not isinstance(m, ToolMessage) and not (isinstance(m, AIMessage) and m.tool_calls)
+        ]
+        with state.lock:
+            summary = state.summary
+        if new_messages:
+            transcript = "\n".join(
+                f"{'User' if isinstance(m, HumanMessage) else 'Assistant'}: {self._truncate(m).content}"
+                for m in new_messages
+            )
+            try:
+                chain = SUMMARY_PROMPT | self.llm | StrOutputParser()
+                summary = chain.invoke({
+                    "summary": summary or "(none)",
+                    "new_messages": transcript,
+                    "max_words": settings.HISTORY_SUMMARY_MAX_WORDS,
+                }, config={"callbacks": callbacks}).strip()
+            except RunCancelled:
+                log.info("Chat history summarization cancelled.", history_key=self.history_key)
+                return
+            except Exception as e:
+                # Keep the previous summary; the unfolded messages are retried on a later turn.
+                log.warning("Chat history summarization failed", history_key=self.history_key, error=str(e))
+                return
+
+        with state.lock:
+            if state.folded != start:
+                return  # The history was reset while this job ran.
+            state.summary, state.folded = summary, end
+        log.info(
+            "Chat history summary updated.",
+            history_key=self.history_key,
+            folded_messages=len(new_messages),
+            summary_tokens=count_tokens(summary),
+        )
@@ -1,6 +1,7 @@
 import streamlit as st
 import structlog
-from langchain.agents import AgentExecutor, create_openai_tools_agent
+from typing import Iterator
+from langchain.agents import create_openai_tools_agent
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain.tools import StructuredTool
 from langchain.tools.render import render_text_description
@@ -8,39 +9,82 @@ from agents.tools.ira_tools import (
     IRATools,
     GetPlatformInfoInput,
     GetIncidentHistoryInput,
+    FindSimilarIncidentsInput,
+    GetResolutionStatsInput,
     GetInvestigationHistoryInput
 )
+from agents.history_manager import ChatHistoryManager
+from agents.parallel_executor import ParallelAgentExecutor
+from agents.tools.tool_cache import memoized_tool, get_tool_cache
+from backend.ira_ingestion import ingestion_revision
+from backend.run_context import RunCancelled, RunContext, use_run_context
+from backend.llm_scheduler import LLMSchedulerBusy, is_rate_limit_error
+from agents.agent_streaming import AgentEvent, stream_agent_events
 
 
 log = structlog.get_logger()
 
+HISTORY_KEY = "chat_history_ira"
+
 class IraAgent:
-    def __init__(self):
+    def __init__(self, llm):
         """
         Initializes the IRA Agent using create_openai_tools_agent
         and StructuredTool.
+
+        Shared across sessions via agents.agent_factory; chat history and user id are
+        passed to interact()/stream() at call time.
         """
         log.info("Instantiating IRA Agent using StructuredTool.")
-        print("\nInstantiating IRA Agent (using StructuredTool)\n")
 
-        # 1. Define Tools using StructuredTool.from_function
+        # 1. Define Tools using StructuredTool.from_function (read-only, memoized per conversation;
+        #    history lookups are keyed on the ingestion revision so new records are seen at once)
         self.tools = [
             StructuredTool.from_function(
-                func=IRATools.get_platform_information,
+                func=memoized_tool("get_platform_information", IRATools.get_platform_information),
                 name="get_platform_information",
-                description="Retrieves information about a specific IRA platform.",
+                description=(
+                    "Retrieves information about a specific IRA platform, by name, alias or service name. "
+                    "Pass a topic to get only the relevant sections of the platform's documentation."
+                ),
                 args_schema=GetPlatformInfoInput
             ),
             StructuredTool.from_function(
-                func=IRATools.get_incident_history,
+                func=memoized_tool("get_incident_history", IRATools.get_incident_history, revision=ingestion_revision),
                 name="get_incident_history",
-                description="Retrieves historical incident data from IRA.",
+                description=(
+                    "Searches historical incident data from IRA and returns the best matching incidents with their solutions. "
+                    "Pass a free-text query and/or filters (pattern_id, error_code, device_model, success)."
+                ),
                 args_schema=GetIncidentHistoryInput # Even if no args, schema helps consistency
             ),
             StructuredTool.from_function(
-                func=IRATools.get_investigation_history,
+                func=memoized_tool("find_similar_incidents", IRATools.find_similar_incidents, revision=ingestion_revision),
+                name="find_similar_incidents",
+                description=(
+                    "Finds the past incidents most similar to a new one (\"have we seen this before?\") and returns them "
+                    "with their solutions and success rates. Pass whatever is known: error_code, error_message, "
+                    "device_model, device_type, pattern_id and a free-text description of the symptoms."
+                ),
+                args_schema=FindSimilarIncidentsInput
+            ),
+            StructuredTool.from_function(
+                func=memoized_tool("get_resolution_stats", IRATools.get_resolution_stats, revision=ingestion_revision),
+                name="get_resolution_stats",
+                description=(
+                    "Computes aggregate statistics over the incident history: incident counts, success rates, "
+                    "resolution-time mean and percentiles and average steps, optionally filtered and grouped "
+                    "(by pattern, solution, error code, device or over time)."
+                ),
+                args_schema=GetResolutionStatsInput
+            ),
+            StructuredTool.from_function(
+                func=memoized_tool("get_investigation_history", IRATools.get_investigation_history, revision=ingestion_revision),
                 name="get_investigation_history",
-                description="Retrieves historical investigation data from IRA.",
+                description=(
+                    "Retrieves compact briefs (root cause, confidence, key evidence, remediation, status) of the past IRA "
+                    "investigations most relevant to a query. Pass investigation_id to get one investigation's full record."
+                ),
                 args_schema=GetInvestigationHistoryInput # Even if no args, schema helps consistency
             ),
         ]
@@ -58,9 +102,11 @@ class IraAgent:
 
         Follow these instructions carefully:
         - Use the provided `Context Information` if relevant.
-        - Use the `get_platform_information` tool when asked for details about a specific platform.
-        - Use the `get_incident_history` tool when asked about past incidents.
-        - Use the `get_investigation_history` tool when asked about past investigations.
+        - Use the `get_platform_information` tool when asked for details about a specific platform; pass what the user wants to know as `topic`.
+        - Use the `get_incident_history` tool when asked about past incidents; pass the user's symptoms as `query` and any known error code, device model or pattern id as filters.
+        - Use the `find_similar_incidents` tool when the user describes a new incident and wants to know whether it has happened before or what fixed it.
+        - Use the `get_resolution_stats` tool for aggregate questions (success rates, resolution times, percentiles, trends) instead of reading raw incidents.
+        - Use the `get_investigation_history` tool when asked about past investigations; pass what the user wants to know as `query`. Answer from the briefs; request an `investigation_id` in full only when the user needs details the brief does not cover (timeline, queries executed, lessons learned).
         - If the user asks a general question or a request that doesn't require a specific tool, respond directly based on the conversation history and context.
         - Use the chat history to understand the conversation flow.
         """
@@ -72,16 +118,15 @@ class IraAgent:
         ])
 
         # 3. Create the Agent
-        if "llm" not in st.session_state:
-            log.error("LLM not found in session state during IraAgent initialization.")
-            st.error("Error: LLM not configured. Please select an LLM in the sidebar.")
+        self.llm = llm
+        if llm is None:
+            log.error("LLM not provided during IraAgent initialization.")
             self.agent_executor = None
             return
-        llm = st.session_state.llm
         self.agent = create_openai_tools_agent(llm, self.tools, self.prompt)
 
-        # 4. Create the Agent Executor
-        self.agent_executor = AgentExecutor(
+        # 4. Create the Agent Executor (independent tool calls in a step run in parallel)
+        self.agent_executor = ParallelAgentExecutor(
             agent=self.agent,
             tools=self.tools,
             verbose=True,
@@ -91,7 +136,7 @@ class IraAgent:
         log.info("IRA Agent initialized successfully using StructuredTool.")
 
 
-    def interact(self, user_input: str, context: str) -> str:
+    def interact(self, user_input: str, context: str, chat_history: list = None, user_id: str = None, callbacks: list = None) -> str:
         """
         Handles interaction with the IRA agent using AgentExecutor.invoke.
         Assumes chat history in session state is already correctly formatted.
@@ -102,23 +147,63 @@ class IraAgent:
              log.error("Agent executor not initialized.")
              return "Error: Agent is not properly initialized. Please check configuration."
 
-        chat_history = st.session_state.get("chat_history_ira", [])
-        log.debug(f"Using chat history from session state: {chat_history}")
+        return self._run(self._build_inputs(user_input, context, chat_history, callbacks), self._new_run_context(user_id), callbacks)
+
+    def stream(self, user_input: str, context: str, chat_history: list = None, user_id: str = None, callbacks: list = None) -> Iterator[AgentEvent]:
+        """
+        Streams the IRA agent run: tool start/end events and final-answer tokens,
+        ending with a "final" event carrying the complete output.
+        """
+        log.info("Streaming interaction with the IraAgent executor.", user_input=user_input)
 
+        if self.agent_executor is None:
+             log.error("Agent executor not initialized.")
+             yield AgentEvent(kind="final", content="Error: Agent is not properly initialized. Please check configuration.")
+             return
+
+        # Build inputs on the calling (script) thread, which owns the session state.
+        inputs = self._build_inputs(user_input, context, chat_history, callbacks)
+        run_context = self._new_run_context(user_id)
+        yield from stream_agent_events(lambda handlers: self._run(inputs, run_context, handlers + (callbacks or [])))
+
+    @staticmethod
+    def _new_run_context(user_id: str = None) -> RunContext:
+        return RunContext(
+            user_id=user_id or st.session_state.get("user_id"),
+            history_key=HISTORY_KEY,
+            tool_cache=get_tool_cache(),
+        )
+
+    def _build_inputs(self, user_input: str, context: str, chat_history: list = None, callbacks: list = None) -> dict:
+        if chat_history is None:
+            chat_history = st.session_state.get(HISTORY_KEY, [])
+        chat_history = ChatHistoryManager(
+            HISTORY_KEY, model_name=getattr(self.llm, "model_name", None), llm=self.llm
+        ).prepare(chat_history, user_input=user_input, callbacks=callbacks)
+        log.debug(f"Using windowed chat history: {chat_history}")
+        return {
+            "input": user_input,
+            "context_json": context,
+            "chat_history": chat_history, # Pass history directly
+        }
+
+    def _run(self, inputs: dict, run_context: RunContext, callbacks: list = None) -> str:
         try:
             # Invoke the agent executor
-            response = self.agent_executor.invoke(
-                {
-                    "input": user_input,
-                    "context_json": context,
-                    "chat_history": chat_history, # Pass history directly
-                }
-            )
+            with use_run_context(run_context):
+                response = self.agent_executor.invoke(inputs, config={"callbacks": callbacks})
             output = response.get("output", "Sorry, I didn't get a valid response.")
             log.info("AgentExecutor response generated.", response=output)
             return output
 
+        except RunCancelled:
+            log.info("IraAgent run cancelled by user.")
+            raise
+
         except Exception as e:
+            if isinstance(e, LLMSchedulerBusy) or is_rate_limit_error(e):
+                log.warning("LLM capacity exhausted during interaction", error=str(e))
+                return "⏳ The language models are busy right now (rate limit reached). Please try again in a moment."
             # Error handling (similar to CfAgent)
             error_message = str(e).lower()
             if "invalid api key" in error_message or "authentication" in error_message or "unauthorized" in error_message:
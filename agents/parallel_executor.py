@@ -0,0 +1,101 @@
+import contextvars
+import threading
+import structlog
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from langchain.agents import AgentExecutor
+from langchain_core.agents import AgentAction, AgentFinish, AgentStep
+from langchain_core.callbacks import CallbackManagerForChainRun
+from langchain_core.tools import BaseTool
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from core.config import settings
+from backend.run_context import RunCancelled
+
+log = structlog.get_logger()
+
+# Shared, bounded pool for tool calls across all sessions.
+_tool_pool = ThreadPoolExecutor(max_workers=settings.AGENT_TOOL_POOL_SIZE, thread_name_prefix="agent-tool")
+
+
+def submit_in_context(pool: ThreadPoolExecutor, fn, *args) -> Future:
+    """Runs `fn(*args)` on `pool` with the caller's per-run context and Streamlit session."""
+    script_ctx = get_script_run_ctx(suppress_warning=True)
+
+    def _run():
+        # Tools read the session state and per-run context of the calling thread.
+        if script_ctx is not None:
+            add_script_run_ctx(threading.current_thread(), script_ctx)
+        return fn(*args)
+
+    return pool.submit(contextvars.copy_context().run, _run)
+
+
+def submit_tool_call(fn, *args) -> Future:
+    """Runs `fn(*args)` on the shared tool pool with the caller's per-run context and Streamlit session."""
+    return submit_in_context(_tool_pool, fn, *args)
+
+
+class _StepActions:
+    """The tool calls of the agent step being executed, and their futures once started."""
+
+    def __init__(self):
+        self.actions: List[AgentAction] = []
+        self.futures: Optional[List[Future]] = None
+
+
+# Per step (and per thread/context): the executor itself is shared across sessions.
+_step_actions: contextvars.ContextVar[Optional[_StepActions]] = contextvars.ContextVar("step_actions", default=None)
+
+
+class ParallelAgentExecutor(AgentExecutor):
+    """
+    AgentExecutor that runs the independent tool calls returned in one step
+    concurrently on a bounded pool.
+
+    Planning, output-parser error handling and the step loop are upstream's: this only
+    records the step's actions as they are yielded and, when upstream performs the first
+    of several, starts them all at once. Observations keep the order the model requested
+    them in, and a failing call is turned into an error observation for that call only.
+    """
+
+    def _iter_next_step(
+        self,
+        name_to_tool_map: Dict[str, BaseTool],
+        color_mapping: Dict[str, str],
+        inputs: Dict[str, str],
+        intermediate_steps: List[Tuple[AgentAction, str]],
+        run_manager: Optional[CallbackManagerForChainRun] = None,
+    ) -> Iterator[Union[AgentFinish, AgentAction, AgentStep]]:
+        step = _StepActions()
+        token = _step_actions.set(step)
+        try:
+            # Upstream yields every action of the step before performing the first one.
+            for output in super()._iter_next_step(name_to_tool_map, color_mapping, inputs, intermediate_steps, run_manager):
+                if isinstance(output, AgentAction):
+                    step.actions.append(output)
+                yield output
+        finally:
+            _step_actions.reset(token)
+
+    def _perform_agent_action(self, name_to_tool_map, color_mapping, agent_action, run_manager=None) -> AgentStep:
+        step = _step_actions.get()
+        position = next((i for i, action in enumerate(step.actions) if action is agent_action), None) if step else None
+        if position is None or len(step.actions) == 1:
+            return self._perform_isolated(name_to_tool_map, color_mapping, agent_action, run_manager)
+
+        if step.futures is None:
+            log.info("Running tool calls in parallel.", tools=[action.tool for action in step.actions])
+            step.futures = [
+                submit_tool_call(self._perform_isolated, name_to_tool_map, color_mapping, action, run_manager)
+                for action in step.actions
+            ]
+        return step.futures[position].result()
+
+    def _perform_isolated(self, name_to_tool_map, color_mapping, agent_action, run_manager) -> AgentStep:
+        try:
+            return super()._perform_agent_action(name_to_tool_map, color_mapping, agent_action, run_manager)
+        except RunCancelled:
+            raise
+        except Exception as e:
+            log.error("Tool call failed.", tool=agent_action.tool, error=str(e), exc_info=True)
+            return AgentStep(action=agent_action, observation=f"Error: tool '{agent_action.tool}' failed: {e}")
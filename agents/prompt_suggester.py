@@ -1,37 +1,25 @@
 import structlog
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
 from langchain_core.messages import HumanMessage
 import streamlit as st
+from backend.model_router import for_task
+from backend.usage_tracker import UsageCallbackHandler, record_turn
+from backend.run_context import RunCancelled
 
 log = structlog.get_logger()
 
-class PromptSuggester:
-    def __init__(self, llm):
-        self.llm = llm
-
-    def generate(self, n=5):
-        ui_context = st.session_state.get("ui_context", "DIRECT")
-
-        context_to_history_key = {
-            "CF": "chat_history_cf",
-            "IRA": "chat_history_ira",
-            "DIRECT": "chat_history_direct",
-        }
-
-        history_key = context_to_history_key.get(ui_context, "chat_history_direct")
-        history = st.session_state.get(history_key, [])
+CONTEXT_HISTORY_KEYS = {
+    "CF": "chat_history_cf",
+    "IRA": "chat_history_ira",
+    "DIRECT": "chat_history_direct",
+}
 
-        history_snippets = []
-        for message in history[-3:]:
-            role = "User" if isinstance(message, HumanMessage) else "Assistant"
-            history_snippets.append(f"{role}: {message.content}")
 
-        chat_summary = "\n".join(history_snippets)
-
-        # Include tool documentation per ui_context
-        if ui_context == "CF":
-            tools_section = """
+# Tool documentation per ui_context
+TOOLS_SECTIONS = {
+    "CF": """
             - `get_application_information`: Retrieve info about a Cloud Foundry app. Requires `"application"`.
                 e.g., "get info for app <app_name>"
             - `restart_application`: Restart a CF app. Requires `"application"`, `"group_name"`, `"cloud_foundry_site"`. Ask for confirmation first.
@@ -42,53 +30,128 @@ class PromptSuggester:
                 e.g., "stop application <app_name> at cf site <cf_site> for the group <group_name>"
             - `check_application_health`: Check health of a CF app. Requires `"application"`, `"group_name"`, `"cloud_foundry_site"`.
                 e.g., "check health for application <app_name> at cf site <cf_site> for the group <group_name>"
-            """
-            
-        elif ui_context == "IRA":
-            tools_section = """
-            - `GetPlatformInformationFromIRA`: Fetch platform information.
-            - `get_ira_incident_history`: Retrieve historical incident reports.
-            - `get_ira_investigation_history`: Show prior investigations conducted in IRA.
-            """
-        else:
-            tools_section = "None — this is a direct LLM chat without tool access."
+            """,
+    "IRA": """
+            - `get_platform_information`: Platform documentation by name, alias or service name, optionally for one topic.
+                e.g., "how does the MPA lifecycle platform handle logging?"
+            - `get_incident_history`: Search past incidents by free text and/or pattern, error code, device model or outcome.
+                e.g., "show past incidents with error code FAH_RESET_201"
+            - `find_similar_incidents`: Past incidents most similar to a new one, with their solutions and success rates.
+                e.g., "have we seen a gateway stay offline after a reset before?"
+            - `get_resolution_stats`: Success rates and resolution-time percentiles, filtered and grouped (e.g. by pattern or month).
+                e.g., "what is the success rate per solution for Device Offline incidents?"
+            - `get_investigation_history`: Briefs of past investigations (root cause, evidence, remediation).
+                e.g., "show the most recent investigation history"
+            """,
+    "DIRECT": "None — this is a direct LLM chat without tool access.",
+}
+
+
+def history_key_for(ui_context: str) -> str:
+    return CONTEXT_HISTORY_KEYS.get(ui_context, "chat_history_direct")
+
+
+def _chat_summary(history: list) -> str:
+    history_snippets = []
+    for message in history[-3:]:
+        role = "User" if isinstance(message, HumanMessage) else "Assistant"
+        history_snippets.append(f"{role}: {message.content}")
+    return "\n".join(history_snippets)
+
+
+def _drafts_section(drafts: list) -> str:
+    if not drafts:
+        return "None."
+    return (
+        "Improve these draft suggestions built from the user's entitlements. Keep the concrete "
+        "application, site and group names and the command phrasing:\n" + "\n".join(drafts)
+    )
+
+
+class ContextSuggestions(BaseModel):
+    context: str = Field(description="The context these suggestions are for: CF, IRA or DIRECT.")
+    suggestions: List[str] = Field(description="Short one sentence prompts, without bullets or numbering.")
+
+
+class SuggestionBatch(BaseModel):
+    """Suggested next prompts for each requested chat context."""
+
+    contexts: List[ContextSuggestions]
 
-        # Prompt including tool documentation
+
+class PromptSuggester:
+    def __init__(self, llm):
+        # Suggestions are lightweight; route them to the cheaper model policy.
+        self.llm = for_task(llm, "suggestion")
+
+    def generate(self, n=5, callbacks: list = None, ui_context: str = None, history: list = None, drafts: list = None) -> List[str]:
+        """
+        Suggests `n` follow-up prompts for one context through generate_batch. `ui_context`
+        and `history` default to the session's; `drafts` are polished rather than replaced.
+        """
+        if ui_context is None:
+            ui_context = st.session_state.get("ui_context", "DIRECT")
+        if history is None:
+            history = st.session_state.get(history_key_for(ui_context), [])
+        suggestions = self.generate_batch({ui_context: history}, {ui_context: drafts or []}, n=n, callbacks=callbacks)
+        return suggestions[ui_context] or drafts or [
+            "Try asking about what you can do with this chatbot.",
+            "Try asking about the available tools.",
+        ]
+
+    def generate_batch(self, histories: Dict[str, list], drafts: Dict[str, list] = None, n=5, callbacks: list = None) -> Dict[str, Optional[List[str]]]:
+        """
+        Suggests `n` prompts for every context in `histories` with a single structured-output
+        call. Contexts the model leaves out (or all of them, when the call fails) map to None,
+        so callers keep showing their drafts without storing them as refined.
+        """
+        drafts = drafts or {}
+        sections = "\n".join(
+            f"""
+            ## Context {ui_context}
+            ### Available Tools:
+            {TOOLS_SECTIONS.get(ui_context, TOOLS_SECTIONS["DIRECT"])}
+            ### Recent Chat History:
+            {_chat_summary(history) or "None."}
+            ### Draft Suggestions:
+            {_drafts_section(drafts.get(ui_context))}
+            """
+            for ui_context, history in histories.items()
+        )
         prompt = ChatPromptTemplate.from_template(
             """
             ### AI Assistant Instructions:
-            Based on the available tools and the user's most recent conversation, suggest {n} relevant prompts the user can ask next.
-            Only return a list of concise suggestions with no extra commentary.
+            For each chat context below, suggest {n} relevant prompts the user can ask next in that context,
+            based on its available tools and the user's most recent conversation there.
             Prompts should be a question of a command directed to the AI assistant.
-
-            ### Available Tools:
-            {tools_section}
-
-            ### Recent Chat History:
-            {chat_summary}
-
-            ### AI Assistant Output Format:
             - If tools are available, the first suggestion should ask about the available tools.
             - if tools are not available, the first suggestion should ask about what the user can do with this chatbot.
-            - Provide a list of short one sentence suggestions, each on a new line.
-            - Do not use any bullet points or numbering.
+            - Return suggestions for exactly these contexts: {contexts}.
+
+            {sections}
             """
         )
 
-        chain = prompt | self.llm | StrOutputParser()
-
+        chain = prompt | self.llm.with_structured_output(SuggestionBatch)
+        usage = UsageCallbackHandler(
+            component="suggestion", context="+".join(histories), model=getattr(self.llm, "model_name", "unknown")
+        )
+        results: Dict[str, Optional[List[str]]] = {ui_context: None for ui_context in histories}
         try:
-            suggestions = chain.invoke({
-                "n": n,
-                "chat_summary": chat_summary,
-                "tools_section": tools_section
-            })
-            return [
-                s.strip("-•123. ") for s in suggestions.strip().split("\n") if s.strip()
-            ]
+            batch = chain.invoke(
+                {"n": n, "contexts": ", ".join(histories), "sections": sections},
+                config={"callbacks": [usage] + (callbacks or [])},
+            )
+            record_turn(usage.turn)
+        except RunCancelled:
+            raise
         except Exception as e:
-            log.warning("LLM suggestion generation failed", error=str(e))
-            return [
-                "Try asking about what you can do with this chatbot.",
-                "Try asking about the available tools."
-            ]
+            log.warning("Batched LLM suggestion generation failed", error=str(e))
+            return results
+
+        for entry in batch.contexts if batch else []:
+            ui_context = entry.context.strip().upper()
+            suggestions = [s.strip("-•123. ") for s in entry.suggestions if s.strip()]
+            if ui_context in results and suggestions:
+                results[ui_context] = suggestions[:n]
+        return results
@@ -0,0 +1,166 @@
+import hashlib
+import structlog
+import streamlit as st
+from typing import List, Optional
+from langchain_core.messages import HumanMessage
+from agents.cf_fast_path import parse_cf_command
+from agents.prompt_suggester import history_key_for
+from backend.cf_entitlements import CfEntitlements, relevant_entries
+from backend.knowledge_base import get_cf_entitlements
+from core.config import settings
+
+log = structlog.get_logger()
+
+SUGGESTION_CACHE_KEY = "suggestion_cache"
+REFINED_SUGGESTIONS_KEY = "refined_suggestions"
+
+# The same phrasings the CF fast path parses, so a clicked suggestion skips LLM planning.
+CF_TEMPLATES = {
+    "health": "check health for application {app} at cf site {site} for the group {group}",
+    "restart": "restart application {app} at cf site {site} for the group {group}",
+    "start": "start application {app} at cf site {site} for the group {group}",
+    "stop": "stop application {app} at cf site {site} for the group {group}",
+    "info": "get info for app {app}",
+}
+# What users typically do after each action.
+CF_FOLLOW_UPS = {
+    "restart": ["health", "info"],
+    "start": ["health", "info"],
+    "stop": ["start", "info"],
+    "health": ["info", "restart"],
+}
+
+
+def history_fingerprint(history: list) -> str:
+    """Identifies the recent conversation the suggestions were built from."""
+    digest = hashlib.sha1()
+    for message in history[-settings.SUGGESTION_HISTORY_MESSAGES:]:
+        digest.update(f"{type(message).__name__}:{message.content}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _recent_user_messages(history: list) -> List[str]:
+    """User messages in the recent window, newest first."""
+    recent = history[-settings.SUGGESTION_HISTORY_MESSAGES:]
+    return [str(message.content) for message in reversed(recent) if isinstance(message, HumanMessage)]
+
+
+def _cf_suggestions(entitlements: Optional[CfEntitlements], history: list, limit: int) -> List[str]:
+    suggestions = ["What tools are available?"]
+    messages = _recent_user_messages(history)
+
+    # 1. Follow-ups to the most recent command the user ran.
+    for text in messages:
+        command = parse_cf_command(text)
+        if command is not None:
+            for action in CF_FOLLOW_UPS[command.action]:
+                suggestions.append(CF_TEMPLATES[action].format(
+                    app=command.application, site=command.cloud_foundry_site, group=command.group_name))
+            break
+
+    if entitlements is None:
+        return suggestions
+
+    # 2. Applications from the recent conversation, then the rest of the user's entitlements.
+    recent = relevant_entries(entitlements, "\n".join(messages)) if messages else {}
+    ranked = [
+        (group, app)
+        for group, apps in recent.items()
+        for app in (entitlements.group_apps.get(group, []) if apps is None else apps)
+    ]
+    ranked += [(group, app) for group in entitlements.groups for app in entitlements.group_apps.get(group, [])]
+    for group, app in ranked:
+        if len(suggestions) >= limit:
+            break
+        sites = entitlements.group_sites.get(group) or []
+        if sites:
+            suggestions.append(CF_TEMPLATES["health"].format(app=app, site=sites[0], group=group))
+        suggestions.append(CF_TEMPLATES["info"].format(app=app))
+    return suggestions
+
+
+def _ira_suggestions(history: list) -> List[str]:
+    suggestions = ["What tools are available?"]
+    messages = _recent_user_messages(history)
+    if messages:
+        topic = " ".join(messages[0].split())[:80]
+        suggestions += [
+            f"Find past incidents similar to: {topic}",
+            f"Show investigations related to: {topic}",
+        ]
+    return suggestions + [
+        "Show the most recent incident history",
+        "Show the most recent investigation history",
+        "What platforms can you give me information about?",
+    ]
+
+
+def _direct_suggestions(history: list) -> List[str]:
+    suggestions = ["What can I do with this chatbot?"]
+    if history:
+        suggestions += ["Explain your last answer in more detail", "Summarize our conversation so far"]
+    return suggestions + ["What is Cloud Foundry?", "How should I approach investigating a production incident?"]
+
+
+def build_suggestions(ui_context: str, history: list, n: int = 5, entitlements: Optional[CfEntitlements] = None) -> List[str]:
+    """Ranked suggestions from tool templates, the user's entitlements and their recent actions; no LLM call."""
+    if ui_context == "CF":
+        # Over-generate a little: the ranked list repeats apps, duplicates are dropped below.
+        suggestions = _cf_suggestions(entitlements, history, limit=3 * n)
+    elif ui_context == "IRA":
+        suggestions = _ira_suggestions(history)
+    else:
+        suggestions = _direct_suggestions(history)
+    return list(dict.fromkeys(suggestions))[:n]
+
+
+def local_suggestions(ui_context: str = None, history: list = None, n: int = 5) -> List[str]:
+    """
+    Suggestions for the session's current context, cached per (context, history
+    fingerprint) so reruns and context switches reuse them.
+    """
+    if ui_context is None:
+        ui_context = st.session_state.get("ui_context", "DIRECT")
+    if history is None:
+        history = st.session_state.get(history_key_for(ui_context), [])
+
+    cache = st.session_state.setdefault(SUGGESTION_CACHE_KEY, {})
+    key = (ui_context, history_fingerprint(history), n)
+    if key in cache:
+        return cache[key]
+
+    entitlements = None
+    if ui_context == "CF":
+        try:
+            entitlements = get_cf_entitlements()
+        except Exception as e:
+            log.warning("Building suggestions without entitlements.", error=str(e))
+
+    suggestions = build_suggestions(ui_context, history, n, entitlements)
+    if ui_context != "CF" or entitlements is not None:  # Don't pin the degraded list after a lookup failure.
+        if len(cache) >= settings.SUGGESTION_CACHE_MAX_ENTRIES:
+            cache.clear()
+        cache[key] = suggestions
+    return suggestions
+
+
+def store_refined(ui_context: str, fingerprint: str, suggestions: List[str]):
+    """Keeps LLM-refined suggestions for a context until that context's history changes."""
+    st.session_state.setdefault(REFINED_SUGGESTIONS_KEY, {})[ui_context] = (fingerprint, suggestions)
+
+
+def refined_suggestions(ui_context: str, history: list = None) -> Optional[List[str]]:
+    """The context's refined suggestions if they were built from its current history, else None."""
+    if history is None:
+        history = st.session_state.get(history_key_for(ui_context), [])
+    entry = st.session_state.get(REFINED_SUGGESTIONS_KEY, {}).get(ui_context)
+    if entry is None or entry[0] != history_fingerprint(history):
+        return None
+    return entry[1]
+
+
+def session_suggestions(ui_context: str = None) -> List[str]:
+    """What the sidebar shows: refined suggestions while still current, otherwise the local ones."""
+    if ui_context is None:
+        ui_context = st.session_state.get("ui_context", "DIRECT")
+    return refined_suggestions(ui_context) or local_suggestions(ui_context)
@@ -0,0 +1,124 @@
+import contextvars
+import itertools
+import threading
+import time
+import structlog
+import streamlit as st
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from agents.agent_runner import CancellationCallbackHandler
+from agents.prompt_suggester import PromptSuggester, history_key_for
+from agents.suggestion_engine import (
+    history_fingerprint,
+    local_suggestions,
+    refined_suggestions,
+    session_suggestions,
+    store_refined,
+)
+from backend.run_context import RunCancelled, use_cancel_event
+from core.config import settings
+
+log = structlog.get_logger()
+
+SUGGESTION_JOB_KEY = "suggestion_job"
+
+_generations = itertools.count(1)
+_pool = ThreadPoolExecutor(max_workers=settings.SUGGESTION_POOL_SIZE, thread_name_prefix="suggestions")
+
+
+class SuggestionJob:
+    """One background suggestion generation for a session; superseded by the next one."""
+
+    def __init__(self, fingerprints: Dict[str, str]):
+        self.generation = next(_generations)
+        self.fingerprints = fingerprints  # ui_context -> history fingerprint the job was built from
+        self.cancel_event = threading.Event()
+        self.future = None
+
+    def cancel(self):
+        self.cancel_event.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    @property
+    def done(self) -> bool:
+        return self.future is not None and self.future.done()
+
+
+def start_suggestion_refresh(llm) -> Optional[SuggestionJob]:
+    """
+    Has the LLM polish the local suggestions off the script thread, in one batched call
+    for the current context plus every other context whose refined suggestions are stale.
+
+    Histories are snapshotted here (on the script thread); the result is picked up by
+    collect_suggestions() on a later rerun. Any pending job for the session is
+    cancelled first, so only the newest generation is ever shown.
+    """
+    cancel_suggestion_refresh()
+    if llm is None:
+        return None
+
+    current = st.session_state.get("ui_context", "DIRECT")
+    contexts = [current] + [
+        ui_context for ui_context in settings.SUGGESTION_BATCH_CONTEXTS
+        if ui_context != current and refined_suggestions(ui_context) is None
+    ]
+    histories = {ui_context: list(st.session_state.get(history_key_for(ui_context), [])) for ui_context in contexts}
+    drafts = {ui_context: local_suggestions(ui_context, history) for ui_context, history in histories.items()}
+    job = SuggestionJob({ui_context: history_fingerprint(history) for ui_context, history in histories.items()})
+    script_ctx = get_script_run_ctx(suppress_warning=True)
+
+    def _job() -> Optional[Dict[str, List[str]]]:
+        if script_ctx is not None:
+            add_script_run_ctx(threading.current_thread(), script_ctx)
+        started = time.perf_counter()
+        try:
+            with use_cancel_event(job.cancel_event):
+                suggestions = PromptSuggester(llm=llm).generate_batch(
+                    histories, drafts, callbacks=[CancellationCallbackHandler(job.cancel_event)]
+                )
+        except RunCancelled:
+            log.info("Stale suggestion generation cancelled.", generation=job.generation)
+            return None
+        log.info("Suggestions generated in background.", generation=job.generation, contexts=contexts,
+                 seconds=round(time.perf_counter() - started, 3))
+        return suggestions
+
+    job.future = _pool.submit(contextvars.copy_context().run, _job)
+    st.session_state[SUGGESTION_JOB_KEY] = job
+    return job
+
+
+def cancel_suggestion_refresh():
+    job = st.session_state.pop(SUGGESTION_JOB_KEY, None)
+    if job is not None and not job.done:
+        job.cancel()
+
+
+def suggestion_refresh_pending() -> bool:
+    return st.session_state.get(SUGGESTION_JOB_KEY) is not None
+
+
+def collect_suggestions() -> bool:
+    """Stores a finished job's suggestions per context and shows the current one; True when shown."""
+    job = st.session_state.get(SUGGESTION_JOB_KEY)
+    if job is None or not job.done:
+        return False
+    st.session_state.pop(SUGGESTION_JOB_KEY, None)
+    if job.future.cancelled():
+        return False
+    try:
+        suggestions = job.future.result()
+    except Exception as e:
+        log.warning("Background suggestion generation failed", error=str(e))
+        return False
+    if suggestions is None:
+        return False
+    for ui_context, fingerprint in job.fingerprints.items():
+        # Contexts that were not refined (None) are retried by the next refresh instead of being stored.
+        if suggestions.get(ui_context):
+            store_refined(ui_context, fingerprint, suggestions[ui_context])
+    # Histories that moved on since the snapshot make their entries stale; those fall back to local ones.
+    st.session_state.suggested_prompts = session_suggestions()
+    return True
@@ -0,0 +1,155 @@
+import json
+import re
+import threading
+import structlog
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional
+from agents.parallel_executor import submit_in_context
+from agents.tools.cloud_foundry_tools import CloudFoundryTools
+from agents.tools.tool_cache import get_tool_cache, normalize_args
+from backend.cf_entitlements import CfEntitlements
+from backend.knowledge_base import get_cf_entitlements
+from core.config import settings
+
+log = structlog.get_logger()
+
+# Own pool: tool calls on the agent's tool pool block in take() on these jobs, so sharing
+# that pool could leave them waiting on prefetches queued behind themselves.
+_prefetch_pool = ThreadPoolExecutor(max_workers=settings.TOOL_PREFETCH_POOL_SIZE, thread_name_prefix="tool-prefetch")
+
+_HEALTH_WORDS = re.compile(r"\b(health|healthy|status|up|down|running|alive)\b", re.I)
+
+
+def _mentioned(names: List[str], text: str) -> List[str]:
+    """Names that appear in `text` as whole tokens (names may contain '-', '.' or '_')."""
+    return [
+        name for name in names
+        if re.search(rf"(?<![\w.-]){re.escape(name.lower())}(?![\w-])", text)
+    ]
+
+
+class ToolPrefetch:
+    """
+    Per-turn results of read-only lookups started speculatively before the agent asks
+    for them. Tools take() a matching result (waiting for it if still running);
+    whatever the agent never asks for is dropped by discard() at the end of the turn.
+    """
+
+    def __init__(self):
+        self._futures = {}  # (tool name, normalized args) -> Future
+        self._discarded = False
+        self._lock = threading.Lock()
+
+    def expect(self, tool_name: str, kwargs: dict) -> Future:
+        """A future for the result; after discard() it is still returned but never taken."""
+        future = Future()
+        with self._lock:
+            if not self._discarded:
+                self._futures[(tool_name, normalize_args(kwargs))] = future
+        return future
+
+    def take(self, tool_name: str, kwargs: dict) -> Optional[str]:
+        with self._lock:
+            future = self._futures.pop((tool_name, normalize_args(kwargs)), None)
+        if future is None:
+            return None
+        try:
+            return future.result(timeout=settings.TOOL_PREFETCH_WAIT_SECONDS)
+        except Exception as e:  # Includes the wait timing out.
+            log.warning("Prefetched tool result unavailable; calling tool directly.", tool=tool_name, error=str(e))
+            return None
+
+    def discard(self):
+        with self._lock:
+            self._discarded = True
+            unused = [key[0] for key in self._futures]
+            self._futures.clear()
+        if unused:
+            log.info("Discarded unused prefetched tool results.", tools=unused)
+
+
+class CfToolPrefetcher:
+    """
+    Starts the CF agent's usual first lookups from the user message, in parallel with
+    the first LLM call: get_application_information for each entitled application
+    named in the message, then check_application_health when the message asks about
+    health and the application resolves to a single group/site/org/space. App info
+    already in the conversation's tool cache is reused instead of fetched again.
+    """
+
+    def start(self, user_input: str) -> Optional[ToolPrefetch]:
+        if not settings.TOOL_PREFETCH_ENABLED:
+            return None
+        try:
+            entitlements = get_cf_entitlements()
+        except Exception as e:
+            log.warning("Skipping tool prefetch; entitlements unavailable.", error=str(e))
+            return None
+
+        text = user_input.lower()
+        all_apps = sorted({app for apps in entitlements.group_apps.values() for app in apps}, key=len, reverse=True)
+        apps = _mentioned(all_apps, text)[: settings.TOOL_PREFETCH_MAX_APPS]
+        if not apps:
+            return None
+
+        prefetch = ToolPrefetch()
+        wants_health = bool(_HEALTH_WORDS.search(text))
+        cache = get_tool_cache()
+        for app in apps:
+            cached = cache.get("get_application_information", {"application": app})
+            if cached is not None and not wants_health:
+                continue
+            info = None if cached else prefetch.expect("get_application_information", {"application": app})
+            submit_in_context(
+                _prefetch_pool, self._prefetch_app, prefetch, entitlements, app, text, info, cached and cached[0], wants_health
+            )
+        log.info("Prefetching tool results.", applications=apps, health=wants_health)
+        return prefetch
+
+    def _prefetch_app(
+        self, prefetch: ToolPrefetch, entitlements: CfEntitlements, app: str, text: str,
+        info: Optional[Future], cached_info: Optional[str], wants_health: bool,
+    ):
+        result = cached_info
+        if info is not None:
+            try:
+                result = CloudFoundryTools.get_application_information(application=app)
+            except Exception as e:
+                info.set_exception(e)
+                return
+            info.set_result(result)
+
+        if not wants_health or not result.startswith("Context Retrieved: "):
+            return
+        target = self._health_target(app, result[len("Context Retrieved: "):], entitlements, text)
+        if target is None:
+            return
+        health = prefetch.expect("check_application_health", target)
+        try:
+            health.set_result(CloudFoundryTools.check_application_health(**target))
+        except Exception as e:
+            health.set_exception(e)
+
+    @staticmethod
+    def _health_target(app: str, app_info_json: str, entitlements: CfEntitlements, text: str) -> Optional[dict]:
+        """Health-check arguments when the message (or the app's entitlements) pins down one deployment."""
+        try:
+            records = json.loads(app_info_json)
+        except ValueError:
+            return None
+        sites = _mentioned(sorted({s for group_sites in entitlements.group_sites.values() for s in group_sites}), text)
+        groups = _mentioned(entitlements.groups, text)
+        candidates = [
+            {
+                "application": record["APPLICATION"],
+                "group_name": record["GROUP_NAME"],
+                "cloud_foundry_site": detail["CF_SITE"],
+                "cf_organization": detail["CF_ORGANIZATION"],
+                "cf_space": detail["CF_SPACE"],
+            }
+            for record in records
+            if record["APPLICATION"].lower() == app.lower() and (not groups or record["GROUP_NAME"] in groups)
+            for detail in record["DETAILS"]
+            if not sites or detail["CF_SITE"] in sites
+        ]
+        return candidates[0] if len(candidates) == 1 else None
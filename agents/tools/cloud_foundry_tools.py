@@ -4,7 +4,9 @@ from core.config import settings
 from backend.knowledge_base import (
     get_cloud_foundry_app_info,
     is_application_available_to_user,
+    search_cf_entitlements,
 )
+from backend.run_context import current_user_id, is_cancelled
 from backend.chatops_service import (
     cf_restart_application_api,
     cf_start_application_api,
@@ -28,6 +30,15 @@ class GetAppInfoInput(BaseModel):
     application: str = Field(description="The name of the Cloud Foundry application.")
 
 
+class SearchEntitlementsInput(BaseModel):
+    """Input schema for search_entitlements tool."""
+
+    query: str = Field(
+        default="",
+        description="Part of a group, Cloud Foundry site or application name. Empty lists everything.",
+    )
+
+
 class RestartAppInput(BaseModel):
     """Input schema for restart_application tool."""
 
@@ -126,6 +137,12 @@ class CloudFoundryTools:
 
             # Call the backend function
             result = get_cloud_foundry_app_info(application)
+            try:
+                json.loads(result)
+            except (TypeError, ValueError):
+                # The backend reports failures (e.g. "Unexpected Error: ...") as plain text.
+                log.error("Application info lookup failed.", application=application, error=str(result))
+                return f"Error: Could not retrieve application information for '{application}': {result}"
             log.info(
                 "Successfully retrieved application context.",
                 application=application,
@@ -143,6 +160,24 @@ class CloudFoundryTools:
             )
             return f"Error: An unexpected error occurred while processing your request for application '{application}'."
 
+    @staticmethod
+    def search_entitlements(query: str = "") -> str:
+        """
+        Searches the groups, sites and applications the user is entitled to.
+
+        Args:
+            query: Part of a group, site or application name; empty lists everything.
+
+        Returns:
+            A compact `group | cf_sites | applications` table or a not-found message.
+        """
+        log.info("Searching Cloud Foundry entitlements.", query=query)
+        try:
+            return search_cf_entitlements(query or "")
+        except Exception as e:
+            log.error("Error searching entitlements", query=query, error=str(e), exc_info=True)
+            return f"Error: An unexpected error occurred while searching entitlements for '{query}'."
+
     @staticmethod
     def restart_application(
         application: str,
@@ -175,7 +210,7 @@ class CloudFoundryTools:
         try:
             # Check if the application name is provided
             if not is_application_available_to_user(
-                user_id=st.session_state.user_id,
+                user_id=current_user_id(),
                 group_name=group_name,
                 cf_app_name=application,
             ):
@@ -191,6 +226,10 @@ class CloudFoundryTools:
                 group_name=group_name,
             )
 
+            if is_cancelled():
+                log.info("Application restart not sent; run was cancelled.", application=application)
+                return f"Cancelled: the restart of '{application}' was not sent because the user cancelled the request."
+
             # Call the backend restart function with direct arguments
             response = cf_restart_application_api(
                 application,
@@ -250,7 +289,7 @@ class CloudFoundryTools:
         try:
             # Check if the application name is provided
             if not is_application_available_to_user(
-                user_id=st.session_state.user_id,
+                user_id=current_user_id(),
                 group_name=group_name,
                 cf_app_name=application,
             ):
@@ -266,6 +305,10 @@ class CloudFoundryTools:
                 group_name=group_name,
             )
 
+            if is_cancelled():
+                log.info("Application start not sent; run was cancelled.", application=application)
+                return f"Cancelled: the start of '{application}' was not sent because the user cancelled the request."
+
             # Call the backend start function with direct arguments
             response = cf_start_application_api(
                 application,
@@ -325,7 +368,7 @@ class CloudFoundryTools:
         try:
             # Check if the application name is provided
             if not is_application_available_to_user(
-                user_id=st.session_state.user_id,
+                user_id=current_user_id(),
                 group_name=group_name,
                 cf_app_name=application,
             ):
@@ -341,6 +384,10 @@ class CloudFoundryTools:
                 group_name=group_name,
             )
 
+            if is_cancelled():
+                log.info("Application stop not sent; run was cancelled.", application=application)
+                return f"Cancelled: the stop of '{application}' was not sent because the user cancelled the request."
+
             # Call the backend stop function with direct arguments
             response = cf_stop_application_api(
                 application,
@@ -1,7 +1,12 @@
 import json
 import structlog
 from pydantic import BaseModel, Field # Import Pydantic for schemas
-from typing import Optional # For optional arguments if needed
+from typing import List, Optional # For optional arguments if needed
+from backend.incident_index import INCIDENT_HISTORY_FILE, search_incidents
+from backend.incident_metrics import GROUP_BY, resolution_stats
+from backend.incident_similarity import find_similar_incidents
+from backend.investigation_retriever import INVESTIGATION_HISTORY_FILE, search_investigations
+from backend.platform_registry import describe_platform
 
 log = structlog.get_logger()
 
@@ -9,108 +14,203 @@ log = structlog.get_logger()
 
 class GetPlatformInfoInput(BaseModel):
     """Input schema for get_platform_information tool."""
-    platform_name: str = Field(description="The name of the platform to get information for.")
-    # Add other potential arguments if the tool might need them
+    platform_name: str = Field(description="The name of the platform to get information for: its name, an alias such as 'MPA' or one of its service names.")
+    topic: Optional[str] = Field(None, description="What the user wants to know about the platform, e.g. 'logging integration'. Without it, the platform overview is returned.")
 
 class GetIncidentHistoryInput(BaseModel):
     """Input schema for get_incident_history tool."""
-    # This tool currently takes no specific arguments other than context,
-    # but we define a schema for consistency. Add fields if needed.
-    query: Optional[str] = Field(None, description="Optional query to filter history (currently ignored by tool implementation).")
+    query: Optional[str] = Field(None, description="Free-text search over error messages, feedback, steps and device details, e.g. 'device offline after reset'.")
+    pattern_id: Optional[str] = Field(None, description="Only incidents with this pattern id.")
+    error_code: Optional[str] = Field(None, description="Only incidents with this error code, e.g. 'FAH_RESET_201'.")
+    device_model: Optional[str] = Field(None, description="Only incidents on this device model, e.g. 'CGA4332COM'.")
+    success: Optional[bool] = Field(None, description="Only incidents whose resolution succeeded (true) or failed (false).")
+    top_k: Optional[int] = Field(None, description="Maximum number of incidents to return (default 5).")
+
+class FindSimilarIncidentsInput(BaseModel):
+    """Input schema for find_similar_incidents tool."""
+    error_code: Optional[str] = Field(None, description="Error code of the new incident, e.g. 'FAH_RESET_201'.")
+    error_message: Optional[str] = Field(None, description="Error message of the new incident.")
+    device_model: Optional[str] = Field(None, description="Device model, e.g. 'CGA4332COM'.")
+    device_type: Optional[str] = Field(None, description="Device type, e.g. 'Gateway'.")
+    pattern_id: Optional[str] = Field(None, description="Incident pattern id, if known.")
+    description: Optional[str] = Field(None, description="Symptoms and findings in free text, e.g. 'device offline after reset'.")
+    top_k: Optional[int] = Field(None, description="Maximum number of similar incidents to return (default 5).")
+
+class GetResolutionStatsInput(BaseModel):
+    """Input schema for get_resolution_stats tool."""
+    group_by: Optional[str] = Field(None, description=f"Break the statistics down by one of: {', '.join(GROUP_BY)} (day/week/month give a trend over time).")
+    pattern: Optional[str] = Field(None, description="Only incidents of this pattern, by name (e.g. 'Device Offline') or id.")
+    solution: Optional[str] = Field(None, description="Only incidents resolved with this solution, by name or id.")
+    error_code: Optional[str] = Field(None, description="Only incidents with this error code, e.g. 'FAH_RESET_201'.")
+    device_model: Optional[str] = Field(None, description="Only incidents on this device model.")
+    since: Optional[str] = Field(None, description="Only incidents created at or after this ISO date, e.g. '2025-01-01'.")
+    until: Optional[str] = Field(None, description="Only incidents created at or before this ISO date.")
+    percentiles: Optional[List[float]] = Field(None, description="Resolution-time percentiles to report (default 50 and 90).")
 
 class GetInvestigationHistoryInput(BaseModel):
     """Input schema for get_investigation_history tool."""
-    # This tool currently takes no specific arguments other than context,
-    # but we define a schema for consistency. Add fields if needed.
-    query: Optional[str] = Field(None, description="Optional query to filter history (currently ignored by tool implementation).")
+    query: Optional[str] = Field(None, description="What to look for in past investigations, e.g. 'root cause of WebPA device not found'.")
+    top_k: Optional[int] = Field(None, description="Maximum number of investigation briefs to return (default 4).")
+    investigation_id: Optional[str] = Field(None, description="Only when the user needs details beyond the brief: the id of one investigation to return in full.")
 
 
 # --- Tool Class ---
 
 class IRATools:
     @staticmethod
-    def get_platform_information(platform_name: str) -> str:
+    def get_platform_information(platform_name: str, topic: Optional[str] = None) -> str:
         """
         Retrieves IRA platform information based on the platform name.
 
         Args:
-            platform_name: The name of the platform.
+            platform_name: The name, alias or service name of the platform.
+            topic: Optional topic; only the matching sections of the platform's document are returned.
 
         Returns:
             A string containing the platform data or an error message.
         """
-        log.info("Fetching platform information from IRA.", platform_name=platform_name)
+        log.info("Fetching platform information from IRA.", platform_name=platform_name, topic=topic)
         try:
             # Directly use the platform_name argument
             if not platform_name:
                 log.warning("Platform name is missing.")
                 return "Error: Missing 'platform_name' argument."
 
-            # Placeholder: Read static file - replace with actual backend call if needed
-            # This example assumes the file contains general info not specific to platform_name
-            # If it IS specific, you'd use platform_name to filter/fetch data
-            with open("data/mpa_platform_summary.txt", "r") as file:
-                platform_data = file.read()
-                log.info("Successfully read platform data file.")
-                # You might add logic here to filter or process based on platform_name if applicable
-                return f"Platform Information for {platform_name}: {platform_data}"
+            return describe_platform(platform_name, topic)
 
-        except FileNotFoundError:
-             log.error("Platform data file not found.", filename="data/mpa_platform_summary.txt")
+        except FileNotFoundError as e:
+             log.error("Platform data file not found.", filename=e.filename)
              return "Error: Platform data source not found."
         except Exception as e:
             log.error("Error reading IRA platform data.", platform_name=platform_name, error=str(e), exc_info=True)
             return f"Error: Unable to retrieve IRA platform information for '{platform_name}'."
 
     @staticmethod
-    def get_incident_history(query: Optional[str] = None) -> str:
+    def get_incident_history(
+        query: Optional[str] = None,
+        pattern_id: Optional[str] = None,
+        error_code: Optional[str] = None,
+        device_model: Optional[str] = None,
+        success: Optional[bool] = None,
+        top_k: Optional[int] = None,
+    ) -> str:
         """
-        Retrieves IRA incident history.
+        Searches IRA incident history.
 
         Args:
-            query: Optional query string (currently ignored).
+            query: Optional free-text query, ranked with BM25.
+            pattern_id, error_code, device_model, success: Optional exact-match filters.
+            top_k: Maximum number of incidents to return.
 
         Returns:
-            A string containing incident history or an error message.
+            A string with the top matching incidents (and their solutions) or an error message.
         """
-        log.info("Fetching IRA incident history.", query=query)
+        log.info("Searching IRA incident history.", query=query, pattern_id=pattern_id, error_code=error_code,
+                 device_model=device_model, success=success, top_k=top_k)
         try:
-            # Placeholder: Read static file
-            with open("data/ira_incident_history.txt", "r") as file:
-                history_data = file.read()
-                log.info("Successfully read incident history file.")
-                # Add filtering based on 'query' here if implemented
-                return history_data
+            return search_incidents(
+                query or "", top_k=top_k, pattern_id=pattern_id, error_code=error_code,
+                device_model=device_model, success=success,
+            )
         except FileNotFoundError:
-             log.error("Incident history file not found.", filename="data/ira_incident_history.txt")
+             log.error("Incident history file not found.", filename=INCIDENT_HISTORY_FILE)
              return "Error: Incident history data source not found."
         except Exception as e:
-            log.error("Error reading IRA incident history.", error=str(e), exc_info=True)
+            log.error("Error searching IRA incident history.", error=str(e), exc_info=True)
             return "Error: Unable to retrieve incident history from IRA."
 
     @staticmethod
-    def get_investigation_history(query: Optional[str] = None) -> str:
+    def find_similar_incidents(
+        error_code: Optional[str] = None,
+        error_message: Optional[str] = None,
+        device_model: Optional[str] = None,
+        device_type: Optional[str] = None,
+        pattern_id: Optional[str] = None,
+        description: Optional[str] = None,
+        top_k: Optional[int] = None,
+    ) -> str:
+        """
+        Finds the past incidents most similar to a new one.
+
+        Args:
+            error_code, error_message, device_model, device_type, pattern_id: What is known about the new incident.
+            description: Free-text symptoms and findings.
+            top_k: Maximum number of incidents to return.
+
+        Returns:
+            A string with the most similar incidents, their solutions and success rates, or an error message.
+        """
+        log.info("Finding similar IRA incidents.", error_code=error_code, device_model=device_model,
+                 pattern_id=pattern_id, top_k=top_k)
+        try:
+            return find_similar_incidents(
+                error_code=error_code, error_message=error_message, device_model=device_model,
+                device_type=device_type, pattern_id=pattern_id, description=description, top_k=top_k,
+            )
+        except FileNotFoundError:
+             log.error("Incident history file not found.", filename=INCIDENT_HISTORY_FILE)
+             return "Error: Incident history data source not found."
+        except Exception as e:
+            log.error("Error finding similar IRA incidents.", error=str(e), exc_info=True)
+            return "Error: Unable to find similar incidents in IRA."
+
+    @staticmethod
+    def get_resolution_stats(
+        group_by: Optional[str] = None,
+        pattern: Optional[str] = None,
+        solution: Optional[str] = None,
+        error_code: Optional[str] = None,
+        device_model: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        percentiles: Optional[List[float]] = None,
+    ) -> str:
         """
-        Retrieves IRA investigation history.
+        Computes aggregate resolution statistics over the IRA incident history.
 
         Args:
-            query: Optional query string (currently ignored).
+            group_by: Optional category or time period to break the statistics down by.
+            pattern, solution, error_code, device_model, since, until: Optional filters.
+            percentiles: Resolution-time percentiles to report.
 
         Returns:
-            A string containing investigation history or an error message.
+            A string with incident counts, success rates and resolution-time statistics, or an error message.
         """
-        log.info("Fetching IRA investigation history.", query=query)
+        log.info("Computing IRA resolution statistics.", group_by=group_by, pattern=pattern, solution=solution,
+                 error_code=error_code, device_model=device_model, since=since, until=until)
         try:
-            # Placeholder: Read static file
-            with open("data/ira_investigation_history.txt", "r") as file:
-                history_data = file.read()
-                log.info("Successfully read investigation history file.")
-                 # Add filtering based on 'query' here if implemented
-                return history_data
+            return resolution_stats(
+                group_by=group_by, pattern=pattern, solution=solution, error_code=error_code,
+                device_model=device_model, since=since, until=until, percentiles=percentiles,
+            )
         except FileNotFoundError:
-             log.error("Investigation history file not found.", filename="data/ira_investigation_history.txt")
+             log.error("Incident history file not found.", filename=INCIDENT_HISTORY_FILE)
+             return "Error: Incident history data source not found."
+        except Exception as e:
+            log.error("Error computing IRA resolution statistics.", error=str(e), exc_info=True)
+            return "Error: Unable to compute resolution statistics from IRA."
+
+    @staticmethod
+    def get_investigation_history(
+        query: Optional[str] = None, top_k: Optional[int] = None, investigation_id: Optional[str] = None
+    ) -> str:
+        """
+        Retrieves briefs of the IRA investigations most relevant to a query.
+
+        Args:
+            query: Optional query string; without it, briefs of the most recent investigations are returned.
+            top_k: Maximum number of briefs to return.
+            investigation_id: Optional id of one investigation to return in full instead.
+
+        Returns:
+            A string with the matching investigation briefs (or the full record) or an error message.
+        """
+        log.info("Searching IRA investigation history.", query=query, top_k=top_k, investigation_id=investigation_id)
+        try:
+            return search_investigations(query, top_k=top_k, investigation_id=investigation_id)
+        except FileNotFoundError:
+             log.error("Investigation history file not found.", filename=INVESTIGATION_HISTORY_FILE)
              return "Error: Investigation history data source not found."
         except Exception as e:
-            log.error("Error reading IRA investigation history.", error=str(e), exc_info=True)
+            log.error("Error searching IRA investigation history.", error=str(e), exc_info=True)
             return "Error: Unable to retrieve investigation history from IRA."
-
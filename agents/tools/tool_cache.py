@@ -0,0 +1,127 @@
+import functools
+import threading
+import time
+import structlog
+import streamlit as st
+from typing import Callable, Optional, Tuple
+from core.config import settings
+from backend.run_context import get_run_context
+
+log = structlog.get_logger()
+
+TOOL_CACHE_SESSION_KEY = "tool_result_cache"
+
+
+def normalize_args(kwargs: dict) -> tuple:
+    """Cache key for tool arguments: order-insensitive, trimmed and case-insensitive."""
+    return tuple(sorted((name, str(value).strip().lower()) for name, value in kwargs.items() if value is not None))
+
+
+class ToolResultCache:
+    """Conversation-scoped memo of read-only tool results with a TTL."""
+
+    def __init__(self, ttl_seconds: int = None):
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.TOOL_CACHE_TTL_SECONDS
+        self._entries = {}  # (tool name, normalized args) -> (stored_at, result)
+        self._lock = threading.Lock()
+
+    def get(self, tool_name: str, kwargs: dict) -> Optional[Tuple[str, float]]:
+        """Returns (result, age in seconds) for a fresh entry, else None."""
+        key = (tool_name, normalize_args(kwargs))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            age = time.time() - entry[0]
+            if age > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            return entry[1], age
+
+    def put(self, tool_name: str, kwargs: dict, result: str):
+        with self._lock:
+            self._entries[(tool_name, normalize_args(kwargs))] = (time.time(), result)
+
+    def invalidate(self, value: str) -> int:
+        """Drops every entry whose arguments mention `value` (e.g. an application name)."""
+        value = str(value).strip().lower()
+        with self._lock:
+            stale = [key for key in self._entries if any(value in arg for _, arg in key[1])]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+
+def get_tool_cache() -> ToolResultCache:
+    """The current conversation's tool cache: the run's cache, else the session's."""
+    run_context = get_run_context()
+    if run_context is not None and run_context.tool_cache is not None:
+        return run_context.tool_cache
+    if TOOL_CACHE_SESSION_KEY not in st.session_state:
+        st.session_state[TOOL_CACHE_SESSION_KEY] = ToolResultCache()
+    return st.session_state[TOOL_CACHE_SESSION_KEY]
+
+
+def _take_prefetched(tool_name: str, kwargs: dict) -> Optional[str]:
+    """The result of a matching lookup prefetched for the current turn, if any."""
+    run_context = get_run_context()
+    if run_context is None or run_context.prefetch is None:
+        return None
+    result = run_context.prefetch.take(tool_name, kwargs)
+    if result is not None:
+        log.info("Tool result served from prefetch.", tool=tool_name, args=kwargs)
+    return result
+
+
+def memoized_tool(tool_name: str, func: Callable[..., str], revision: Callable[[], object] = None) -> Callable[..., str]:
+    """
+    Wraps a read-only tool so repeated calls with the same arguments are served from the cache.
+
+    `revision()`, when given, is part of the cache key, so results computed before the
+    underlying data changed (e.g. new records were ingested) are not served.
+    """
+
+    @functools.wraps(func)
+    def wrapper(**kwargs):
+        cache = get_tool_cache()
+        key = {**kwargs, "_revision": revision()} if revision is not None else kwargs
+        cached = cache.get(tool_name, key)
+        if cached is not None:
+            result, age = cached
+            log.info("Tool result served from cache.", tool=tool_name, args=kwargs, age_seconds=round(age, 1))
+            return f"[Cached result from {int(age)}s ago; this lookup already ran in this conversation.]\n{result}"
+
+        result = _take_prefetched(tool_name, kwargs)
+        if result is None:
+            result = func(**kwargs)
+        if isinstance(result, str) and not result.startswith("Error"):
+            cache.put(tool_name, key, result)
+        return result
+
+    return wrapper
+
+
+def prefetchable_tool(tool_name: str, func: Callable[..., str]) -> Callable[..., str]:
+    """Wraps a read-only tool whose results must stay fresh: only this turn's prefetch is reused, never the cache."""
+
+    @functools.wraps(func)
+    def wrapper(**kwargs):
+        result = _take_prefetched(tool_name, kwargs)
+        return result if result is not None else func(**kwargs)
+
+    return wrapper
+
+
+def invalidating_tool(tool_name: str, func: Callable[..., str], related_arg: str = "application") -> Callable[..., str]:
+    """Wraps a mutating tool (never memoized) so it invalidates cached entries related to its target."""
+
+    @functools.wraps(func)
+    def wrapper(**kwargs):
+        try:
+            return func(**kwargs)
+        finally:
+            if kwargs.get(related_arg):
+                dropped = get_tool_cache().invalidate(kwargs[related_arg])
+                log.info("Tool cache invalidated by mutating tool.", tool=tool_name, target=kwargs[related_arg], dropped=dropped)
+
+    return wrapper
@@ -11,8 +11,7 @@ from backend.knowledge_base import (
     get_ira_agent_context,
 )  # Assuming path is correct
 from backend.utilities import get_llm
-from agents.cloud_foundry_agent import CfAgent
-from agents.ira_agent import IraAgent
+from agents.agent_factory import get_shared_agent
 from core.config import settings
 
 # Initialize logger
@@ -132,30 +131,27 @@ def main():
         if current_ui_context in ["CF", "IRA"]:
             chat_sidebar.show_agent_logs()
         chat_sidebar.show_llm_selection()
+        chat_sidebar.show_usage_summary()
 
         if current_ui_context == "CF":
-            if not isinstance(
-                st.session_state.get("chat_agent"), CfAgent
-            ) or st.session_state.get("agent_needs_reinit", False):
-                if st.session_state.llm:
-                    log.info("Initializing/Re-initializing CfAgent.")
-                    st.session_state.chat_agent = CfAgent()
-                else:
-                    log.warning("LLM not available for CfAgent initialization.")
+            # Shared, process-wide agent; built once per model config.
+            if st.session_state.llm:
+                st.session_state.chat_agent = get_shared_agent("CF", st.session_state.llm)
+            else:
+                log.warning("LLM not available for CfAgent initialization.")
+                st.session_state.chat_agent = None
             if st.session_state.chat_agent:
+                # CF context is built per message, filtered to the relevant entitlements.
                 chat_window.show_agent_window(
-                    get_cf_agent_context(), "chat_history_cf", "cf_chat_input_key"
+                    get_cf_agent_context, "chat_history_cf", "cf_chat_input_key"
                 )
 
         elif current_ui_context == "IRA":
-            if not isinstance(
-                st.session_state.get("chat_agent"), IraAgent
-            ) or st.session_state.get("agent_needs_reinit", False):
-                if st.session_state.llm:
-                    log.info("Initializing/Re-initializing IraAgent.")
-                    st.session_state.chat_agent = IraAgent()
-                else:
-                    log.warning("LLM not available for IraAgent initialization.")
+            if st.session_state.llm:
+                st.session_state.chat_agent = get_shared_agent("IRA", st.session_state.llm)
+            else:
+                log.warning("LLM not available for IraAgent initialization.")
+                st.session_state.chat_agent = None
             if st.session_state.chat_agent:
                 chat_window.show_agent_window(
                     get_ira_agent_context(), "chat_history_ira", "ira_chat_input_key"
@@ -0,0 +1,104 @@
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from core.config import settings
+
+# Words too generic to identify an application or group on their own.
+STOPWORDS = {
+    "application", "applications", "restart", "start", "stop", "health", "check", "group",
+    "site", "info", "information", "please", "status", "cloud", "foundry", "what", "which",
+    "with", "from", "for", "the", "and", "can", "you", "get", "show", "list", "my",
+}
+
+_TERM_PATTERN = re.compile(r"[a-z0-9][a-z0-9_.\-]{2,}")
+
+
+@dataclass
+class CfEntitlements:
+    """What a user may operate on in Cloud Foundry: tasks, and per group its sites and applications."""
+
+    tasks: List[str] = field(default_factory=list)
+    group_sites: Dict[str, List[str]] = field(default_factory=dict)
+    group_apps: Dict[str, List[str]] = field(default_factory=dict)
+
+    @property
+    def groups(self) -> List[str]:
+        return sorted(set(self.group_sites) | set(self.group_apps))
+
+
+def _terms(text: str) -> List[str]:
+    return [term for term in _TERM_PATTERN.findall(text.lower()) if term not in STOPWORDS]
+
+
+def _matches(name: str, text: str, terms: List[str]) -> bool:
+    name = name.lower()
+    return name in text or any(len(term) >= 4 and term in name for term in terms)
+
+
+def relevant_entries(entitlements: CfEntitlements, text: str) -> Dict[str, Optional[List[str]]]:
+    """
+    Groups relevant to `text` -> their relevant applications (None means all of them).
+
+    A group is relevant when it is named in the text or owns an application that is;
+    named groups keep all their applications, others only the matching ones.
+    """
+    text = text.lower()
+    terms = _terms(text)
+    relevant = {}
+    for group in entitlements.groups:
+        if _matches(group, text, terms):
+            relevant[group] = None
+            continue
+        apps = [app for app in entitlements.group_apps.get(group, []) if _matches(app, text, terms)]
+        if apps:
+            relevant[group] = apps
+    return relevant
+
+
+def format_rows(entitlements: CfEntitlements, entries: Dict[str, Optional[List[str]]]) -> str:
+    """Compact `group | sites | applications` table (long application lists are capped)."""
+    limit = settings.CF_CONTEXT_MAX_APPS_PER_GROUP
+    lines = ["group | cf_sites | applications"]
+    for group, apps in entries.items():
+        apps = entitlements.group_apps.get(group, []) if apps is None else apps
+        shown = ",".join(apps[:limit]) + (f",+{len(apps) - limit} more" if len(apps) > limit else "")
+        lines.append(f"{group} | {','.join(entitlements.group_sites.get(group, []))} | {shown}")
+    return "\n".join(lines)
+
+
+def format_context(entitlements: CfEntitlements, text: str) -> str:
+    """Context for the CF agent: tasks, all group names, and full rows only for relevant groups."""
+    groups = entitlements.groups
+    entries = relevant_entries(entitlements, text)
+    max_groups = settings.CF_CONTEXT_MAX_GROUP_NAMES
+    group_names = ", ".join(groups[:max_groups]) + (f", +{len(groups) - max_groups} more" if len(groups) > max_groups else "")
+    lines = [
+        f"CF tasks: {', '.join(entitlements.tasks) or 'none'}",
+        f"User groups ({len(groups)}): {group_names or 'none'}",
+    ]
+    if entries:
+        lines += [
+            f"Entries relevant to this conversation ({len(entries)} of {len(groups)} groups):",
+            format_rows(entitlements, entries),
+        ]
+    else:
+        lines.append("No group or application from this conversation matched the user's entitlements.")
+    lines.append("Use the search_entitlements tool for groups, sites or applications not listed here.")
+    return "\n".join(lines)
+
+
+def search(entitlements: CfEntitlements, query: str) -> str:
+    """Rows whose group, site or application names contain `query` (all rows for an empty query)."""
+    query = query.strip().lower()
+    entries = {}
+    for group in entitlements.groups:
+        sites = entitlements.group_sites.get(group, [])
+        if not query or query in group.lower() or any(query in site.lower() for site in sites):
+            entries[group] = None
+            continue
+        apps = [app for app in entitlements.group_apps.get(group, []) if query in app.lower()]
+        if apps:
+            entries[group] = apps
+    if not entries:
+        return f"No groups, sites or applications matching '{query}' are available to the user."
+    return format_rows(entitlements, entries)
@@ -3,6 +3,7 @@ import requests
 import threading
 from core.config import settings
 from auth.oauth_client import AuthService
+from backend.run_context import is_cancelled
 
 # Initialize logger
 log = structlog.get_logger()
@@ -36,6 +37,11 @@ def _make_chatops_request(method, endpoint_url, payload=None, run_async=False):
             "Content-Type": "application/json",
         }
 
+        # Checked last, so a run cancelled while the token was fetched never sends the request.
+        if is_cancelled():
+            log.info("Skipping chatops-service call; agent run was cancelled.", url=endpoint_url)
+            return {"status": "error", "message": "Request cancelled by user before it was sent."}
+
         try:
             response = requests.request(
                 method, endpoint_url, json=payload, headers=headers, timeout=300
@@ -0,0 +1,226 @@
+import heapq
+import json
+import math
+import re
+import threading
+import structlog
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+from backend.ira_data_loader import (
+    INCIDENT_HISTORY_FILE,
+    IncidentHistory,
+    IncidentRecord,
+    ira_data,
+)
+from backend.ira_ingestion import ira_ingestion
+from core.config import settings
+
+log = structlog.get_logger()
+
+_TOKEN = re.compile(r"[a-z0-9_]+")
+
+# IncidentRecord attributes that can be used as exact-match filters.
+FILTER_FIELDS = ("pattern_id", "error_code", "device_model", "success", "solution_id")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens; codes like FAH_RESET_201 also yield their parts."""
+    tokens = []
+    for token in _TOKEN.findall(text.lower()):
+        tokens.append(token)
+        if "_" in token:
+            tokens.extend(part for part in token.split("_") if part)
+    return tokens
+
+
+class IncidentIndex:
+    """
+    Inverted index over incident records with BM25 ranking and exact-match field filters.
+
+    Postings map term -> {doc id: term frequency}; filter postings map (field, value) ->
+    doc ids, so filtered searches only score the matching documents. Adding a record whose
+    id is already indexed replaces it; both cost only the size of the record. Reads and
+    updates hold the index's lock, since ingestion updates it while searches run.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.records: List[IncidentRecord] = []
+        self.solutions: Dict[str, dict] = {}
+        self._postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self._filters: Dict[tuple, set] = defaultdict(set)
+        self._lengths: List[int] = []
+        self._total_length = 0
+        self._doc_ids: Dict[str, int] = {}  # record id -> live doc id
+        self._removed: set = set()
+        self.revision = 0  # Bumped on every change, so derived views know to refresh.
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.records) - len(self._removed)
+
+    def get(self, record_id: str) -> Optional[IncidentRecord]:
+        with self._lock:
+            doc_id = self._doc_ids.get(record_id)
+            return None if doc_id is None else self.records[doc_id]
+
+    def live_records(self) -> List[IncidentRecord]:
+        with self._lock:
+            return [self.records[doc_id] for doc_id in self._doc_ids.values()]
+
+    def add(self, record: IncidentRecord):
+        with self._lock:
+            self._add(record)
+
+    def _add(self, record: IncidentRecord):
+        if record.id in self._doc_ids:
+            self._remove(self._doc_ids[record.id])
+        self.revision += 1
+        doc_id = len(self.records)
+        self.records.append(record)
+        self._doc_ids[record.id] = doc_id
+        counts = Counter(tokenize(record.text()))
+        for term, tf in counts.items():
+            self._postings[term][doc_id] = tf
+        length = sum(counts.values())
+        self._lengths.append(length)
+        self._total_length += length
+        for name in FILTER_FIELDS:
+            value = getattr(record, name)
+            if value not in (None, ""):
+                self._filters[(name, str(value).lower())].add(doc_id)
+
+    def _remove(self, doc_id: int):
+        record = self.records[doc_id]
+        for term in set(tokenize(record.text())):
+            postings = self._postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+        for name in FILTER_FIELDS:
+            value = getattr(record, name)
+            if value not in (None, ""):
+                self._filters[(name, str(value).lower())].discard(doc_id)
+        self._total_length -= self._lengths[doc_id]
+        self._removed.add(doc_id)
+
+    def add_solution(self, solution: dict):
+        with self._lock:
+            self.solutions[str(solution.get("id", ""))] = solution
+            self.revision += 1
+
+    def _candidates(self, filters: Dict[str, object]) -> Optional[set]:
+        candidates = None
+        for name, value in filters.items():
+            if value is None or value == "":
+                continue
+            if name not in FILTER_FIELDS:
+                raise ValueError(f"Unknown incident filter '{name}'.")
+            matches = self._filters.get((name, str(value).lower()), set())
+            candidates = matches if candidates is None else candidates & matches
+        return candidates
+
+    def search(self, query: str = "", k: int = 5, **filters) -> List[IncidentRecord]:
+        """Top-k records by BM25 score for `query` among those matching all `filters` (newest first without a query)."""
+        with self._lock:
+            return self._search(query, k, filters)
+
+    def _search(self, query: str, k: int, filters: Dict[str, object]) -> List[IncidentRecord]:
+        candidates = self._candidates(filters)
+        terms = tokenize(query or "")
+        if not terms:
+            pool = self._doc_ids.values() if candidates is None else candidates
+            return sorted((self.records[i] for i in pool), key=lambda r: r.created_at, reverse=True)[:k]
+
+        n_docs = len(self)
+        avg_length = self._total_length / n_docs if n_docs else 0.0
+        scores = defaultdict(float)
+        for term in set(terms):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf in postings.items():
+                if candidates is not None and doc_id not in candidates:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / avg_length)
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+        ranked = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [self.records[doc_id] for doc_id, _ in ranked]
+
+    def render(self, records: List[IncidentRecord]) -> List[dict]:
+        """Records as returned to the agent: the stored incident plus its solution summary."""
+        results = []
+        for record in records:
+            result = dict(record.raw)
+            solution = self.solutions.get(record.solution_id)
+            if solution:
+                result["solution"] = {
+                    "name": solution.get("name"),
+                    "description": solution.get("description"),
+                    "steps": [step.get("value") for step in (solution.get("steps") or {}).get("actions", [])],
+                    "success_rate": solution.get("success_rate"),
+                }
+            results.append(result)
+        return results
+
+
+def build_incident_index(history: IncidentHistory, ingested_solutions: List[dict] = (), ingested_incidents: List[dict] = ()) -> IncidentIndex:
+    """Index over the history file plus ingested records, which replace file records with the same id."""
+    index = IncidentIndex()
+    for solution in [*history.solutions.values(), *ingested_solutions]:
+        index.add_solution(solution)
+    for record in history.incidents:
+        index.add(record)
+    for raw in ingested_incidents:
+        index.add(IncidentRecord.from_raw(raw))
+    log.info("Incident index built.", incidents=len(index), solutions=len(index.solutions))
+    return index
+
+
+_index: Optional[IncidentIndex] = None
+_index_version = 0
+_index_lock = threading.Lock()
+
+
+def get_incident_index() -> IncidentIndex:
+    """
+    The process-wide incident index: rebuilt when the incident history changes on disk,
+    updated in place as new records are ingested.
+    """
+    global _index, _index_version
+    ira_ingestion.poll_inbox()
+    history, version = ira_data.get_versioned("incidents")
+    with ira_ingestion.lock, _index_lock:
+        if _index is None or _index_version != version:
+            _index = build_incident_index(history, ira_ingestion.records("solution"), ira_ingestion.records("incident"))
+            _index_version = version
+        return _index
+
+
+def _apply_ingested(kind: str, records: List[dict]):
+    with _index_lock:
+        if _index is None:
+            return  # Built with the journaled records on first use.
+        if kind == "solution":
+            for solution in records:
+                _index.add_solution(solution)
+        elif kind == "incident":
+            for raw in records:
+                _index.add(IncidentRecord.from_raw(raw))
+
+
+ira_ingestion.subscribe(_apply_ingested)
+
+
+def search_incidents(query: str = "", top_k: int = None, **filters) -> str:
+    """Top-k incident records matching `query` and `filters`, as a bounded JSON payload for the agent."""
+    top_k = min(top_k or settings.IRA_INCIDENT_TOP_K, settings.IRA_INCIDENT_MAX_TOP_K)
+    index = get_incident_index()
+    matches = index.search(query, k=top_k, **filters)
+    applied = {name: value for name, value in filters.items() if value not in (None, "")}
+    if not matches:
+        return f"No incidents matched query '{query or ''}' with filters {applied or 'none'} ({len(index)} incidents searched)."
+    header = f"Top {len(matches)} of {len(index)} incidents for query '{query or ''}' with filters {applied or 'none'}:"
+    return f"{header}\n{json.dumps(index.render(matches), indent=2)}"
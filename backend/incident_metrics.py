@@ -0,0 +1,185 @@
+import json
+import threading
+import time
+import numpy as np
+import structlog
+from typing import Dict, List, Optional, Tuple
+from backend.incident_index import IncidentIndex, get_incident_index, tokenize
+from backend.ira_data_loader import IncidentRecord
+from core.config import settings
+
+log = structlog.get_logger()
+
+# Categorical columns: name -> label of a record in that column.
+CATEGORIES = {
+    "pattern": lambda record, solutions: record.pattern_name or record.pattern_id,
+    "pattern_id": lambda record, solutions: record.pattern_id,
+    "solution": lambda record, solutions: (solutions.get(record.solution_id) or {}).get("name") or record.solution_id,
+    "solution_id": lambda record, solutions: record.solution_id,
+    "error_code": lambda record, solutions: record.error_code,
+    "device_model": lambda record, solutions: record.device_model,
+    "device_type": lambda record, solutions: record.device_type,
+}
+# Time buckets for trends, as NumPy datetime units.
+PERIODS = {"day": "D", "week": "W", "month": "M"}
+GROUP_BY = [name for name in CATEGORIES if not name.endswith("_id")] + list(PERIODS)
+
+
+def _normalize(value: str) -> str:
+    return " ".join(tokenize(str(value).replace("-", " ")))
+
+
+def _number(value) -> float:
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else np.nan
+
+
+def _timestamp(value: str) -> np.datetime64:
+    try:
+        return np.datetime64(value[:19] or "NaT", "s")
+    except ValueError:
+        return np.datetime64("NaT")
+
+
+def _timestamps(values: List[str]) -> np.ndarray:
+    try:
+        return np.array([value[:19] or "NaT" for value in values]).astype("datetime64[s]")
+    except ValueError:  # Some value is malformed: parse one by one so only that one becomes NaT.
+        return np.array([_timestamp(value) for value in values], dtype="datetime64[s]")
+
+
+class IncidentMetrics:
+    """
+    Columnar view of the incident history for aggregate queries.
+
+    Numeric fields are float arrays (NaN when missing; success is 1/0/NaN), timestamps
+    a datetime64 array, and categorical fields integer codes into a sorted label array,
+    so filters, group-bys and percentiles run as NumPy operations over whole columns.
+    """
+
+    def __init__(self, records: List[IncidentRecord], solutions: Dict[str, dict]):
+        self.size = len(records)
+        self.resolution_time = np.array([_number(r.resolution_time) for r in records], dtype=np.float64)
+        self.success = np.array([np.nan if r.success is None else float(bool(r.success)) for r in records], dtype=np.float64)
+        self.total_steps = np.array([_number(r.total_steps) for r in records], dtype=np.float64)
+        self.created_at = _timestamps([r.created_at for r in records])
+        self.labels: Dict[str, np.ndarray] = {}
+        self.codes: Dict[str, np.ndarray] = {}
+        for name, label in CATEGORIES.items():
+            self.labels[name], self.codes[name] = np.unique(
+                np.array([label(r, solutions) or "" for r in records], dtype=str), return_inverse=True
+            )
+
+    def _matching(self, name: str, value: str) -> np.ndarray:
+        normalized = _normalize(value)
+        wanted = [code for code, label in enumerate(self.labels[name]) if label and _normalize(label) == normalized]
+        return np.isin(self.codes[name], wanted)
+
+    def select(self, filters: Dict[str, str], since: Optional[str] = None, until: Optional[str] = None) -> np.ndarray:
+        """Row indices matching every filter; "pattern" and "solution" also match by id."""
+        mask = np.ones(self.size, dtype=bool)
+        for name, value in filters.items():
+            if value in (None, ""):
+                continue
+            if name not in CATEGORIES:
+                raise ValueError(f"Unknown filter '{name}'.")
+            matches = self._matching(name, value)
+            if f"{name}_id" in CATEGORIES:
+                matches |= self._matching(f"{name}_id", value)
+            mask &= matches
+        if since:
+            mask &= self.created_at >= np.datetime64(since, "s")
+        if until:
+            mask &= self.created_at <= np.datetime64(until, "s")
+        return np.flatnonzero(mask)
+
+    def stats(self, rows: np.ndarray, percentiles: List[float]) -> dict:
+        times = self.resolution_time[rows]
+        times = times[~np.isnan(times)]
+        outcomes = self.success[rows]
+        outcomes = outcomes[~np.isnan(outcomes)]
+        steps = self.total_steps[rows]
+        steps = steps[~np.isnan(steps)]
+        result = {
+            "incidents": int(rows.size),
+            "success_rate": round(float(outcomes.mean()), 3) if outcomes.size else None,
+            "resolved": int(outcomes.sum()),
+            "resolution_time_mean": round(float(times.mean()), 1) if times.size else None,
+        }
+        if times.size:
+            for p, value in zip(percentiles, np.percentile(times, percentiles)):
+                result[f"resolution_time_p{p:g}"] = round(float(value), 1)
+        result["avg_steps"] = round(float(steps.mean()), 1) if steps.size else None
+        return result
+
+    def group(self, rows: np.ndarray, group_by: str) -> List[Tuple[str, np.ndarray]]:
+        """(label, rows) per group: periods in chronological order, categories by incident count."""
+        if group_by in PERIODS:
+            rows = rows[~np.isnat(self.created_at[rows])]
+            keys = self.created_at[rows].astype(f"datetime64[{PERIODS[group_by]}]")
+            labels, inverse = np.unique(keys, return_inverse=True)
+            labels = [str(label) for label in labels]
+        else:
+            codes, inverse = np.unique(self.codes[group_by][rows], return_inverse=True)
+            labels = [self.labels[group_by][code] or "(none)" for code in codes]
+        order = np.argsort(inverse, kind="stable")
+        splits = np.flatnonzero(np.diff(inverse[order])) + 1
+        groups = list(zip(labels, np.split(rows[order], splits))) if rows.size else []
+        if group_by not in PERIODS:
+            groups.sort(key=lambda group: -group[1].size)
+        return groups
+
+
+_metrics: Optional[IncidentMetrics] = None
+_metrics_source: Tuple[Optional[IncidentIndex], int] = (None, -1)
+_metrics_lock = threading.Lock()
+
+
+def get_incident_metrics() -> IncidentMetrics:
+    """The columnar view of the current incident index, rebuilt after the index changes."""
+    global _metrics, _metrics_source
+    index = get_incident_index()
+    with _metrics_lock:
+        if _metrics_source != (index, index.revision):
+            started = time.perf_counter()
+            _metrics = IncidentMetrics(index.live_records(), index.solutions)
+            _metrics_source = (index, index.revision)
+            log.info("Incident metrics built.", incidents=_metrics.size, elapsed_ms=round((time.perf_counter() - started) * 1000, 2))
+        return _metrics
+
+
+def resolution_stats(
+    group_by: Optional[str] = None,
+    pattern: Optional[str] = None,
+    solution: Optional[str] = None,
+    error_code: Optional[str] = None,
+    device_model: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    percentiles: Optional[List[float]] = None,
+) -> str:
+    """Success rate, resolution-time percentiles and step counts of the matching incidents, optionally per group."""
+    if group_by and group_by not in GROUP_BY:
+        return f"Error: Unknown group_by '{group_by}'. Use one of: {', '.join(GROUP_BY)}."
+    percentiles = percentiles or settings.IRA_METRICS_PERCENTILES
+    if any(not 0 <= p <= 100 for p in percentiles):
+        return "Error: Percentiles must be between 0 and 100."
+
+    metrics = get_incident_metrics()
+    started = time.perf_counter()
+    filters = {"pattern": pattern, "solution": solution, "error_code": error_code, "device_model": device_model}
+    try:
+        rows = metrics.select(filters, since, until)
+    except ValueError as e:
+        return f"Error: {e}"
+    applied = {name: value for name, value in {**filters, "since": since, "until": until}.items() if value}
+
+    result = {"filters": applied or "none", "overall": metrics.stats(rows, percentiles)}
+    if group_by and rows.size:
+        groups = metrics.group(rows, group_by)
+        result["group_by"] = group_by
+        result["groups"] = {label: metrics.stats(group_rows, percentiles) for label, group_rows in groups[:settings.IRA_METRICS_MAX_GROUPS]}
+        if len(groups) > settings.IRA_METRICS_MAX_GROUPS:
+            result["groups_omitted"] = len(groups) - settings.IRA_METRICS_MAX_GROUPS
+    log.info("Resolution stats computed.", rows=int(rows.size), group_by=group_by,
+             elapsed_ms=round((time.perf_counter() - started) * 1000, 3))
+    return f"Resolution statistics over {metrics.size} incidents:\n{json.dumps(result, indent=2)}"
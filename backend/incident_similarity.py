@@ -0,0 +1,274 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import numpy as np
+import structlog
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+from backend.incident_index import IncidentIndex, get_incident_index, tokenize
+from backend.ira_data_loader import IncidentRecord
+from backend.ira_ingestion import ira_ingestion
+from core.config import settings
+
+log = structlog.get_logger()
+
+_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+
+
+def shingles(record: IncidentRecord) -> Set[str]:
+    """
+    Features of an incident: tagged codes and device attributes, plus word unigrams
+    and bigrams of its error message, feedback and executed steps.
+    """
+    features = set()
+    for name in ("error_code", "pattern_id", "device_model", "device_type"):
+        value = getattr(record, name)
+        if value:
+            features.add(f"{name}:{value.lower()}")
+    if record.error_code:
+        features.update(f"code:{part}" for part in tokenize(record.error_code))
+    for text in (record.error_message, record.feedback, *record.steps_executed):
+        words = tokenize(text)
+        features.update(f"w:{word}" for word in words)
+        features.update(f"w:{a} {b}" for a, b in zip(words, words[1:]))
+    return features
+
+
+class MinHashLsh:
+    """
+    MinHash signatures of incident shingle sets, banded into LSH buckets.
+
+    A query only compares against incidents sharing at least one band bucket, and
+    candidates are ranked by the estimated Jaccard similarity (the fraction of equal
+    signature slots). Signatures are stored in an append-only JSONL file, so an insert
+    writes one line; on load the last line per id wins.
+    """
+
+    def __init__(self, index_dir: str = None, permutations: int = None, bands: int = None):
+        self.index_dir = index_dir or settings.IRA_SIMILARITY_INDEX_DIR
+        self.permutations = permutations or settings.IRA_SIMILARITY_PERMUTATIONS
+        self.bands = bands or settings.IRA_SIMILARITY_BANDS
+        if self.permutations % self.bands:
+            raise ValueError("The number of permutations must be a multiple of the number of bands.")
+        self.rows_per_band = self.permutations // self.bands
+        generator = np.random.RandomState(1)  # Fixed, so persisted signatures stay comparable.
+        self._a = generator.randint(1, 2 ** 61 - 1, size=self.permutations, dtype=np.uint64)
+        self._b = generator.randint(0, 2 ** 61 - 1, size=self.permutations, dtype=np.uint64)
+        self.ids: List[str] = []
+        self.hashes: Dict[str, str] = {}  # id -> content hash of the indexed version
+        self.signatures: List[np.ndarray] = []  # One row per insert, aligned with ids.
+        self._rows: Dict[str, int] = {}  # id -> live row
+        self._buckets: List[Dict[bytes, Set[int]]] = [defaultdict(set) for _ in range(self.bands)]
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    # --- Signatures ---
+
+    def signature(self, features: Set[str]) -> np.ndarray:
+        values = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(f.encode("utf-8"), digest_size=4).digest(), "little") for f in features),
+            dtype=np.uint64, count=len(features),
+        )
+        # Universal hashing (a*x + b) mod p per permutation; uint64 overflow is intended.
+        with np.errstate(over="ignore"):
+            permuted = ((np.outer(values, self._a) + self._b) % _PRIME) & _MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [band.tobytes() for band in signature.reshape(self.bands, self.rows_per_band)]
+
+    # --- Updates ---
+
+    def insert(self, record: IncidentRecord, persist: bool = True) -> bool:
+        """Adds or replaces a record; False when it is already indexed unchanged."""
+        features = shingles(record)
+        digest = hashlib.sha1("\n".join(sorted(features)).encode("utf-8")).hexdigest()
+        with self._lock:
+            if self.hashes.get(record.id) == digest:
+                return False
+            signature = self.signature(features) if features else np.full(self.permutations, 0xFFFFFFFF, dtype=np.uint32)
+            self._add_row(record.id, digest, signature)
+            if persist:
+                self._append_files([(record.id, digest)], [signature])
+        return True
+
+    def _add_row(self, record_id: str, digest: str, signature: np.ndarray):
+        if record_id in self._rows:
+            self._unbucket(self._rows[record_id])
+        row = len(self.ids)
+        self.ids.append(record_id)
+        self.hashes[record_id] = digest
+        self.signatures.append(signature)
+        self._rows[record_id] = row
+        for band, key in enumerate(self._band_keys(signature)):
+            self._buckets[band][key].add(row)
+
+    def _unbucket(self, row: int):
+        for band, key in enumerate(self._band_keys(self.signatures[row])):
+            self._buckets[band][key].discard(row)
+
+    # --- Queries ---
+
+    def query(self, features: Set[str], k: int = 5, min_score: float = 0.0) -> List[Tuple[str, float]]:
+        """(record id, estimated Jaccard similarity) of the k most similar indexed records."""
+        if not features:
+            return []
+        signature = self.signature(features)
+        with self._lock:
+            candidates = set()
+            for band, key in enumerate(self._band_keys(signature)):
+                candidates |= self._buckets[band].get(key, set())
+            if not candidates:
+                return []
+            rows = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+            scores = (np.stack([self.signatures[row] for row in rows]) == signature).mean(axis=1)
+            order = np.argsort(-scores)[:k]
+            return [(self.ids[rows[i]], float(scores[i])) for i in order if scores[i] > min_score]
+
+    # --- Persistence ---
+
+    def _path(self) -> str:
+        return os.path.join(self.index_dir, "signatures.jsonl")
+
+    def _append_files(self, entries: List[Tuple[str, str]], signatures: List[np.ndarray], path: str = None):
+        os.makedirs(self.index_dir, exist_ok=True)
+        with open(path or self._path(), "a", encoding="utf-8") as f:
+            f.writelines(
+                json.dumps({"id": record_id, "hash": digest, "signature": signature.astype("<u4").tobytes().hex()}) + "\n"
+                for (record_id, digest), signature in zip(entries, signatures)
+            )
+
+    def save(self):
+        """Rewrites the file with only the live rows."""
+        with self._lock:
+            live = sorted(self._rows.values())
+            path = self._path()
+            os.makedirs(self.index_dir, exist_ok=True)
+            open(path + ".tmp", "w").close()
+            if live:
+                self._append_files([(self.ids[row], self.hashes[self.ids[row]]) for row in live],
+                                   [self.signatures[row] for row in live], path=path + ".tmp")
+            os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load(cls, index_dir: str = None) -> "MinHashLsh":
+        index = cls(index_dir)
+        if not os.path.exists(index._path()):
+            return index
+        damaged = 0
+        with open(index._path(), "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    signature = np.frombuffer(bytes.fromhex(entry["signature"]), dtype="<u4").astype(np.uint32)
+                    if signature.shape != (index.permutations,):
+                        raise ValueError("signature length does not match the configured permutations")
+                except (ValueError, KeyError):
+                    damaged += 1  # E.g. a line cut short by a crash; the record is re-inserted on sync.
+                    continue
+                index._add_row(entry["id"], entry["hash"], signature)
+        if damaged or len(index.ids) > 2 * len(index):  # Damaged or mostly superseded rows.
+            log.info("Compacting similarity index.", index_dir=index.index_dir, damaged=damaged, rows=len(index.ids))
+            index.save()
+        return index
+
+    def remove(self, record_id: str):
+        with self._lock:
+            row = self._rows.pop(record_id, None)
+            if row is not None:
+                self._unbucket(row)
+                del self.hashes[record_id]
+
+
+_lsh: Optional[MinHashLsh] = None
+_synced_with: Optional[IncidentIndex] = None
+_lsh_lock = threading.Lock()
+
+
+def get_similarity_index() -> Tuple[MinHashLsh, IncidentIndex]:
+    """
+    The process-wide LSH index, loaded from disk once and synced with the incident index
+    whenever that is rebuilt; ingested incidents are inserted as they arrive.
+    """
+    global _lsh, _synced_with
+    incidents = get_incident_index()
+    with _lsh_lock:
+        if _lsh is None:
+            _lsh = MinHashLsh.load()
+        if _synced_with is not incidents:
+            started = time.perf_counter()
+            records = incidents.live_records()
+            inserted = [record for record in records if _lsh.insert(record, persist=False)]
+            removed = set(_lsh.hashes) - {record.id for record in records}
+            for record_id in removed:
+                _lsh.remove(record_id)
+            if inserted or removed:
+                _lsh.save()
+            _synced_with = incidents
+            log.info("Similarity index ready.", incidents=len(_lsh), inserted=len(inserted),
+                     elapsed_ms=round((time.perf_counter() - started) * 1000, 1))
+        return _lsh, incidents
+
+
+def _apply_ingested(kind: str, records: List[dict]):
+    with _lsh_lock:
+        if kind == "incident" and _lsh is not None:
+            for raw in records:
+                _lsh.insert(IncidentRecord.from_raw(raw))
+
+
+ira_ingestion.subscribe(_apply_ingested)
+
+
+def find_similar_incidents(
+    error_code: str = "",
+    error_message: str = "",
+    device_model: str = "",
+    device_type: str = "",
+    pattern_id: str = "",
+    description: str = "",
+    top_k: int = None,
+) -> str:
+    """Past incidents most similar to the one described, with their solutions and success rates."""
+    probe = IncidentRecord(
+        id="", incident_id="", error_code=error_code or "", error_message=error_message or "",
+        device_model=device_model or "", device_type=device_type or "", pattern_id=pattern_id or "",
+        feedback=description or "",
+    )
+    features = shingles(probe)
+    if not features:
+        return "Error: Describe the incident (error code, error message, device or symptoms) to find similar ones."
+
+    lsh, incidents = get_similarity_index()
+    top_k = min(top_k or settings.IRA_SIMILAR_TOP_K, settings.IRA_INCIDENT_MAX_TOP_K)
+    started = time.perf_counter()
+    matches = lsh.query(features, k=top_k, min_score=settings.IRA_SIMILAR_MIN_SCORE)
+    log.info("Similar incidents looked up.", matches=len(matches), elapsed_ms=round((time.perf_counter() - started) * 1000, 3))
+    if not matches:
+        return f"No similar incidents found among {len(incidents)} past incidents."
+
+    results = []
+    for record_id, score in matches:
+        record = incidents.get(record_id)
+        if record is None:
+            continue
+        solution = incidents.solutions.get(record.solution_id) or {}
+        results.append({
+            "incident_id": record.incident_id,
+            "similarity": round(score, 2),
+            "error_code": record.error_code,
+            "device_model": record.device_model,
+            "pattern_id": record.pattern_id,
+            "resolved": record.success,
+            "resolution_time": record.resolution_time,
+            "feedback": record.feedback,
+            "solution": solution.get("name"),
+            "solution_steps": [step.get("value") for step in (solution.get("steps") or {}).get("actions", [])],
+            "solution_success_rate": solution.get("success_rate"),
+        })
+    return f"{len(results)} most similar past incidents (estimated Jaccard similarity):\n{json.dumps(results, indent=2)}"
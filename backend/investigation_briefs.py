@@ -0,0 +1,185 @@
+"""
+Offline pre-summarization of IRA investigations into compact briefs.
+
+Run from the repository root after investigations are added or changed:
+
+    python -m backend.investigation_briefs [--model NAME] [--batch-size 4] [--concurrency 3] [--force]
+
+Only investigations whose content hash changed since their brief was written are sent
+to the LLM. Investigations without a current brief get an extractive one at query time.
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+import structlog
+from typing import Dict, List, Optional, Tuple
+from pydantic import BaseModel, Field
+from langchain_core.prompts import ChatPromptTemplate
+from core.config import settings
+
+log = structlog.get_logger()
+
+
+class InvestigationBrief(BaseModel):
+    investigation_id: str = Field(description="The investigation's incident_details.id, copied exactly.")
+    root_cause: str = Field(description="The primary root cause in one sentence.")
+    confidence: str = Field(description="Confidence in the root cause as stated in the record, e.g. '0.9' or 'High'.")
+    key_evidence: List[str] = Field(description="At most 3 short pieces of evidence supporting the root cause.")
+    remediation: List[str] = Field(description="At most 3 short remediation actions, taken or pending.")
+    status: str = Field(description="Remediation status, e.g. 'Resolved' or 'Pending resolution'.")
+
+
+class BriefBatch(BaseModel):
+    briefs: List[InvestigationBrief] = Field(description="One brief per investigation, in the order given.")
+
+
+BRIEF_PROMPT = ChatPromptTemplate.from_template(
+    """
+    ### AI Assistant Instructions:
+    Summarize each incident investigation below into a compact brief for an incident responder.
+    Use only facts stated in the record; keep every item short. Return exactly one brief per
+    investigation, for these ids: {ids}.
+
+    {investigations}
+    """
+)
+
+
+def investigation_id(record: dict) -> str:
+    return str(record["incident_details"]["id"])
+
+
+def content_hash(record: dict) -> str:
+    return hashlib.sha1(json.dumps(record, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def extractive_brief(record: dict) -> dict:
+    """A brief built from the record's own fields, used until an LLM brief is generated."""
+    analysis = record.get("root_cause_analysis") or {}
+    remediation = record.get("remediation") or {}
+    findings = (record.get("investigation_process") or {}).get("key_findings") or []
+    return {
+        "investigation_id": investigation_id(record),
+        "root_cause": analysis.get("primary_cause") or record.get("executive_summary", ""),
+        "confidence": str(analysis.get("confidence", "")),
+        "key_evidence": list(analysis.get("evidence") or findings)[:3],
+        "remediation": [*(remediation.get("actions_taken") or []), *(remediation.get("pending_actions") or [])][:3],
+        "status": str(remediation.get("status", "")),
+    }
+
+
+# --- Brief cache ---
+
+_cache: Optional[Dict[str, dict]] = None
+_cache_signature = None
+_cache_lock = threading.Lock()
+
+
+def load_briefs() -> Dict[str, dict]:
+    """investigation id -> {"hash", "brief"}; re-read when the briefs file changes (e.g. after a batch run)."""
+    global _cache, _cache_signature
+    try:
+        stat = os.stat(settings.IRA_BRIEFS_FILE)
+    except FileNotFoundError:
+        return {}
+    with _cache_lock:
+        if _cache is None or _cache_signature != (stat.st_mtime_ns, stat.st_size):
+            with open(settings.IRA_BRIEFS_FILE, "r", encoding="utf-8") as f:
+                _cache = json.load(f)
+            _cache_signature = (stat.st_mtime_ns, stat.st_size)
+        return _cache
+
+
+def save_briefs(briefs: Dict[str, dict]):
+    path = settings.IRA_BRIEFS_FILE
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(briefs, f, indent=2, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def brief_for(record: dict) -> Tuple[dict, bool]:
+    """(brief, True) from the cache when it matches the record's content; otherwise (extractive brief, False)."""
+    cached = load_briefs().get(investigation_id(record))
+    if cached and cached.get("hash") == content_hash(record):
+        return cached["brief"], True
+    return extractive_brief(record), False
+
+
+# --- Batch generation ---
+
+def generate_briefs(llm, records: List[dict], batch_size: int = None, concurrency: int = None, force: bool = False) -> Tuple[int, int]:
+    """
+    Writes LLM briefs for every record whose content changed since its brief was made,
+    `batch_size` investigations per call with at most `concurrency` calls in flight.
+    Returns (briefs generated, briefs still current).
+    """
+    batch_size = batch_size or settings.IRA_BRIEF_BATCH_SIZE
+    concurrency = concurrency or settings.IRA_BRIEF_MAX_CONCURRENCY
+    briefs = dict(load_briefs())
+    stale = [
+        record for record in records
+        if force or briefs.get(investigation_id(record), {}).get("hash") != content_hash(record)
+    ]
+    if not stale:
+        return 0, len(records)
+
+    batches = [stale[i:i + batch_size] for i in range(0, len(stale), batch_size)]
+    inputs = [
+        {
+            "ids": ", ".join(investigation_id(record) for record in batch),
+            "investigations": "\n\n".join(
+                f"## Investigation {investigation_id(record)}\n{json.dumps(record, separators=(',', ':'))}" for record in batch
+            ),
+        }
+        for batch in batches
+    ]
+    chain = BRIEF_PROMPT | llm.with_structured_output(BriefBatch)
+    started = time.perf_counter()
+    results = chain.batch(inputs, config={"max_concurrency": concurrency}, return_exceptions=True)
+
+    generated = 0
+    for batch, result in zip(batches, results):
+        if isinstance(result, Exception):
+            log.warning("Investigation brief batch failed.", ids=[investigation_id(r) for r in batch], error=str(result))
+            continue
+        by_id = {brief.investigation_id.strip(): brief for brief in (result.briefs if result else [])}
+        for record in batch:
+            brief = by_id.get(investigation_id(record))
+            if brief is None:
+                log.warning("LLM returned no brief for investigation.", investigation_id=investigation_id(record))
+                continue
+            briefs[investigation_id(record)] = {"hash": content_hash(record), "brief": brief.model_dump()}
+            generated += 1
+    save_briefs(briefs)
+    log.info("Investigation briefs generated.", generated=generated, stale=len(stale), calls=len(batches),
+             seconds=round(time.perf_counter() - started, 1))
+    return generated, len(records) - len(stale)
+
+
+def main(argv=None) -> int:
+    from backend.investigation_retriever import investigation_records
+    from backend.model_router import DEFAULT_MODEL_NAME, RoutedChatModel
+
+    parser = argparse.ArgumentParser(description="Pre-summarize IRA investigations into compact briefs.")
+    parser.add_argument("--model", default=DEFAULT_MODEL_NAME, help="UI model name; routed under the 'summary' task policy.")
+    parser.add_argument("--batch-size", type=int, default=settings.IRA_BRIEF_BATCH_SIZE)
+    parser.add_argument("--concurrency", type=int, default=settings.IRA_BRIEF_MAX_CONCURRENCY)
+    parser.add_argument("--force", action="store_true", help="Regenerate every brief, not just stale ones.")
+    args = parser.parse_args(argv)
+
+    llm = RoutedChatModel(
+        model_name=args.model, temperature=0, task="summary",
+        openai_api_key=settings.OPENAI_API_KEY, groq_api_key=settings.GROQ_API_KEY,
+    )
+    records = list(investigation_records().values())
+    generated, current = generate_briefs(llm, records, args.batch_size, args.concurrency, args.force)
+    print(f"{generated} briefs generated, {current} already current, {len(records) - generated - current} failed.")
+    return 0 if generated + current == len(records) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,298 @@
+import hashlib
+import json
+import os
+import threading
+import numpy as np
+import structlog
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Tuple
+from scipy import sparse
+from backend.incident_index import tokenize
+from backend.ira_data_loader import INVESTIGATION_HISTORY_FILE, ira_data
+from backend.investigation_briefs import brief_for, investigation_id
+from backend.ira_ingestion import ira_ingestion
+from core.config import settings
+
+log = structlog.get_logger()
+
+# Nested blocks split into one section per key; other top-level keys are one section each.
+_SPLIT_SECTIONS = ("investigation_process", "root_cause_analysis")
+
+
+@dataclass
+class InvestigationSection:
+    investigation_id: str
+    platform: str
+    section: str
+    content_hash: str
+    content: object
+
+    @property
+    def key(self) -> str:
+        return f"{self.investigation_id}/{self.section}"
+
+
+def split_sections(record: dict) -> List[InvestigationSection]:
+    details = record.get("incident_details") or {}
+    investigation_id = str(details.get("id") or hashlib.sha1(json.dumps(record, sort_keys=True).encode()).hexdigest()[:12])
+    platform = str(details.get("platform") or "")
+    sections = []
+    for name, value in record.items():
+        parts = value.items() if name in _SPLIT_SECTIONS and isinstance(value, dict) else [(None, value)]
+        for part, content in parts:
+            section = f"{name}.{part}" if part else name
+            digest = hashlib.sha1(json.dumps(content, sort_keys=True).encode("utf-8")).hexdigest()
+            sections.append(InvestigationSection(investigation_id, platform, section, digest, content))
+    return sections
+
+
+def _section_text(section: InvestigationSection) -> str:
+    # Section names carry meaning too ("root_cause_analysis.primary_cause" should match "root cause").
+    return f"{section.section.replace('_', ' ').replace('.', ' ')} {json.dumps(section.content)}"
+
+
+class InvestigationRetriever:
+    """
+    TF-IDF retrieval over investigation sections with a sparse term-count matrix.
+
+    Rows are sections and columns vocabulary terms. New or changed sections are appended
+    as rows; replaced or removed ones are tombstoned, so an update costs only the
+    changed sections. IDF weights and row norms are recomputed vectorized on demand.
+    The counts, vocabulary and section metadata persist under `index_dir`.
+    """
+
+    def __init__(self, index_dir: str = None):
+        self.index_dir = index_dir or settings.IRA_INVESTIGATION_INDEX_DIR
+        self.vocabulary: Dict[str, int] = {}
+        self.sections: List[InvestigationSection] = []
+        self.live = np.zeros(0, dtype=bool)
+        self.counts = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self._weights = None  # (row-normalized TF-IDF matrix, idf) cache
+        self._lock = threading.Lock()
+
+    # --- Updates ---
+
+    def sync(self, records: List[dict]) -> Tuple[int, int]:
+        """Brings the index in line with `records`; returns (sections added, sections removed)."""
+        return self._update(records, only_given=False)
+
+    def upsert(self, records: List[dict]) -> Tuple[int, int]:
+        """Adds or replaces just the given investigations, leaving all others untouched."""
+        return self._update(records, only_given=True)
+
+    def _update(self, records: List[dict], only_given: bool) -> Tuple[int, int]:
+        sections = [section for record in records for section in split_sections(record)]
+        wanted = {section.key: section for section in sections}
+        given = {section.investigation_id for section in sections}
+        with self._lock:
+            current = {
+                section.key: row for row, section in enumerate(self.sections)
+                if self.live[row] and (not only_given or section.investigation_id in given)
+            }
+            stale = [row for key, row in current.items() if key not in wanted or wanted[key].content_hash != self.sections[row].content_hash]
+            fresh = [section for key, section in wanted.items() if key not in current or current[key] in stale]
+            if stale:
+                self.live[stale] = False
+            if fresh:
+                self._append(fresh)
+            if stale or fresh:
+                self._weights = None
+            if (~self.live).sum() > self.live.sum():
+                self._compact()
+        return len(fresh), len(stale)
+
+    def _compact(self):
+        """Drops tombstoned rows once they outnumber the live ones (vocabulary columns are kept)."""
+        keep = np.flatnonzero(self.live)
+        self.counts = self.counts[keep]
+        self.sections = [self.sections[row] for row in keep]
+        self.live = np.ones(len(keep), dtype=bool)
+        self._weights = None
+
+    def _append(self, sections: List[InvestigationSection]):
+        rows, cols, values = [], [], []
+        for i, section in enumerate(sections):
+            terms, counts = np.unique(tokenize(_section_text(section)), return_counts=True)
+            for term, count in zip(terms, counts):
+                column = self.vocabulary.setdefault(str(term), len(self.vocabulary))
+                rows.append(i)
+                cols.append(column)
+                values.append(count)
+        added = sparse.csr_matrix(
+            (np.asarray(values, dtype=np.float32), (rows, cols)), shape=(len(sections), len(self.vocabulary))
+        )
+        existing = self.counts
+        existing.resize((existing.shape[0], len(self.vocabulary)))
+        self.counts = sparse.vstack([existing, added], format="csr")
+        self.sections.extend(sections)
+        self.live = np.concatenate([self.live, np.ones(len(sections), dtype=bool)])
+
+    # --- Queries ---
+
+    def _weighted(self):
+        if self._weights is None:
+            live = sparse.diags(self.live.astype(np.float32))
+            counts = live @ self.counts  # Tombstoned rows drop out of document frequencies and results.
+            n_docs = max(int(self.live.sum()), 1)
+            df = np.bincount(counts.indices, minlength=counts.shape[1])
+            idf = np.log((1 + n_docs) / (1 + df)) + 1.0
+            tf = counts.copy()
+            tf.data = 1.0 + np.log(tf.data)
+            weighted = tf @ sparse.diags(idf.astype(np.float32))
+            norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+            norms[norms == 0] = 1.0
+            self._weights = (sparse.diags(1.0 / norms) @ weighted).tocsr(), idf
+        return self._weights
+
+    def search(self, query: str, k: int = 5, min_score: float = 0.0) -> List[Tuple[InvestigationSection, float]]:
+        """Top-k live sections by cosine similarity to `query`."""
+        with self._lock:
+            if not self.sections:
+                return []
+            matrix, idf = self._weighted()
+            columns = [self.vocabulary[term] for term in tokenize(query) if term in self.vocabulary]
+            if not columns:
+                return []
+            terms, counts = np.unique(columns, return_counts=True)
+            query_vector = np.zeros(matrix.shape[1], dtype=np.float32)
+            query_vector[terms] = (1.0 + np.log(counts)) * idf[terms]
+            query_vector /= np.linalg.norm(query_vector)
+            scores = matrix @ query_vector
+            k = min(k, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(self.sections[row], float(scores[row])) for row in top if scores[row] > min_score]
+
+    # --- Persistence ---
+
+    def save(self):
+        with self._lock:
+            os.makedirs(self.index_dir, exist_ok=True)
+            meta_path = os.path.join(self.index_dir, "sections.json")
+            counts_path = os.path.join(self.index_dir, "counts.npz")
+            sparse.save_npz(counts_path + ".tmp.npz", self.counts)
+            with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump({
+                    "vocabulary": self.vocabulary,
+                    "sections": [asdict(section) for section in self.sections],
+                    "live": self.live.tolist(),
+                }, f)
+            # The metadata is replaced last: a crash in between leaves counts the metadata doesn't describe,
+            # which load() detects by shape and rebuilds from the source.
+            os.replace(counts_path + ".tmp.npz", counts_path)
+            os.replace(meta_path + ".tmp", meta_path)
+
+    @classmethod
+    def load(cls, index_dir: str = None) -> "InvestigationRetriever":
+        retriever = cls(index_dir)
+        meta_path = os.path.join(retriever.index_dir, "sections.json")
+        counts_path = os.path.join(retriever.index_dir, "counts.npz")
+        if not (os.path.exists(meta_path) and os.path.exists(counts_path)):
+            return retriever
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            counts = sparse.load_npz(counts_path).tocsr()
+            if counts.shape != (len(meta["sections"]), len(meta["vocabulary"])):
+                raise ValueError(f"matrix shape {counts.shape} does not match the metadata")
+        except (OSError, ValueError, KeyError) as e:
+            log.warning("Discarding unreadable investigation index; rebuilding.", index_dir=retriever.index_dir, error=str(e))
+            return retriever
+        retriever.vocabulary = meta["vocabulary"]
+        retriever.sections = [InvestigationSection(**section) for section in meta["sections"]]
+        retriever.live = np.asarray(meta["live"], dtype=bool)
+        retriever.counts = counts
+        return retriever
+
+
+_retriever: Optional[InvestigationRetriever] = None
+_retriever_version = 0
+_retriever_lock = threading.Lock()
+
+
+def get_investigation_retriever() -> InvestigationRetriever:
+    """
+    The process-wide retriever: loaded from disk once, then synced with the investigation
+    history plus ingested investigations (and saved if anything changed) whenever the
+    file changes. Newly ingested investigations are upserted in place.
+    """
+    global _retriever, _retriever_version
+    ira_ingestion.poll_inbox()
+    records, version = ira_data.get_versioned("investigations")
+    with ira_ingestion.lock, _retriever_lock:
+        if _retriever is None:
+            _retriever = InvestigationRetriever.load()
+        if _retriever_version != version:
+            added, removed = _retriever.sync(list(_merge(records).values()))
+            if added or removed:
+                _retriever.save()
+            log.info("Investigation index ready.", sections=int(_retriever.live.sum()), added=added, removed=removed)
+            _retriever_version = version
+        return _retriever
+
+
+def _merge(records: List[dict]) -> Dict[str, dict]:
+    # Ingested records replace file records for the same investigation.
+    return {investigation_id(record): record for record in [*records, *ira_ingestion.records("investigation")]}
+
+
+def investigation_records() -> Dict[str, dict]:
+    """investigation id -> record, from the history file plus ingested investigations."""
+    ira_ingestion.poll_inbox()
+    return _merge(ira_data.get("investigations"))
+
+
+def _apply_ingested(kind: str, records: List[dict]):
+    with _retriever_lock:
+        if kind == "investigation" and _retriever is not None:
+            added, removed = _retriever.upsert(records)
+            if added or removed:
+                _retriever.save()  # Otherwise a restart re-indexes everything ingested since the last sync.
+
+
+ira_ingestion.subscribe(_apply_ingested)
+
+
+def _brief_result(record: dict, **extra) -> dict:
+    brief, _ = brief_for(record)
+    details = record.get("incident_details") or {}
+    return {**brief, "platform": details.get("platform"), "severity": details.get("severity"),
+            "timestamp": details.get("timestamp"), **extra}
+
+
+def most_recent(records: List[dict], k: int) -> List[dict]:
+    """The `k` investigations with the latest incident timestamps (ISO 8601, so they sort as text)."""
+    return sorted(records, key=lambda record: str((record.get("incident_details") or {}).get("timestamp") or ""), reverse=True)[:k]
+
+
+def search_investigations(query: Optional[str] = None, top_k: int = None, investigation_id: Optional[str] = None) -> str:
+    """
+    Briefs of the investigations most relevant to `query` (the most recent ones without
+    a query), or the full record of `investigation_id` when one is requested.
+    """
+    records = investigation_records()
+    if investigation_id:
+        record = records.get(investigation_id.strip())
+        if record is None:
+            return f"Error: Unknown investigation '{investigation_id}'. Known investigations: {', '.join(records) or 'none'}."
+        return f"Full record of investigation {investigation_id}:\n{json.dumps(record, indent=2)}"
+
+    top_k = min(top_k or settings.IRA_INVESTIGATION_TOP_K, settings.IRA_INVESTIGATION_MAX_TOP_K)
+    if not (query or "").strip():
+        results = [_brief_result(record) for record in most_recent(list(records.values()), top_k)]
+        return (f"Briefs of the {len(results)} most recent of {len(records)} investigations (pass investigation_id for a full record):\n"
+                f"{json.dumps(results, indent=2)}")
+
+    matches = get_investigation_retriever().search(query, k=settings.IRA_INVESTIGATION_MAX_TOP_K, min_score=settings.IRA_INVESTIGATION_MIN_SCORE)
+    # Rank investigations by their best-matching section.
+    ranked: Dict[str, dict] = {}
+    for section, score in matches:
+        if section.investigation_id in records:
+            entry = ranked.setdefault(section.investigation_id, {"score": round(score, 3), "matched_sections": []})
+            if len(entry["matched_sections"]) < 3:
+                entry["matched_sections"].append(section.section)
+    if not ranked:
+        return f"No investigations matched query '{query}'."
+    results = [_brief_result(records[key], **extra) for key, extra in list(ranked.items())[:top_k]]
+    return (f"Briefs of the top {len(results)} investigations for query '{query}' (pass investigation_id for a full record):\n"
+            f"{json.dumps(results, indent=2)}")
@@ -0,0 +1,216 @@
+import json
+import mmap
+import os
+import re
+import threading
+import time
+import structlog
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from core.config import settings
+
+log = structlog.get_logger()
+
+INCIDENT_HISTORY_FILE = "data/ira_incident_history.txt"
+INVESTIGATION_HISTORY_FILE = "data/ira_investigation_history.txt"
+
+_INVISIBLE = dict.fromkeys(map(ord, "\u200b\u200c\u200d\u2060\ufeff"))  # Zero-width characters.
+_HEADER = re.compile(r"^#\s+(?P<title>.+?)\s*$", re.M)
+_PATTERN_TITLE = re.compile(r"^incident history for (?P<name>.+?)(?: pattern)?$", re.I)
+
+
+# --- Normalized structures ---
+
+@dataclass
+class IncidentRecord:
+    """One incident from the IRA history, flattened for indexing; `raw` is the record as stored."""
+
+    id: str
+    incident_id: str
+    pattern_id: str = ""
+    pattern_name: str = ""
+    solution_id: str = ""
+    success: Optional[bool] = None
+    resolution_time: Optional[float] = None
+    total_steps: Optional[int] = None
+    error_code: str = ""
+    error_message: str = ""
+    device_model: str = ""
+    device_type: str = ""
+    feedback: str = ""
+    steps_executed: List[str] = field(default_factory=list)
+    created_at: str = ""
+    raw: dict = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def from_raw(cls, raw: dict) -> "IncidentRecord":
+        metadata = raw.get("resolution_metadata") or {}
+        error = metadata.get("error_details") or {}
+        device = metadata.get("device_info") or {}
+        return cls(
+            id=str(raw.get("id", "")),
+            incident_id=str(raw.get("incident_id", "")),
+            pattern_id=str(raw.get("pattern_id") or ""),
+            pattern_name=str(raw.get("pattern_name") or ""),
+            solution_id=str(raw.get("solution_id") or ""),
+            success=raw.get("success"),
+            resolution_time=raw.get("resolution_time"),
+            total_steps=metadata.get("total_steps"),
+            error_code=str(error.get("error_code") or ""),
+            error_message=str(error.get("error_message") or ""),
+            device_model=str(device.get("model") or ""),
+            device_type=str(device.get("type") or ""),
+            feedback=str(raw.get("feedback") or ""),
+            steps_executed=list(metadata.get("steps_executed") or []),
+            created_at=str(raw.get("created_at") or ""),
+            raw=raw,
+        )
+
+    def text(self) -> str:
+        return " ".join([
+            self.incident_id, self.error_code, self.error_message, self.device_model,
+            self.device_type, self.feedback, *self.steps_executed,
+        ])
+
+
+@dataclass
+class IncidentHistory:
+    incidents: List[IncidentRecord]
+    solutions: Dict[str, dict]  # solution id -> solution
+
+
+# --- Parsing ---
+
+def strip_invisible(text: str) -> str:
+    return text.translate(_INVISIBLE)
+
+
+def parse_history_blocks(text: str) -> Dict[str, list]:
+    """
+    Splits an IRA history file into its `# Title:` sections and returns title -> the
+    section's JSON "data" list. Invisible characters are stripped first.
+    """
+    text = strip_invisible(text)
+    headers = list(_HEADER.finditer(text))
+    blocks = {}
+    for i, header in enumerate(headers):
+        end = headers[i + 1].start() if i + 1 < len(headers) else len(text)
+        body = text[header.end():end].strip()
+        if not body:
+            continue
+        payload = json.loads(body)
+        blocks[header.group("title").rstrip(":")] = payload.get("data", []) if isinstance(payload, dict) else payload
+    return blocks
+
+
+def parse_investigations(text: str) -> List[dict]:
+    """Investigation records from a file of one or more concatenated JSON objects (invisible characters stripped)."""
+    text = strip_invisible(text)
+    decoder = json.JSONDecoder()
+    records, position = [], 0
+    while True:
+        while position < len(text) and text[position].isspace():
+            position += 1
+        if position >= len(text):
+            return records
+        record, position = decoder.raw_decode(text, position)
+        records.extend(record if isinstance(record, list) else [record])
+
+
+def _valid(entries: list, kind: str, required: Callable[[dict], bool]) -> list:
+    valid = [entry for entry in entries if isinstance(entry, dict) and required(entry)]
+    if len(valid) != len(entries):
+        log.warning("Skipped invalid IRA records.", kind=kind, skipped=len(entries) - len(valid))
+    return valid
+
+
+def load_incident_history(text: str) -> IncidentHistory:
+    incidents, solutions = [], {}
+    for title, entries in parse_history_blocks(text).items():
+        if "solution" in title.lower():
+            for solution in _valid(entries, "solution", lambda e: e.get("id")):
+                solutions[str(solution["id"])] = solution
+        else:
+            # "Incident History for Device Offline" names the pattern of the block's incidents.
+            title_match = _PATTERN_TITLE.match(title)
+            for raw in _valid(entries, "incident", lambda e: e.get("id") and e.get("incident_id")):
+                record = IncidentRecord.from_raw(raw)
+                record.pattern_name = record.pattern_name or (title_match.group("name") if title_match else "")
+                incidents.append(record)
+    return IncidentHistory(incidents=incidents, solutions=solutions)
+
+
+def load_investigations(text: str) -> List[dict]:
+    return _valid(parse_investigations(text), "investigation", lambda e: (e.get("incident_details") or {}).get("id"))
+
+
+def load_text(text: str) -> str:
+    return "\n".join(line.rstrip() for line in strip_invisible(text).strip().splitlines())
+
+
+# --- Change-aware cache ---
+
+@dataclass
+class _Entry:
+    path: str
+    parse: Callable[[str], Any]
+    signature: Optional[Tuple[int, int]] = None  # (mtime_ns, size) of the parsed file
+    checked_at: float = 0.0
+    value: Any = None
+    version: int = 0
+
+
+class IraDataLoader:
+    """
+    Parses each IRA data source once and serves it from memory.
+
+    A source is re-parsed only when its file's mtime or size changes (checked at most
+    every IRA_DATA_CHECK_INTERVAL_SECONDS). Each re-parse bumps the source's version so
+    derived indexes know to refresh. Large files are read through a memory map.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, path: str, parse: Callable[[str], Any]):
+        with self._lock:
+            self._entries[name] = _Entry(path=path, parse=parse)
+
+    def registered(self, name: str) -> bool:
+        return name in self._entries
+
+    def get(self, name: str) -> Any:
+        return self.get_versioned(name)[0]
+
+    def get_versioned(self, name: str) -> Tuple[Any, int]:
+        """(parsed value, version) for a source; raises FileNotFoundError if it was never readable."""
+        with self._lock:
+            entry = self._entries[name]
+            now = time.monotonic()
+            if entry.signature is not None and now - entry.checked_at < settings.IRA_DATA_CHECK_INTERVAL_SECONDS:
+                return entry.value, entry.version
+            entry.checked_at = now
+            stat = os.stat(entry.path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if signature != entry.signature:
+                started = time.perf_counter()
+                entry.value = entry.parse(self._read(entry.path, stat.st_size))
+                entry.signature = signature
+                entry.version += 1
+                log.info("IRA data source loaded.", source=name, path=entry.path, bytes=stat.st_size,
+                         version=entry.version, elapsed_ms=round((time.perf_counter() - started) * 1000, 1))
+            return entry.value, entry.version
+
+    @staticmethod
+    def _read(path: str, size: int) -> str:
+        with open(path, "rb") as f:
+            if size >= settings.IRA_DATA_MMAP_MIN_BYTES:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return str(mapped[:], "utf-8")
+            return f.read().decode("utf-8")
+
+
+ira_data = IraDataLoader()
+ira_data.register("incidents", INCIDENT_HISTORY_FILE, load_incident_history)
+ira_data.register("investigations", INVESTIGATION_HISTORY_FILE, load_investigations)
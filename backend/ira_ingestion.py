@@ -0,0 +1,255 @@
+import glob
+import json
+import os
+import threading
+import time
+import structlog
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+from pydantic import BaseModel, ConfigDict, ValidationError
+from core.config import settings
+
+log = structlog.get_logger()
+
+RECORD_KINDS = ("incident", "solution", "investigation")
+
+
+# --- Schemas ---
+# Only the fields the indexes rely on are checked; any other fields are kept as they are.
+
+class _Record(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+
+class IncidentSchema(_Record):
+    id: str
+    incident_id: str
+    pattern_id: Optional[str] = None
+    solution_id: Optional[str] = None
+    success: Optional[bool] = None
+    resolution_time: Optional[float] = None
+    resolution_metadata: Optional[dict] = None
+    feedback: Optional[str] = None
+    created_at: Optional[str] = None
+
+
+class SolutionSchema(_Record):
+    id: str
+    name: Optional[str] = None
+    description: Optional[str] = None
+    steps: Optional[dict] = None
+    pattern_id: Optional[str] = None
+    success_rate: Optional[float] = None
+
+
+class InvestigationDetailsSchema(_Record):
+    id: str
+    platform: Optional[str] = None
+
+
+class InvestigationSchema(_Record):
+    incident_details: InvestigationDetailsSchema
+    executive_summary: Optional[str] = None
+
+
+SCHEMAS = {"incident": IncidentSchema, "solution": SolutionSchema, "investigation": InvestigationSchema}
+
+
+def validate_entry(entry: object) -> Tuple[str, dict]:
+    """
+    Checks one ingestion entry, `{"type": <kind>, "record": {...}}`, and returns
+    (kind, record). Raises ValueError describing the first problem.
+    """
+    if isinstance(entry, str):
+        raise ValueError(entry)
+    if not isinstance(entry, dict):
+        raise ValueError("entry is not a JSON object")
+    kind, record = entry.get("type"), entry.get("record")
+    if kind not in SCHEMAS:
+        raise ValueError(f"unknown record type {kind!r} (expected one of {', '.join(RECORD_KINDS)})")
+    if not isinstance(record, dict):
+        raise ValueError("'record' is not a JSON object")
+    try:
+        SCHEMAS[kind].model_validate(record)
+    except ValidationError as e:
+        raise ValueError(f"invalid {kind}: {e.errors()[0]['loc']} {e.errors()[0]['msg']}") from None
+    return kind, record
+
+
+@dataclass
+class IngestResult:
+    accepted: int = 0
+    rejected: List[str] = field(default_factory=list)  # One reason per rejected entry.
+
+
+# --- Pipeline ---
+
+class IngestionPipeline:
+    """
+    Append-only ingestion of new IRA records.
+
+    Accepted records are appended to a JSONL journal and pushed to the subscribed
+    indexes, which update incrementally. Indexes built later replay the journal on
+    top of the static history files. Records arrive through ingest() or as JSONL files
+    dropped into the inbox; the byte offset read from each inbox file is checkpointed,
+    so a restart resumes where it left off and appends only cost the new lines. Journal
+    entries from the inbox also carry that offset, so a chunk journaled before its
+    checkpoint was saved is not ingested again.
+    """
+
+    def __init__(self, ingest_dir: str = None):
+        self.ingest_dir = ingest_dir or settings.IRA_INGEST_DIR
+        self.inbox_dir = os.path.join(self.ingest_dir, "inbox")
+        self.journal_path = os.path.join(self.ingest_dir, "journal.jsonl")
+        self.checkpoint_path = os.path.join(self.ingest_dir, "checkpoint.json")
+        self._records: Optional[Dict[str, List[dict]]] = None  # kind -> journal records, loaded lazily
+        self._journaled_offsets: Dict[str, int] = {}  # inbox file -> end offset of its last journaled chunk
+        self._subscribers: List[Callable[[str, List[dict]], None]] = []
+        # Held while applying a batch; index builds hold it too, so no batch is missed or applied twice.
+        self.lock = threading.RLock()
+        self._polled_at = 0.0
+
+    def subscribe(self, callback: Callable[[str, List[dict]], None]):
+        """`callback(kind, records)` is called with every newly accepted batch of each kind."""
+        self._subscribers.append(callback)
+
+    def records(self, kind: str) -> List[dict]:
+        """Every journaled record of `kind`, in ingestion order."""
+        with self.lock:
+            return list(self._journal()[kind])
+
+    def revision(self) -> int:
+        """Number of journaled records; changes with every ingested batch."""
+        with self.lock:
+            return sum(len(records) for records in self._journal().values())
+
+    def _journal(self) -> Dict[str, List[dict]]:
+        if self._records is None:
+            self._records = {kind: [] for kind in RECORD_KINDS}
+            if os.path.exists(self.journal_path):
+                with open(self.journal_path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        if line.strip():
+                            entry = json.loads(line)
+                            self._records[entry["type"]].append(entry["record"])
+                            self._note_inbox_offset(entry.get("inbox"))
+        return self._records
+
+    def _note_inbox_offset(self, inbox: Optional[dict]):
+        if inbox:
+            name = inbox["file"]
+            self._journaled_offsets[name] = max(self._journaled_offsets.get(name, 0), inbox["end"])
+
+    def ingest(self, entries: List[dict], source: str = "api", inbox: Optional[dict] = None) -> IngestResult:
+        """
+        Validates `entries`, journals the valid ones and applies them to the indexes.
+        `inbox` ({"file", "end"}) marks entries read from an inbox file up to offset `end`.
+        """
+        result = IngestResult()
+        accepted: Dict[str, List[dict]] = {}
+        for position, entry in enumerate(entries):
+            try:
+                kind, record = validate_entry(entry)
+            except ValueError as e:
+                result.rejected.append(f"{source}[{position}]: {e}")
+                continue
+            accepted.setdefault(kind, []).append(record)
+            result.accepted += 1
+        if result.rejected:
+            log.warning("Rejected invalid IRA records.", source=source, rejected=result.rejected)
+        if not accepted:
+            return result
+
+        with self.lock:
+            journal = self._journal()
+            os.makedirs(self.ingest_dir, exist_ok=True)
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                for kind, records in accepted.items():
+                    for record in records:
+                        entry = {"type": kind, "record": record}
+                        if inbox:
+                            entry["inbox"] = inbox
+                        f.write(json.dumps(entry) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._note_inbox_offset(inbox)
+            for kind, records in accepted.items():
+                journal[kind].extend(records)
+                for callback in self._subscribers:
+                    try:
+                        callback(kind, records)
+                    except Exception as e:
+                        # The records are journaled; an index that missed them catches up when it is rebuilt.
+                        log.error("IRA ingestion subscriber failed.", subscriber=getattr(callback, "__module__", None),
+                                  kind=kind, records=len(records), error=str(e), exc_info=True)
+        log.info("IRA records ingested.", source=source, accepted={kind: len(r) for kind, r in accepted.items()})
+        return result
+
+    # --- File drops ---
+
+    def _load_checkpoint(self) -> Dict[str, int]:
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _save_checkpoint(self, offsets: Dict[str, int]):
+        with open(self.checkpoint_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(offsets, f)
+        os.replace(self.checkpoint_path + ".tmp", self.checkpoint_path)
+
+    def poll_inbox(self, force: bool = False) -> IngestResult:
+        """
+        Ingests lines appended to inbox/*.jsonl since the last checkpoint. A trailing line
+        without a newline is still being written and is left for the next poll.
+        Runs at most every IRA_INGEST_POLL_SECONDS unless forced.
+        """
+        total = IngestResult()
+        with self.lock:
+            now = time.monotonic()
+            if not force and now - self._polled_at < settings.IRA_INGEST_POLL_SECONDS:
+                return total
+            self._polled_at = now
+            if not os.path.isdir(self.inbox_dir):
+                return total
+            offsets = self._load_checkpoint()
+            self._journal()  # Loads the offsets of chunks journaled before a checkpoint was saved.
+            for path in sorted(glob.glob(os.path.join(self.inbox_dir, "*.jsonl"))):
+                name = os.path.basename(path)
+                offset = max(offsets.get(name, 0), self._journaled_offsets.get(name, 0))
+                if os.path.getsize(path) <= offset:
+                    continue
+                with open(path, "rb") as f:
+                    f.seek(offset)
+                    chunk = f.read()
+                complete = chunk[:chunk.rfind(b"\n") + 1]
+                if not complete:
+                    continue
+                entries = []
+                for line in complete.decode("utf-8").splitlines():
+                    if line.strip():
+                        try:
+                            entries.append(json.loads(line))
+                        except json.JSONDecodeError as e:
+                            entries.append(f"invalid JSON ({e.msg})")  # Rejected by validation, keeping line positions.
+                result = self.ingest(entries, source=f"{name}@{offset}", inbox={"file": name, "end": offset + len(complete)})
+                total.accepted += result.accepted
+                total.rejected += result.rejected
+                offsets[name] = offset + len(complete)
+                self._save_checkpoint(offsets)
+        return total
+
+
+ira_ingestion = IngestionPipeline()
+
+
+def ingest_records(entries: List[dict]) -> IngestResult:
+    """API entry point: ingest `{"type": "incident" | "solution" | "investigation", "record": {...}}` entries."""
+    return ira_ingestion.ingest(entries)
+
+
+def ingestion_revision() -> int:
+    """The revision of the ingested IRA data, after picking up new inbox lines; part of IRA tool cache keys."""
+    ira_ingestion.poll_inbox()
+    return ira_ingestion.revision()
@@ -1,7 +1,11 @@
 import streamlit as st
 import json
+import time
 import structlog
 from backend.db_service import PostgresDB
+from backend.run_context import current_user_id
+from backend.cf_entitlements import CfEntitlements, format_context as format_cf_context, search as search_entitlements
+from core.config import settings
 
 # Initialize logger
 log = structlog.get_logger()
@@ -9,74 +13,88 @@ log = structlog.get_logger()
 # Instantiate DB service
 db = PostgresDB()
 
+CF_ENTITLEMENTS_SESSION_KEY = "cf_entitlements"
+
+
+def _fetch_cf_entitlements(user_id: str) -> CfEntitlements:
+    entitlements = CfEntitlements()
+
+    tasks = db.execute_query(
+        """
+        SELECT task_name AS cloud_foundry_task
+        FROM public.chatops_tasks
+        WHERE enabled = 'Y' AND task_type = 'CLOUD FOUNDRY'
+    """,
+        dict_cursor=True,
+    )
+    entitlements.tasks = [row["cloud_foundry_task"] for row in tasks or []]
+
+    rows = db.execute_query(
+        """
+        SELECT DISTINCT a.group_name, b.cf_site AS cloud_foundry_site
+        FROM public.chatops_users a
+        JOIN public.chatops_org_space b ON a.group_name = b.group_name
+        WHERE a.userid = %s
+        ORDER BY 1, 2
+    """,
+        (user_id,),
+        dict_cursor=True,
+    )
+    for item in rows or []:
+        sites = entitlements.group_sites.setdefault(item["group_name"], [])
+        if item["cloud_foundry_site"] not in sites:
+            sites.append(item["cloud_foundry_site"])
+
+    rows = db.execute_query(
+        """
+        SELECT DISTINCT a.group_name, b.application
+        FROM public.chatops_users a
+        JOIN public.chatops_app_groups b ON a.group_name = b.group_name
+        WHERE a.userid = %s
+        ORDER BY 1, 2
+    """,
+        (user_id,),
+        dict_cursor=True,
+    )
+    for item in rows or []:
+        apps = entitlements.group_apps.setdefault(item["group_name"], [])
+        if item["application"] not in apps:
+            apps.append(item["application"])
+
+    return entitlements
+
+
+def get_cf_entitlements() -> CfEntitlements:
+    """The current user's CF entitlements, cached in the session for CF_ENTITLEMENTS_TTL_SECONDS."""
+    user_id = current_user_id()
+    cached = st.session_state.get(CF_ENTITLEMENTS_SESSION_KEY)
+    if cached and cached[0] == user_id and time.time() - cached[1] < settings.CF_ENTITLEMENTS_TTL_SECONDS:
+        return cached[2]
+
+    log.info("Fetching Cloud Foundry entitlements.")
+    entitlements = _fetch_cf_entitlements(user_id)
+    st.session_state[CF_ENTITLEMENTS_SESSION_KEY] = (user_id, time.time(), entitlements)
+    return entitlements
+
 
 def get_cloud_foundry_info() -> str:
     log.info("Fetching Cloud Foundry information.")
-    user_id = st.session_state.user_id
 
     try:
-        tasks = db.execute_query(
-            """
-            SELECT task_name AS cloud_foundry_task
-            FROM public.chatops_tasks
-            WHERE enabled = 'Y' AND task_type = 'CLOUD FOUNDRY'
-        """,
-            dict_cursor=True,
-        )
+        entitlements = get_cf_entitlements()
         results1 = (
-            json.dumps(
-                [{"CLOUD_FOUNDRY_TASKS": [row["cloud_foundry_task"] for row in tasks]}],
-                indent=2,
-            )
-            if tasks
+            json.dumps([{"CLOUD_FOUNDRY_TASKS": entitlements.tasks}], indent=2)
+            if entitlements.tasks
             else "[]"
         )
-
-        rows = db.execute_query(
-            """
-            SELECT DISTINCT a.group_name, b.cf_site AS cloud_foundry_site
-            FROM public.chatops_users a
-            JOIN public.chatops_org_space b ON a.group_name = b.group_name
-            WHERE a.userid = %s
-            ORDER BY 1, 2
-        """,
-            (user_id,),
-            dict_cursor=True,
-        )
-
-        grouped_data = {}
-        for item in rows:
-            group_name = item["group_name"]
-            site = item["cloud_foundry_site"]
-            grouped_data.setdefault(
-                group_name, {"GROUP_NAME": group_name, "CLOUD_FOUNDRY_SITES": []}
-            )
-            if site not in grouped_data[group_name]["CLOUD_FOUNDRY_SITES"]:
-                grouped_data[group_name]["CLOUD_FOUNDRY_SITES"].append(site)
-        results2 = json.dumps(list(grouped_data.values()), indent=2) if rows else "[]"
-
-        rows = db.execute_query(
-            """
-            SELECT DISTINCT a.group_name, b.application
-            FROM public.chatops_users a
-            JOIN public.chatops_app_groups b ON a.group_name = b.group_name
-            WHERE a.userid = %s
-            ORDER BY 1, 2
-        """,
-            (user_id,),
-            dict_cursor=True,
-        )
-
-        grouped_data = {}
-        for item in rows:
-            group_name = item["group_name"]
-            app = item["application"]
-            grouped_data.setdefault(
-                group_name, {"GROUP_NAME": group_name, "APPLICATIONS": []}
-            )
-            if app not in grouped_data[group_name]["APPLICATIONS"]:
-                grouped_data[group_name]["APPLICATIONS"].append(app)
-        results3 = json.dumps(list(grouped_data.values()), indent=2) if rows else "[]"
+        results2 = json.dumps(
+            [{"GROUP_NAME": group, "CLOUD_FOUNDRY_SITES": sites} for group, sites in entitlements.group_sites.items()],
+            indent=2,
+        ) if entitlements.group_sites else "[]"
+        results3 = json.dumps(
+            [{"GROUP_NAME": group, "APPLICATIONS": apps} for group, apps in entitlements.group_apps.items()],
+            indent=2,
+        ) if entitlements.group_apps else "[]"
 
         return f"{results1}\n\n{results2}\n\n{results3}"
 
@@ -99,15 +117,32 @@ def get_ira_agent_context() -> str:
     return f"Incident Resolution Assistant (IRA):\n{ira_information}"
 
 
-def get_cf_agent_context() -> str:
+def get_cf_agent_context(user_input: str = "", chat_history: list = None) -> str:
+    """
+    Compact CF context for one turn: tasks, group names, and rows only for the groups
+    and applications mentioned in the message or recent history.
+    """
     log.info("get_cf_agent_context")
-    cloud_foundry_info = get_cloud_foundry_info()
+    recent = (chat_history or [])[-settings.CF_CONTEXT_HISTORY_MESSAGES:]
+    text = "\n".join([str(message.content) for message in recent] + [user_input])
+    try:
+        cloud_foundry_info = format_cf_context(get_cf_entitlements(), text)
+    except Exception as e:
+        return f"Unexpected Error: {str(e)}"
     return f"Cloud Foundry Task Application:\n{cloud_foundry_info}"
 
 
+def search_cf_entitlements(query: str) -> str:
+    log.info("search_cf_entitlements", query=query)
+    try:
+        return search_entitlements(get_cf_entitlements(), query)
+    except Exception as e:
+        return f"Unexpected Error: {str(e)}"
+
+
 def get_cloud_foundry_app_info(application: str) -> str:
     log.info("get_cloud_foundry_app_info")
-    user_id = st.session_state.user_id
+    user_id = current_user_id()
 
     try:
         rows = db.execute_query(
@@ -150,7 +185,7 @@ def get_cloud_foundry_app_info(application: str) -> str:
 
 def get_application_groups() -> str:
     log.info("get_application_groups")
-    user_id = st.session_state.user_id
+    user_id = current_user_id()
 
     try:
         rows = db.execute_query(
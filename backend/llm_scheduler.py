@@ -0,0 +1,193 @@
+import heapq
+import itertools
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional
+import structlog
+from core.config import settings
+from backend.run_context import RunCancelled, is_cancelled
+
+log = structlog.get_logger()
+
+
+class LLMSchedulerBusy(Exception):
+    """An LLM request was shed or waited too long for provider capacity."""
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """True for provider 429 / rate-limit errors (OpenAI and Groq clients both expose status_code)."""
+    message = str(error).lower()
+    return getattr(error, "status_code", None) == 429 or "rate limit" in message or "rate_limit" in message
+
+
+class TokenBucket:
+    """Refills `per_minute` units per minute up to one minute's worth; may go negative when settling."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        self._refill(now)
+        amount = min(amount, self.capacity)  # Oversized requests wait for a full bucket, not forever.
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def consume(self, amount: float, now: float):
+        self._refill(now)
+        self.level -= amount
+
+
+@dataclass
+class _ModelQueue:
+    """Buckets, waiting requests and counters for one (provider, model)."""
+
+    requests: TokenBucket
+    tokens: TokenBucket
+    waiters: list = field(default_factory=list)  # heap of (priority, sequence)
+    blocked_until: float = 0.0
+    granted: int = 0
+    shed: int = 0
+    timed_out: int = 0
+    rate_limited: int = 0
+    waits: deque = field(default_factory=lambda: deque(maxlen=200))
+
+    def wait_time(self, tokens: int, now: float) -> float:
+        return max(self.blocked_until - now, self.requests.wait_time(1, now), self.tokens.wait_time(tokens, now))
+
+
+@dataclass
+class Permit:
+    model_name: str
+    tokens: int
+
+
+class LLMScheduler:
+    """
+    Process-wide admission control for LLM calls.
+
+    Each provider model gets a request and a token bucket (LLM_RATE_LIMITS). Waiting
+    calls are served strictly by priority lane (LLM_TASK_PRIORITIES), FIFO within a
+    lane; background work (suggestions, summaries) is shed instead of queued when the
+    model is saturated, so interactive agent turns keep the capacity.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._queues = {}  # UI model name -> _ModelQueue
+        self._sequence = itertools.count()
+
+    def _queue(self, model_name: str) -> _ModelQueue:
+        queue = self._queues.get(model_name)
+        if queue is None:
+            # Imported here: model_router imports this module.
+            from backend.model_router import provider_for
+
+            limits = dict(settings.LLM_RATE_LIMITS.get(provider_for(model_name), {}))
+            limits.update(settings.LLM_MODEL_RATE_LIMITS.get(model_name, {}))
+            queue = _ModelQueue(
+                requests=TokenBucket(limits.get("requests_per_minute", 60)),
+                tokens=TokenBucket(limits.get("tokens_per_minute", 60000)),
+            )
+            self._queues[model_name] = queue
+        return queue
+
+    def _shed_reason(self, queue: _ModelQueue, tokens: int, now: float) -> Optional[str]:
+        if any(priority == 0 for priority, _ in queue.waiters):
+            return "interactive requests waiting"
+        if len(queue.waiters) >= settings.LLM_SCHEDULER_SHED_QUEUE_DEPTH:
+            return f"queue depth {len(queue.waiters)}"
+        wait = queue.wait_time(tokens, now)
+        if wait > settings.LLM_SCHEDULER_BACKGROUND_MAX_WAIT_SECONDS:
+            return f"expected wait {wait:.1f}s"
+        return None
+
+    def acquire(self, model_name: str, task: str, tokens: int) -> Permit:
+        """Blocks until the call may be sent; raises LLMSchedulerBusy if it is shed or times out."""
+        priority = settings.LLM_TASK_PRIORITIES.get(task, 1)
+        max_wait = settings.LLM_SCHEDULER_MAX_WAIT_SECONDS if priority == 0 else settings.LLM_SCHEDULER_BACKGROUND_MAX_WAIT_SECONDS
+        started = time.monotonic()
+        with self._cond:
+            queue = self._queue(model_name)
+            if priority > 0:
+                reason = self._shed_reason(queue, tokens, started)
+                if reason:
+                    queue.shed += 1
+                    log.warning("LLM request shed.", model=model_name, task=task, reason=reason)
+                    raise LLMSchedulerBusy(f"LLM capacity for {model_name} is saturated ({reason}).")
+
+            entry = (priority, next(self._sequence))
+            heapq.heappush(queue.waiters, entry)
+            try:
+                while True:
+                    if is_cancelled():
+                        raise RunCancelled()
+                    now = time.monotonic()
+                    wait = queue.wait_time(tokens, now) if queue.waiters[0] == entry else None
+                    if wait == 0:
+                        queue.requests.consume(1, now)
+                        queue.tokens.consume(tokens, now)
+                        queue.granted += 1
+                        queue.waits.append(now - started)
+                        if now - started > 1.0:
+                            log.info("LLM request delayed by rate limits.", model=model_name, task=task, wait_seconds=round(now - started, 2))
+                        return Permit(model_name=model_name, tokens=tokens)
+                    remaining = started + max_wait - now
+                    if remaining <= 0:
+                        queue.timed_out += 1
+                        log.warning("LLM request timed out waiting for capacity.", model=model_name, task=task)
+                        raise LLMSchedulerBusy(f"LLM capacity for {model_name} unavailable after {max_wait:.0f}s.")
+                    # Re-check at least every 0.5s so cancelled runs stop waiting promptly.
+                    self._cond.wait(timeout=min(remaining, wait or 0.5, 0.5))
+            finally:
+                queue.waiters.remove(entry)
+                heapq.heapify(queue.waiters)
+                self._cond.notify_all()
+
+    def settle(self, permit: Permit, actual_tokens: Optional[int]):
+        """Corrects the token bucket once the provider reports the real usage."""
+        if not actual_tokens:
+            return
+        with self._cond:
+            self._queue(permit.model_name).tokens.consume(actual_tokens - permit.tokens, time.monotonic())
+            self._cond.notify_all()
+
+    def report_rate_limited(self, model_name: str):
+        """Pauses a model after a provider 429 so queued calls don't hammer it."""
+        with self._cond:
+            queue = self._queue(model_name)
+            queue.rate_limited += 1
+            queue.blocked_until = time.monotonic() + settings.LLM_SCHEDULER_RATE_LIMIT_COOLDOWN_SECONDS
+        log.warning("Provider rate limit hit; pausing model.", model=model_name,
+                    cooldown_seconds=settings.LLM_SCHEDULER_RATE_LIMIT_COOLDOWN_SECONDS)
+
+    def metrics(self) -> list:
+        """Queue depth, wait times and outcome counters per model."""
+        now = time.monotonic()
+        with self._cond:
+            result = []
+            for model_name, queue in self._queues.items():
+                waits = sorted(queue.waits)
+                result.append({
+                    "model": model_name,
+                    "queue_depth": len(queue.waiters),
+                    "granted": queue.granted,
+                    "shed": queue.shed,
+                    "timed_out": queue.timed_out,
+                    "rate_limited": queue.rate_limited,
+                    "avg_wait_seconds": round(sum(waits) / len(waits), 3) if waits else 0.0,
+                    "p95_wait_seconds": round(waits[math.ceil(0.95 * (len(waits) - 1))], 3) if waits else 0.0,
+                    "tokens_available": int(queue.tokens.level + (now - queue.tokens.updated) * queue.tokens.rate),
+                })
+            return result
+
+
+llm_scheduler = LLMScheduler()
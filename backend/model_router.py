@@ -0,0 +1,266 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Iterator, List, Optional
+import structlog
+from pydantic import SecretStr
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from langchain_groq import ChatGroq
+from langchain_openai import ChatOpenAI
+from core.config import settings
+from backend.run_context import RunCancelled
+from backend.llm_scheduler import LLMSchedulerBusy, is_rate_limit_error, llm_scheduler
+
+# Initialize logger
+log = structlog.get_logger()
+
+# UI model name -> (provider, provider model id)
+MODEL_SPECS = {
+    "OpenAI gpt-4": ("openai", "gpt-4"),
+    "OpenAI gpt-4o-mini": ("openai", "gpt-4o-mini"),
+    "OpenAI gpt-3.5-turbo": ("openai", "gpt-3.5-turbo"),
+    "llama-3.3-70b-versatile": ("groq", "llama-3.3-70b-versatile"),
+    "llama3-70b-8192": ("groq", "llama3-70b-8192"),
+    "llama-3.1-8b-instant": ("groq", "llama-3.1-8b-instant"),
+}
+DEFAULT_MODEL_NAME = "OpenAI gpt-4"
+
+
+def create_chat_model(llm: str, temperature: float, openai_key: str, groq_key: str) -> BaseChatModel:
+    """Builds the provider chat model for a UI model name (unknown names default to GPT-4)."""
+    if llm not in MODEL_SPECS:
+        log.warning("LLM model not recognized, defaulting to GPT-4.", selected_llm=llm)
+        llm, temperature = DEFAULT_MODEL_NAME, 0.5
+    provider, model = MODEL_SPECS[llm]
+    if provider == "openai":
+        # stream_usage: report token usage on streamed replies too (for usage accounting).
+        return ChatOpenAI(api_key=openai_key, model=model, temperature=temperature, stream_usage=True)
+    return ChatGroq(api_key=groq_key, model=model, temperature=temperature)
+
+
+def _estimate_tokens(messages: List[BaseMessage]) -> int:
+    """Rough request size for rate limiting (~4 chars per token plus the expected completion)."""
+    return sum(len(str(message.content)) for message in messages) // 4 + settings.LLM_COMPLETION_TOKEN_ESTIMATE
+
+
+def _usage_tokens(message) -> Optional[int]:
+    usage = getattr(message, "usage_metadata", None) or {}
+    return usage.get("total_tokens")
+
+
+def provider_for(model_name: str) -> str:
+    return MODEL_SPECS.get(model_name, MODEL_SPECS[DEFAULT_MODEL_NAME])[0]
+
+
+class ModelRouter:
+    """
+    Process-wide routing state shared by all sessions.
+
+    Tracks rolling latency and error rates per model and orders the candidates for
+    a call: task policy model first (e.g. a cheaper model for suggestions), then the
+    selected model, then its fallback chain. Models over their latency or error
+    budget are moved to the end of the order until their window recovers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples = {}  # model name -> deque of (timestamp, latency_seconds, ok)
+        self._models = {}  # (name, temperature, keys) -> provider model instance
+
+    def get_model(self, model_name: str, temperature: float, openai_key: str, groq_key: str) -> BaseChatModel:
+        key = (model_name, temperature, openai_key, groq_key)
+        with self._lock:
+            if key not in self._models:
+                self._models[key] = create_chat_model(model_name, temperature, openai_key, groq_key)
+            return self._models[key]
+
+    def record(self, model_name: str, latency: float, ok: bool):
+        with self._lock:
+            samples = self._samples.setdefault(model_name, deque(maxlen=200))
+            samples.append((time.time(), latency, ok))
+
+    def stats(self, model_name: str) -> dict:
+        cutoff = time.time() - settings.LLM_ROUTER_WINDOW_SECONDS
+        with self._lock:
+            samples = [s for s in self._samples.get(model_name, ()) if s[0] >= cutoff]
+        latencies = [latency for _, latency, ok in samples if ok]
+        errors = sum(1 for _, _, ok in samples if not ok)
+        return {
+            "samples": len(samples),
+            "error_rate": errors / len(samples) if samples else 0.0,
+            "avg_latency": sum(latencies) / len(latencies) if latencies else 0.0,
+        }
+
+    def unhealthy_reason(self, model_name: str) -> Optional[str]:
+        """Returns why a model is over budget, or None when it is healthy."""
+        stats = self.stats(model_name)
+        if stats["samples"] < settings.LLM_ROUTER_MIN_SAMPLES:
+            return None
+        if stats["error_rate"] > settings.LLM_ERROR_RATE_BUDGET:
+            return f"error rate {stats['error_rate']:.2f} > {settings.LLM_ERROR_RATE_BUDGET:.2f}"
+        latency_budget = settings.LLM_LATENCY_BUDGETS.get(model_name, settings.LLM_LATENCY_BUDGET_DEFAULT)
+        if stats["avg_latency"] > latency_budget:
+            return f"avg latency {stats['avg_latency']:.1f}s > {latency_budget:.1f}s"
+        return None
+
+    def route(self, model_name: str, task: str = "agent") -> List[str]:
+        """Orders the candidate models for one call and logs the decision."""
+        candidates = []
+        policy_model = settings.LLM_TASK_MODELS.get(task)
+        for name in [policy_model, model_name] + settings.LLM_FALLBACK_CHAINS.get(model_name, []):
+            if name and name not in candidates:
+                candidates.append(name)
+
+        healthy, demoted, reasons = [], [], {}
+        for name in candidates:
+            reason = self.unhealthy_reason(name)
+            if reason:
+                demoted.append(name)
+                reasons[name] = reason
+            else:
+                healthy.append(name)
+        ordered = healthy + demoted  # Demoted models stay as a last resort.
+
+        if ordered[0] != model_name or reasons:
+            log.info(
+                "LLM route selected.",
+                task=task,
+                requested=model_name,
+                chosen=ordered[0],
+                reason=reasons or (f"task policy for '{task}'" if ordered[0] == policy_model else "fallback"),
+                order=ordered,
+            )
+        return ordered
+
+
+model_router = ModelRouter()
+
+
+class RoutedChatModel(BaseChatModel):
+    """
+    Chat model that routes each call through the ModelRouter and fails over to the
+    next candidate when a provider errors. Drop-in for the provider models, so agents,
+    chains and tool binding work unchanged.
+    """
+
+    model_name: str
+    temperature: float = 0.5
+    task: str = "agent"
+    openai_api_key: Optional[SecretStr] = None
+    groq_api_key: Optional[SecretStr] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "routed-chat-model"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {"model_name": self.model_name, "temperature": self.temperature, "task": self.task}
+
+    def bind_tools(self, tools, *, tool_choice=None, **kwargs):
+        """
+        Binds tools in the OpenAI format both providers accept, so with_structured_output
+        works through the router. `tool_choice` follows ChatOpenAI: a tool name, "any" or True.
+        """
+        formatted_tools = [convert_to_openai_tool(tool) for tool in tools]
+        if tool_choice:
+            tool_names = [tool["function"]["name"] for tool in formatted_tools]
+            if isinstance(tool_choice, str) and tool_choice in tool_names:
+                tool_choice = {"type": "function", "function": {"name": tool_choice}}
+            elif tool_choice == "any" or tool_choice is True:
+                tool_choice = "required"
+            kwargs["tool_choice"] = tool_choice
+        return self.bind(tools=formatted_tools, **kwargs)
+
+    def _candidate_models(self):
+        openai_key = self.openai_api_key.get_secret_value() if self.openai_api_key else ""
+        groq_key = self.groq_api_key.get_secret_value() if self.groq_api_key else ""
+        for name in model_router.route(self.model_name, self.task):
+            yield name, model_router.get_model(name, self.temperature, openai_key, groq_key)
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        last_error = None
+        estimated_tokens = _estimate_tokens(messages)
+        for name, model in self._candidate_models():
+            try:
+                permit = llm_scheduler.acquire(name, self.task, estimated_tokens)
+            except LLMSchedulerBusy as e:
+                log.warning("LLM call not scheduled, trying next model.", model=name, task=self.task, error=str(e))
+                last_error = e
+                continue
+            started = time.perf_counter()
+            try:
+                result = model._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            except RunCancelled:
+                raise
+            except Exception as e:
+                model_router.record(name, time.perf_counter() - started, ok=False)
+                if is_rate_limit_error(e):
+                    llm_scheduler.report_rate_limited(name)
+                log.warning("LLM call failed, trying next model.", model=name, task=self.task, error=str(e))
+                last_error = e
+                continue
+            model_router.record(name, time.perf_counter() - started, ok=True)
+            token_usage = (result.llm_output or {}).get("token_usage") or {}
+            llm_scheduler.settle(
+                permit,
+                token_usage.get("total_tokens") or (_usage_tokens(result.generations[0].message) if result.generations else None),
+            )
+            return result
+        raise last_error
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        last_error = None
+        estimated_tokens = _estimate_tokens(messages)
+        for name, model in self._candidate_models():
+            try:
+                permit = llm_scheduler.acquire(name, self.task, estimated_tokens)
+            except LLMSchedulerBusy as e:
+                log.warning("LLM stream not scheduled, trying next model.", model=name, task=self.task, error=str(e))
+                last_error = e
+                continue
+            started = time.perf_counter()
+            streamed = False
+            used_tokens = 0
+            try:
+                for chunk in model._stream(messages, stop=stop, run_manager=run_manager, **kwargs):
+                    streamed = True
+                    used_tokens += _usage_tokens(chunk.message) or 0
+                    yield chunk
+            except RunCancelled:
+                raise  # The user stopped the run; not a model failure.
+            except Exception as e:
+                model_router.record(name, time.perf_counter() - started, ok=False)
+                if is_rate_limit_error(e):
+                    llm_scheduler.report_rate_limited(name)
+                if streamed:
+                    raise  # Part of the answer was already delivered; can't switch models mid-stream.
+                log.warning("LLM stream failed, trying next model.", model=name, task=self.task, error=str(e))
+                last_error = e
+                continue
+            model_router.record(name, time.perf_counter() - started, ok=True)
+            llm_scheduler.settle(permit, used_tokens)
+            return
+        raise last_error
+
+
+def for_task(llm, task: str):
+    """Returns `llm` routed under the policy for `task` (no-op for non-routed models)."""
+    if isinstance(llm, RoutedChatModel) and llm.task != task:
+        return llm.model_copy(update={"task": task})
+    return llm
@@ -0,0 +1,126 @@
+import json
+import re
+import structlog
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from backend.incident_index import tokenize
+from backend.ira_data_loader import ira_data, load_text
+from core.config import settings
+
+log = structlog.get_logger()
+
+PLATFORM_REGISTRY_FILE = "data/platforms.json"
+OVERVIEW_SECTION = "Overview"
+
+_SECTION_HEADING = re.compile(r"^(?P<title>[A-Z][^\n:-]{0,80}):\s*$", re.M)
+_STOPWORDS = frozenset(
+    "a an and are about does do for from go how in is it of on or the this to what when where which who why with".split()
+)
+
+
+@dataclass
+class Platform:
+    id: str
+    name: str
+    document: str  # Path of the platform's document.
+    aliases: List[str] = field(default_factory=list)
+    services: List[str] = field(default_factory=list)
+
+    @property
+    def names(self) -> List[str]:
+        return [self.id, self.name, *self.aliases, *self.services]
+
+
+def _normalize(name: str) -> str:
+    return " ".join(tokenize(name.replace("-", " ")))
+
+
+def split_sections(text: str) -> Dict[str, str]:
+    """
+    Splits a platform document at its `Heading:` lines; text before the first heading
+    is the overview.
+    """
+    text = load_text(text)
+    sections, position, title = {}, 0, OVERVIEW_SECTION
+    for heading in _SECTION_HEADING.finditer(text):
+        body = text[position:heading.start()].strip()
+        if body:
+            sections[title] = body
+        position, title = heading.end(), heading.group("title").strip()
+    body = text[position:].strip()
+    if body:
+        sections[title] = body
+    return sections
+
+
+class PlatformRegistry:
+    """
+    Platforms by name, alias and service name. Each platform's document is split into
+    sections and cached on first use, so only requested platforms are ever read.
+    """
+
+    def __init__(self, platforms: List[Platform]):
+        self.platforms = platforms
+        self._by_name: Dict[str, Platform] = {}
+        for platform in platforms:
+            for name in platform.names:
+                self._by_name.setdefault(_normalize(name), platform)
+
+    @classmethod
+    def from_json(cls, text: str) -> "PlatformRegistry":
+        return cls([Platform(**entry) for entry in json.loads(text).get("platforms", [])])
+
+    def resolve(self, name: str) -> Optional[Platform]:
+        """The platform for a name, alias or service; the longest known name contained in `name` otherwise."""
+        normalized = _normalize(name)
+        if normalized in self._by_name:
+            return self._by_name[normalized]
+        padded = f" {normalized} "
+        contained = [known for known in self._by_name if known and f" {known} " in padded]
+        return self._by_name[max(contained, key=len)] if contained else None
+
+    @staticmethod
+    def sections(platform: Platform) -> Dict[str, str]:
+        source = f"platform:{platform.id}"
+        if not ira_data.registered(source):
+            ira_data.register(source, platform.document, split_sections)
+        return ira_data.get(source)
+
+
+def get_platform_registry() -> PlatformRegistry:
+    return ira_data.get("platforms")
+
+
+def select_sections(sections: Dict[str, str], topic: str, limit: int) -> List[str]:
+    """Titles of the sections most relevant to `topic`; title matches weigh more than body matches."""
+    terms = set(tokenize(topic)) - _STOPWORDS
+    scores = {}
+    for title, body in sections.items():
+        score = 3 * len(terms & set(tokenize(title))) + len(terms & set(tokenize(body)))
+        if score:
+            scores[title] = score
+    return sorted(scores, key=scores.get, reverse=True)[:limit]
+
+
+def describe_platform(platform_name: str, topic: Optional[str] = None) -> str:
+    """
+    The sections of a platform's document relevant to `topic`; without a topic (or
+    when nothing matches) the overview and the list of available sections.
+    """
+    registry = get_platform_registry()
+    platform = registry.resolve(platform_name)
+    if platform is None:
+        known = ", ".join(f"{p.name} (aliases: {', '.join(p.aliases + p.services)})" for p in registry.platforms)
+        return f"Error: Unknown platform '{platform_name}'. Known platforms: {known}."
+
+    sections = registry.sections(platform)
+    titles = select_sections(sections, topic, settings.IRA_PLATFORM_MAX_SECTIONS) if topic else []
+    if not titles:
+        titles = [OVERVIEW_SECTION] if OVERVIEW_SECTION in sections else list(sections)[:1]
+    body = "\n\n".join(f"{title}:\n{sections[title]}" for title in titles)
+    others = [title for title in sections if title not in titles]
+    more = f"\n\nOther sections (pass one as `topic`): {', '.join(others)}" if others else ""
+    return f"Platform Information for {platform.name}:\n\n{body}{more}"
+
+
+ira_data.register("platforms", PLATFORM_REGISTRY_FILE, PlatformRegistry.from_json)
@@ -0,0 +1,62 @@
+import contextlib
+import threading
+import streamlit as st
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Optional
+
+# Per-call state for shared (process-wide) agents and their tools. Set by the agent
+# for the duration of one turn so tools and backend lookups never depend on which
+# session built the agent.
+
+
+@dataclass
+class RunContext:
+    user_id: str
+    history_key: str
+    tool_cache: Any = None
+    prefetch: Any = None  # agents.tool_prefetch.ToolPrefetch for this turn, if any
+
+
+class RunCancelled(Exception):
+    """Raised inside an agent run once the user has cancelled it."""
+
+
+_run_context: ContextVar[Optional[RunContext]] = ContextVar("run_context", default=None)
+_cancel_event: ContextVar[Optional[threading.Event]] = ContextVar("cancel_event", default=None)
+
+
+def get_run_context() -> Optional[RunContext]:
+    return _run_context.get()
+
+
+@contextlib.contextmanager
+def use_run_context(run_context: RunContext):
+    token = _run_context.set(run_context)
+    try:
+        yield run_context
+    finally:
+        _run_context.reset(token)
+
+
+def current_user_id() -> str:
+    """User id of the current agent run, falling back to the Streamlit session."""
+    run_context = _run_context.get()
+    if run_context is not None:
+        return run_context.user_id
+    return st.session_state.user_id
+
+
+@contextlib.contextmanager
+def use_cancel_event(cancel_event: threading.Event):
+    token = _cancel_event.set(cancel_event)
+    try:
+        yield cancel_event
+    finally:
+        _cancel_event.reset(token)
+
+
+def is_cancelled() -> bool:
+    """True once the user has cancelled the current (off-thread) agent run."""
+    cancel_event = _cancel_event.get()
+    return cancel_event is not None and cancel_event.is_set()
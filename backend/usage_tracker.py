@@ -0,0 +1,148 @@
+import threading
+import time
+import structlog
+import streamlit as st
+from dataclasses import dataclass, field
+from langchain_core.callbacks import BaseCallbackHandler
+from backend.utilities import count_tokens, count_message_tokens
+
+log = structlog.get_logger()
+
+USAGE_SESSION_KEY = "usage_stats"
+
+
+@dataclass
+class TurnUsage:
+    """Token and latency figures for one agent turn, suggestion or direct reply."""
+
+    component: str  # "agent" | "suggestion" | "direct" | "summary"
+    context: str
+    model: str
+    llm_calls: list = field(default_factory=list)  # {model, seconds, prompt_tokens, completion_tokens, estimated}
+    tool_calls: list = field(default_factory=list)  # {tool, seconds, ok}
+    started_at: float = field(default_factory=time.perf_counter)
+    total_seconds: float = 0.0
+
+    @property
+    def prompt_tokens(self) -> int:
+        return sum(call["prompt_tokens"] for call in self.llm_calls)
+
+    @property
+    def completion_tokens(self) -> int:
+        return sum(call["completion_tokens"] for call in self.llm_calls)
+
+
+class UsageCallbackHandler(BaseCallbackHandler):
+    """
+    Collects per-step LLM and tool timings plus token usage for one turn.
+
+    Token counts come from the provider's usage metadata; when a provider doesn't
+    report them (e.g. some streams) they are estimated and flagged as such.
+    """
+
+    def __init__(self, component: str, context: str, model: str):
+        self.turn = TurnUsage(component=component, context=context, model=model)
+        self._starts = {}  # run_id -> (start time, name, estimated prompt tokens)
+        self._lock = threading.Lock()
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        prompt_tokens = sum(count_message_tokens(batch) for batch in messages)
+        with self._lock:
+            self._starts[run_id] = (time.perf_counter(), None, prompt_tokens)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        with self._lock:
+            self._starts[run_id] = (time.perf_counter(), None, sum(count_tokens(p) for p in prompts))
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        with self._lock:
+            started, _, estimated_prompt = self._starts.pop(run_id, (time.perf_counter(), None, 0))
+        generation = response.generations[0][0] if response.generations and response.generations[0] else None
+        message = getattr(generation, "message", None)
+        usage = getattr(message, "usage_metadata", None) or {}
+        token_usage = (response.llm_output or {}).get("token_usage") or {}
+        model = (
+            (response.llm_output or {}).get("model_name")
+            or (getattr(message, "response_metadata", None) or {}).get("model_name")
+            or self.turn.model
+        )
+        prompt_tokens = usage.get("input_tokens") or token_usage.get("prompt_tokens")
+        completion_tokens = usage.get("output_tokens") or token_usage.get("completion_tokens")
+        estimated = prompt_tokens is None or completion_tokens is None
+        if estimated:
+            prompt_tokens = prompt_tokens or estimated_prompt
+            completion_tokens = completion_tokens or count_tokens(generation.text if generation else "")
+        with self._lock:
+            self.turn.llm_calls.append({
+                "model": model,
+                "seconds": time.perf_counter() - started,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "estimated": estimated,
+            })
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        with self._lock:
+            self._starts.pop(run_id, None)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        with self._lock:
+            self._starts[run_id] = (time.perf_counter(), (serialized or {}).get("name") or kwargs.get("name", "tool"), 0)
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._finish_tool(run_id, ok=True)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._finish_tool(run_id, ok=False)
+
+    def _finish_tool(self, run_id, ok: bool):
+        with self._lock:
+            started, name, _ = self._starts.pop(run_id, (time.perf_counter(), "tool", 0))
+            self.turn.tool_calls.append({"tool": name, "seconds": time.perf_counter() - started, "ok": ok})
+
+
+def record_turn(turn: TurnUsage, session_state=None) -> dict:
+    """Emits the structured usage event for a turn and rolls it up per (model, context) in the session."""
+    turn.total_seconds = time.perf_counter() - turn.started_at
+    model = turn.llm_calls[-1]["model"] if turn.llm_calls else turn.model
+    summary = {
+        "component": turn.component,
+        "context": turn.context,
+        "model": model,
+        "iterations": len(turn.llm_calls),
+        "prompt_tokens": turn.prompt_tokens,
+        "completion_tokens": turn.completion_tokens,
+        "tokens_estimated": any(call["estimated"] for call in turn.llm_calls),
+        "llm_seconds": round(sum(call["seconds"] for call in turn.llm_calls), 3),
+        "tool_seconds": round(sum(call["seconds"] for call in turn.tool_calls), 3),
+        "total_seconds": round(turn.total_seconds, 3),
+        "steps": [
+            {"llm": call["model"], "seconds": round(call["seconds"], 3), "prompt_tokens": call["prompt_tokens"],
+             "completion_tokens": call["completion_tokens"]}
+            for call in turn.llm_calls
+        ] + [
+            {"tool": call["tool"], "seconds": round(call["seconds"], 3), "ok": call["ok"]}
+            for call in turn.tool_calls
+        ],
+    }
+    log.info("LLM usage recorded.", **summary)
+
+    session_state = st.session_state if session_state is None else session_state
+    stats = session_state.setdefault(USAGE_SESSION_KEY, {})
+    entry = stats.setdefault(f"{model}|{turn.context}", {
+        "model": model, "context": turn.context, "turns": 0, "llm_calls": 0, "tool_calls": 0,
+        "prompt_tokens": 0, "completion_tokens": 0, "llm_seconds": 0.0, "tool_seconds": 0.0,
+    })
+    entry["turns"] += 1
+    entry["llm_calls"] += summary["iterations"]
+    entry["tool_calls"] += len(turn.tool_calls)
+    entry["prompt_tokens"] += summary["prompt_tokens"]
+    entry["completion_tokens"] += summary["completion_tokens"]
+    entry["llm_seconds"] += summary["llm_seconds"]
+    entry["tool_seconds"] += summary["tool_seconds"]
+    return summary
+
+
+def get_session_usage(session_state=None) -> list:
+    session_state = st.session_state if session_state is None else session_state
+    return list(session_state.get(USAGE_SESSION_KEY, {}).values())
@@ -1,10 +1,9 @@
 import streamlit as st
 import re, os, json
 import structlog
-from langchain_groq import ChatGroq
-from langchain_openai import ChatOpenAI
 from langchain_community.llms import Ollama
 from core.config import settings
+from backend.model_router import RoutedChatModel
 
 # Initialize logger
 log = structlog.get_logger()
@@ -47,34 +46,58 @@ def ansi_to_html(text):
     log.debug("ANSI conversion completed.")
     return text
 
-def get_llm(llm="OpenAI gpt-4", temperature=0.5):
-    """Get the selected_llm model."""
-    log.info("Fetching LLM model.", selected_llm=llm, temperature=temperature)
+_token_encoding = None
+_token_encoding_loaded = False
+
+
+def _get_token_encoding():
+    """Load the tiktoken encoding once; returns None when it is unavailable (e.g. offline)."""
+    global _token_encoding, _token_encoding_loaded
+    if not _token_encoding_loaded:
+        _token_encoding_loaded = True
+        try:
+            import tiktoken
+
+            _token_encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            log.warning("tiktoken encoding unavailable, using approximate token counts.", error=str(e))
+            _token_encoding = None
+    return _token_encoding
+
+
+def count_tokens(text) -> int:
+    """Count (or approximate, ~4 chars per token) the tokens in a piece of text."""
+    text = str(text or "")
+    encoding = _get_token_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+def count_message_tokens(messages) -> int:
+    """Count tokens for a list of chat messages, including a small per-message overhead."""
+    return sum(count_tokens(message.content) + 4 for message in messages)
+
+
+def get_llm(llm="OpenAI gpt-4", temperature=0.5, task="agent"):
+    """Get the selected_llm model, routed with latency/error-aware failover."""
+    log.info("Fetching LLM model.", selected_llm=llm, temperature=temperature, task=task)
 
     # Grab API keys from Streamlit session state or fallback to env vars
     openai_key = st.session_state.get("OPENAI_API_KEY", settings.OPENAI_API_KEY)
     groq_key = st.session_state.get("GROQ_API_KEY", settings.GROQ_API_KEY)
 
     try:
-        if llm == "OpenAI gpt-4":
-            selected_llm = ChatOpenAI(api_key=openai_key, model="gpt-4", temperature=temperature)
-        elif llm == "OpenAI gpt-4o-mini":
-            selected_llm = ChatOpenAI(api_key=openai_key, model="gpt-4o-mini", temperature=temperature)
-        elif llm == "OpenAI gpt-3.5-turbo":
-            selected_llm = ChatOpenAI(api_key=openai_key, model="gpt-3.5-turbo", temperature=temperature)
-        elif llm == "llama-3.3-70b-versatile":
-            selected_llm = ChatGroq(api_key=groq_key, model="llama-3.3-70b-versatile", temperature=temperature)
-        elif llm == "llama3-70b-8192":
-            selected_llm = ChatGroq(api_key=groq_key, model="llama3-70b-8192", temperature=temperature)
-        else:
-            selected_llm = ChatOpenAI(api_key=openai_key, model="gpt-4", temperature=0.5)
-            log.warning("LLM model not recognized, defaulting to GPT-4.")
-
+        selected_llm = RoutedChatModel(
+            model_name=llm,
+            temperature=temperature,
+            task=task,
+            openai_api_key=openai_key,
+            groq_api_key=groq_key,
+        )
         log.info("Successfully initialized LLM.", model=llm)
         return selected_llm
 
     except Exception as e:
         log.error("Error initializing LLM.", error=str(e))
         return None
-
-
@@ -0,0 +1,311 @@
+"""
+Offline end-to-end benchmarks for the agent stack.
+
+Drives CfAgent, IraAgent, PromptSuggester, the local suggestion engine and DIRECT mode through representative
+scenarios with ScriptedChatModel (fixed LLM latency) and in-process DB/HTTP
+stand-ins, so the time and memory spent *around* the LLM can be measured and
+guarded without provider keys.
+
+Run from the repository root:
+
+    python -m benchmarks.agent_benchmarks [--runs 5] [--llm-latency 0.05]
+        [--thresholds benchmarks/thresholds.json] [--baseline FILE] [--save FILE] [--verbose]
+
+Exits non-zero when a scenario exceeds its threshold in thresholds.json, or
+regresses by more than --max-regression against a saved baseline.
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+import streamlit as st
+from langchain_core.messages import AIMessage, HumanMessage
+from core.config import settings
+from benchmarks.fixtures import install_offline_backends
+from benchmarks.scripted_chat_model import ScriptedChatModel
+
+install_offline_backends()
+
+from agents.agent_runner import agent_runner  # noqa: E402  (after the offline backends are installed)
+from agents.cloud_foundry_agent import CfAgent  # noqa: E402
+from agents.ira_agent import IraAgent  # noqa: E402
+from agents.prompt_suggester import PromptSuggester  # noqa: E402
+from agents.suggestion_engine import local_suggestions  # noqa: E402
+from backend.knowledge_base import get_cf_agent_context, get_ira_agent_context  # noqa: E402
+from backend.model_router import MODEL_SPECS, RoutedChatModel, model_router  # noqa: E402
+from backend.usage_tracker import UsageCallbackHandler  # noqa: E402
+from frontend.chat_window import ChatWindow  # noqa: E402
+
+BENCH_MODEL = "llama-3.3-70b-versatile"
+BENCH_TEMPERATURE = 0.5
+
+
+def routed(scripted: ScriptedChatModel) -> RoutedChatModel:
+    """A RoutedChatModel whose every candidate is `scripted`, so routing and scheduling are measured too."""
+    for name in MODEL_SPECS:
+        model_router._models[(name, BENCH_TEMPERATURE, "", "")] = scripted
+    return RoutedChatModel(model_name=BENCH_MODEL, temperature=BENCH_TEMPERATURE)
+
+
+def _reset_session(ui_context: str):
+    for key in list(st.session_state.keys()):
+        del st.session_state[key]
+    st.session_state.user_id = "bench-user"
+    st.session_state.ui_context = ui_context
+    st.session_state.selected_llm_name = BENCH_MODEL
+
+
+# --- Scenarios: each returns a callable that performs one turn and returns the answer ---
+
+def cf_info_lookup(latency, token_latency):
+    scripted = ScriptedChatModel(latency_seconds=latency, token_latency_seconds=token_latency, script=[
+        {"tool_calls": [{"name": "get_application_information", "args": {"application": "payments-api"}}]},
+        {"content": "payments-api runs in org pay-org, space prod on site po-r2."},
+    ])
+    agent = CfAgent(routed(scripted))
+
+    def turn(callbacks):
+        scripted.reset()
+        _reset_session("CF")
+        context = get_cf_agent_context("where does payments-api run?", [])
+        return agent.interact("where does payments-api run?", context, chat_history=[], callbacks=callbacks)
+    return turn
+
+
+def cf_health_parallel_tools(latency, token_latency):
+    scripted = ScriptedChatModel(latency_seconds=latency, token_latency_seconds=token_latency, script=[
+        {"tool_calls": [{"name": "get_application_information", "args": {"application": "invoice-service"}}]},
+        {"tool_calls": [
+            {"name": "check_application_health", "args": {
+                "application": "invoice-service", "group_name": "billing", "cloud_foundry_site": site,
+                "cf_organization": "bill-org", "cf_space": "prod"}}
+            for site in ("po-r2", "po-r3")
+        ]},
+        {"content": "invoice-service is healthy on po-r2 and po-r3."},
+    ])
+    agent = CfAgent(routed(scripted))
+    history = [HumanMessage(content="hi"), AIMessage(content="Hello, how can I help?")]
+
+    def turn(callbacks):
+        scripted.reset()
+        _reset_session("CF")
+        user_input = "is invoice-service healthy on all its sites?"
+        context = get_cf_agent_context(user_input, history)
+        return agent.interact(user_input, context, chat_history=history, callbacks=callbacks)
+    return turn
+
+
+def cf_fast_path_health(latency, token_latency):
+    agent = CfAgent(routed(ScriptedChatModel(script=[{"content": "unused"}])))
+
+    def turn(callbacks):
+        _reset_session("CF")
+        user_input = "check health for application payments-api at cf site po-r2 for the group payments"
+        return agent.interact(user_input, "", chat_history=[], callbacks=callbacks)
+    return turn
+
+
+def cf_streamed_via_runner(latency, token_latency):
+    scripted = ScriptedChatModel(latency_seconds=latency, token_latency_seconds=token_latency, script=[
+        {"tool_calls": [{"name": "get_application_information", "args": {"application": "billing-ui"}}]},
+        {"content": "billing-ui runs in org bill-org, space prod on sites po-r2 and po-r3."},
+    ])
+    agent = CfAgent(routed(scripted))
+
+    def turn(callbacks):
+        scripted.reset()
+        _reset_session("CF")
+        user_input = "where does billing-ui run?"
+        context = get_cf_agent_context(user_input, [])
+        run = agent_runner.submit(lambda run: agent.stream(user_input, context, chat_history=[], callbacks=callbacks))
+        run.future.result()
+        return run.output()
+    return turn
+
+
+def ira_incident_lookup(latency, token_latency):
+    scripted = ScriptedChatModel(latency_seconds=latency, token_latency_seconds=token_latency, script=[
+        {"tool_calls": [{"name": "get_incident_history", "args": {"query": "device offline after reset"}}]},
+        {"content": "One similar incident (FAH_RESET_201) was not resolved by the gateway reset."},
+    ])
+    agent = IraAgent(routed(scripted))
+
+    def turn(callbacks):
+        scripted.reset()
+        _reset_session("IRA")
+        return agent.interact("any past incidents of devices staying offline after a reset?", get_ira_agent_context(), chat_history=[], callbacks=callbacks)
+    return turn
+
+
+def prompt_suggestions(latency, token_latency):
+    scripted = ScriptedChatModel(latency_seconds=latency, script=[
+        {"tool_calls": [{"name": "SuggestionBatch", "args": {"contexts": [
+            {"context": "CF", "suggestions": ["What tools are available?", "Get info for app payments-api", "Check health of billing-ui"]},
+        ]}}]},
+    ])
+    llm = routed(scripted)
+
+    def turn(callbacks):
+        scripted.reset()
+        _reset_session("CF")
+        return "\n".join(PromptSuggester(llm=llm).generate(callbacks=callbacks))
+    return turn
+
+
+def batched_suggestions(latency, token_latency):
+    scripted = ScriptedChatModel(latency_seconds=latency, script=[
+        {"tool_calls": [{"name": "SuggestionBatch", "args": {"contexts": [
+            {"context": "CF", "suggestions": ["What tools are available?", "Get info for app payments-api"]},
+            {"context": "IRA", "suggestions": ["What tools are available?", "Show recent incident history"]},
+        ]}}]},
+    ])
+    llm = routed(scripted)
+    histories = {"CF": [HumanMessage(content="where does payments-api run?")], "IRA": []}
+
+    def turn(callbacks):
+        scripted.reset()
+        _reset_session("CF")
+        batch = PromptSuggester(llm=llm).generate_batch(histories, callbacks=callbacks)
+        return "\n".join(suggestion for suggestions in batch.values() for suggestion in suggestions or [])
+    return turn
+
+
+def local_suggestions_cold(latency, token_latency):
+    history = [HumanMessage(content="restart application payments-api at cf site po-r2 for the group payments"),
+               AIMessage(content="payments-api restarted.")]
+
+    def turn(callbacks):
+        _reset_session("CF")
+        st.session_state.chat_history_cf = list(history)
+        return "\n".join(local_suggestions())
+    return turn
+
+
+def direct_chat(latency, token_latency):
+    scripted = ScriptedChatModel(latency_seconds=latency, token_latency_seconds=token_latency, script=[
+        {"content": "Cloud Foundry is a platform as a service for deploying and running applications."},
+    ])
+    llm = routed(scripted)
+    window = ChatWindow()
+
+    def turn(callbacks):
+        scripted.reset()
+        _reset_session("DIRECT")
+        st.session_state.llm = llm
+        return "".join(window._get_direct_response("what is cloud foundry?", [], callbacks=callbacks))
+    return turn
+
+
+SCENARIOS = {
+    "cf_info_lookup": cf_info_lookup,
+    "cf_health_parallel_tools": cf_health_parallel_tools,
+    "cf_fast_path_health": cf_fast_path_health,
+    "cf_streamed_via_runner": cf_streamed_via_runner,
+    "ira_incident_lookup": ira_incident_lookup,
+    "prompt_suggestions": prompt_suggestions,
+    "batched_suggestions": batched_suggestions,
+    "local_suggestions_cold": local_suggestions_cold,
+    "direct_chat": direct_chat,
+}
+
+
+def run_scenario(name: str, runs: int, latency: float, token_latency: float) -> dict:
+    turn = SCENARIOS[name](latency, token_latency)
+    # Warm-up with the same callbacks: imports, prompt loading, first-use caches.
+    turn([UsageCallbackHandler(component="benchmark", context=name, model=BENCH_MODEL)])
+
+    totals, llm_times, tool_times, peaks = [], [], [], []
+    llm_calls = 0
+    for _ in range(runs):
+        usage = UsageCallbackHandler(component="benchmark", context=name, model=BENCH_MODEL)
+        tracemalloc.start()
+        started = time.perf_counter()
+        answer = turn([usage])
+        totals.append(time.perf_counter() - started)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        if not answer:
+            raise RuntimeError(f"Scenario {name} returned an empty answer.")
+        llm_times.append(sum(call["seconds"] for call in usage.turn.llm_calls))
+        tool_times.append(sum(call["seconds"] for call in usage.turn.tool_calls))
+        llm_calls = len(usage.turn.llm_calls)
+
+    total = statistics.median(totals)
+    llm = statistics.median(llm_times)
+    return {
+        "total_ms": round(total * 1000, 2),
+        "llm_ms": round(llm * 1000, 2),
+        "tool_ms": round(statistics.median(tool_times) * 1000, 2),
+        # Everything that is not the (scripted) model: agent loop, prompt building, tools, glue.
+        "overhead_ms": round((total - llm) * 1000, 2),
+        "peak_kb": round(max(peaks) / 1024, 1),
+        "llm_calls": llm_calls,
+    }
+
+
+def check(results: dict, thresholds: dict, baseline: dict, max_regression: float) -> list:
+    failures = []
+    for name, result in results.items():
+        for metric, limit in thresholds.get(name, {}).items():
+            if result[metric] > limit:
+                failures.append(f"{name}: {metric} {result[metric]} > threshold {limit}")
+        for metric in ("overhead_ms", "peak_kb"):
+            previous = baseline.get(name, {}).get(metric)
+            if previous and result[metric] > previous * (1 + max_regression):
+                failures.append(f"{name}: {metric} {result[metric]} regressed > {max_regression:.0%} from baseline {previous}")
+    return failures
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Scripted seconds per LLM call.")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="Scripted seconds per streamed chunk.")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Run only these scenarios.")
+    parser.add_argument("--thresholds", default="benchmarks/thresholds.json")
+    parser.add_argument("--baseline", help="Results JSON from a previous --save to compare against.")
+    parser.add_argument("--max-regression", type=float, default=0.25)
+    parser.add_argument("--save", help="Write the results JSON here.")
+    parser.add_argument("--verbose", action="store_true", help="Show application logs instead of discarding them.")
+    args = parser.parse_args(argv)
+
+    if not args.verbose:
+        # Logs are still formatted (that cost is part of the overhead) but written nowhere.
+        for handler in logging.getLogger().handlers:
+            handler.setStream(open(os.devnull, "w"))
+        logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+    # Benchmarks measure our overhead, not provider quotas.
+    settings.LLM_RATE_LIMITS = {provider: {"requests_per_minute": 10**6, "tokens_per_minute": 10**9} for provider in ("openai", "groq")}
+
+    results = {}
+    for name in args.scenario or SCENARIOS:
+        results[name] = run_scenario(name, args.runs, args.llm_latency, args.token_latency)
+
+    print(f"{'scenario':<28}{'total ms':>10}{'llm ms':>10}{'tool ms':>10}{'overhead ms':>13}{'peak KB':>10}{'llm calls':>11}")
+    for name, r in results.items():
+        print(f"{name:<28}{r['total_ms']:>10}{r['llm_ms']:>10}{r['tool_ms']:>10}{r['overhead_ms']:>13}{r['peak_kb']:>10}{r['llm_calls']:>11}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    with open(args.thresholds, "r", encoding="utf-8") as f:
+        thresholds = json.load(f)
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    failures = check(results, thresholds, baseline, args.max_regression)
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+import time
+import backend.chatops_service as chatops_service
+import backend.knowledge_base as knowledge_base
+
+# Entitlements of the benchmark user (mirrors the chatops_* tables).
+GROUPS = {
+    "payments": {"sites": ["po-r2"], "apps": ["payments-api", "payments-worker"], "org": "pay-org", "space": "prod"},
+    "billing": {"sites": ["po-r2", "po-r3"], "apps": ["invoice-service", "billing-ui"], "org": "bill-org", "space": "prod"},
+}
+TASKS = ["RESTART", "START", "STOP", "HEALTH"]
+
+
+class InMemoryDB:
+    """Answers the knowledge_base queries from GROUPS with a fixed per-query latency."""
+
+    def __init__(self, latency_seconds: float = 0.002):
+        self.latency_seconds = latency_seconds
+        self.queries = 0
+
+    def execute_query(self, query, params=None, fetch=True, dict_cursor=False):
+        time.sleep(self.latency_seconds)
+        self.queries += 1
+        if "chatops_tasks" in query:
+            return [{"cloud_foundry_task": task, "task_name": task} for task in TASKS]
+        if "COUNT(1)" in query:
+            _, group_name, app_name = params
+            group = GROUPS.get(group_name.lower())
+            return [{"cnt": int(bool(group) and any(app in app_name.lower() for app in group["apps"]))}]
+        if "b.cf_organization" in query:
+            _, application = params
+            return [
+                {"application": app, "group_name": name, "cf_site": site,
+                 "cf_organization": group["org"], "cf_space": group["space"]}
+                for name, group in GROUPS.items()
+                for app in group["apps"] if app in application.lower()
+                for site in group["sites"]
+            ]
+        if "cloud_foundry_site" in query:
+            return [{"group_name": name, "cloud_foundry_site": site} for name, group in GROUPS.items() for site in group["sites"]]
+        if "b.application" in query:
+            return [{"group_name": name, "application": app} for name, group in GROUPS.items() for app in group["apps"]]
+        if "group_name" in query:
+            return [{"group_name": name} for name in GROUPS]
+        return []
+
+
+def install_offline_backends(db_latency_seconds: float = 0.002, http_latency_seconds: float = 0.01) -> InMemoryDB:
+    """Points the DB and chatops-service calls at in-process stand-ins with fixed latencies."""
+    db = InMemoryDB(db_latency_seconds)
+    knowledge_base.db = db
+
+    def _make_chatops_request(method, endpoint_url, payload=None, run_async=False):
+        time.sleep(http_latency_seconds)
+        return {"status": "success", "message": f"{method} {endpoint_url} accepted.", "payload": payload}
+
+    chatops_service._make_chatops_request = _make_chatops_request
+    return db
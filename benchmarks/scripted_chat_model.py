@@ -0,0 +1,110 @@
+import itertools
+import json
+import threading
+import time
+from typing import Any, Iterator, List, Optional
+from pydantic import PrivateAttr
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+
+class ScriptedChatModel(BaseChatModel):
+    """
+    Deterministic, offline stand-in for the provider chat models.
+
+    Replays `script` one step per call. A step is either {"content": "..."} for a plain
+    answer or {"tool_calls": [{"name": ..., "args": {...}}]} for a tool-calling turn;
+    when the script runs out the last step repeats. `latency_seconds` is slept before
+    every reply and `token_latency_seconds` between streamed chunks, so runs mimic a
+    provider's timing without network access. Usage metadata is reported (estimated
+    at ~4 chars per token) like the real providers do.
+    """
+
+    script: List[dict]
+    latency_seconds: float = 0.0
+    token_latency_seconds: float = 0.0
+    model_name: str = "scripted"
+
+    _cursor: int = PrivateAttr(default=0)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+    _call_ids: Any = PrivateAttr(default_factory=lambda: itertools.count(1))
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-chat-model"
+
+    def reset(self):
+        with self._lock:
+            self._cursor = 0
+
+    @property
+    def calls(self) -> int:
+        return self._cursor
+
+    def bind_tools(self, tools, **kwargs):
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+    def _next_message(self, messages: List[BaseMessage]) -> AIMessage:
+        with self._lock:
+            step = self.script[min(self._cursor, len(self.script) - 1)]
+            self._cursor += 1
+            tool_calls = [
+                {"name": call["name"], "args": call.get("args", {}), "id": f"call_{next(self._call_ids)}"}
+                for call in step.get("tool_calls", [])
+            ]
+        content = step.get("content", "")
+        prompt_tokens = sum(len(str(message.content)) for message in messages) // 4
+        completion_tokens = (len(content) + len(json.dumps(tool_calls))) // 4
+        return AIMessage(
+            content=content,
+            tool_calls=tool_calls,
+            usage_metadata={
+                "input_tokens": prompt_tokens,
+                "output_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+            response_metadata={"model_name": self.model_name},
+        )
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        time.sleep(self.latency_seconds)
+        message = self._next_message(messages)
+        return ChatResult(generations=[ChatGeneration(message=message)], llm_output={"model_name": self.model_name})
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.latency_seconds)
+        message = self._next_message(messages)
+        if message.tool_calls:
+            yield ChatGenerationChunk(message=AIMessageChunk(
+                content="",
+                tool_call_chunks=[
+                    {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": i}
+                    for i, call in enumerate(message.tool_calls)
+                ],
+            ))
+        else:
+            for word in message.content.split(" "):
+                chunk = ChatGenerationChunk(message=AIMessageChunk(content=word + " "))
+                if run_manager:
+                    run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                yield chunk
+                time.sleep(self.token_latency_seconds)
+        yield ChatGenerationChunk(message=AIMessageChunk(
+            content="",
+            usage_metadata=message.usage_metadata,
+            response_metadata=message.response_metadata,
+        ))
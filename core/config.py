@@ -45,6 +45,103 @@ class Settings(BaseSettings):
     API_URL_CHATOPS_CF_STOP: str = ""
     API_URL_CHATOPS_CF_CHECK_HEALTH: str = ""
 
+    # Chat history windowing (per selected LLM name)
+    HISTORY_VERBATIM_TURNS: int = 3
+    HISTORY_MESSAGE_MAX_TOKENS: int = 400
+    HISTORY_SUMMARY_MAX_WORDS: int = 150
+    HISTORY_SUMMARY_BATCH_TURNS: int = 2  # Aged-out turns folded into the summary per (background) LLM call.
+    HISTORY_SUMMARY_POOL_SIZE: int = 4
+    HISTORY_SUMMARY_WAIT_SECONDS: float = 30.0  # How long a finished turn waits for its summary job.
+    HISTORY_TOKEN_BUDGET_DEFAULT: int = 2000
+    HISTORY_TOKEN_BUDGETS: dict = {
+        "OpenAI gpt-4": 1500,
+        "OpenAI gpt-4o-mini": 4000,
+        "OpenAI gpt-3.5-turbo": 1500,
+        "llama-3.3-70b-versatile": 3000,
+        "llama3-70b-8192": 1500,
+    }
+
+    # LLM routing / failover (keys are the UI model names)
+    LLM_ROUTER_WINDOW_SECONDS: int = 300
+    LLM_ROUTER_MIN_SAMPLES: int = 3
+    LLM_ERROR_RATE_BUDGET: float = 0.5
+    LLM_LATENCY_BUDGET_DEFAULT: float = 20.0
+    LLM_LATENCY_BUDGETS: dict = {
+        "llama-3.3-70b-versatile": 10.0,
+        "llama3-70b-8192": 10.0,
+        "llama-3.1-8b-instant": 5.0,
+    }
+    LLM_FALLBACK_CHAINS: dict = {
+        "llama-3.3-70b-versatile": ["llama3-70b-8192", "OpenAI gpt-4o-mini"],
+        "llama3-70b-8192": ["llama-3.3-70b-versatile", "OpenAI gpt-4o-mini"],
+        "OpenAI gpt-4": ["OpenAI gpt-4o-mini", "llama-3.3-70b-versatile"],
+        "OpenAI gpt-4o-mini": ["OpenAI gpt-3.5-turbo", "llama-3.3-70b-versatile"],
+        "OpenAI gpt-3.5-turbo": ["OpenAI gpt-4o-mini", "llama-3.3-70b-versatile"],
+    }
+    # Lightweight tasks routed to a cheaper/faster model first
+    LLM_TASK_MODELS: dict = {
+        "suggestion": "llama-3.1-8b-instant",
+        "summary": "llama-3.1-8b-instant",
+    }
+
+    # LLM request scheduling (process-wide rate limits per provider model)
+    LLM_RATE_LIMITS: dict = {
+        "openai": {"requests_per_minute": 500, "tokens_per_minute": 150000},
+        "groq": {"requests_per_minute": 30, "tokens_per_minute": 60000},
+    }
+    LLM_MODEL_RATE_LIMITS: dict = {}  # UI model name -> overrides of the provider limits
+    LLM_TASK_PRIORITIES: dict = {"agent": 0, "direct": 0, "summary": 1, "suggestion": 2}  # Lower runs first
+    LLM_COMPLETION_TOKEN_ESTIMATE: int = 500
+    LLM_SCHEDULER_MAX_WAIT_SECONDS: float = 30.0
+    LLM_SCHEDULER_BACKGROUND_MAX_WAIT_SECONDS: float = 10.0
+    LLM_SCHEDULER_SHED_QUEUE_DEPTH: int = 4
+    LLM_SCHEDULER_RATE_LIMIT_COOLDOWN_SECONDS: float = 20.0
+
+    # Agent execution
+    AGENT_TOOL_POOL_SIZE: int = 8
+    AGENT_FACTORY_MAX_ENTRIES: int = 16
+    TOOL_CACHE_TTL_SECONDS: int = 600
+    AGENT_RUNNER_POOL_SIZE: int = 16
+    AGENT_RUN_POLL_SECONDS: float = 0.5
+    TOOL_PREFETCH_ENABLED: bool = True  # Start lookups for apps named in the message alongside the first LLM call.
+    TOOL_PREFETCH_MAX_APPS: int = 2
+    TOOL_PREFETCH_WAIT_SECONDS: float = 10.0
+    TOOL_PREFETCH_POOL_SIZE: int = 4  # Separate from the tool pool, whose calls wait on prefetched results.
+    SUGGESTION_POOL_SIZE: int = 4
+    SUGGESTION_POLL_SECONDS: float = 1.0
+    SUGGESTION_HISTORY_MESSAGES: int = 6  # Recent messages the local suggestions are built from.
+    SUGGESTION_CACHE_MAX_ENTRIES: int = 32
+    SUGGESTION_BATCH_CONTEXTS: list = ["CF", "IRA"]  # Contexts with a suggestion panel (DIRECT has none).
+
+    # IRA retrieval
+    IRA_DATA_CHECK_INTERVAL_SECONDS: float = 2.0  # How often data files are stat()ed for changes.
+    IRA_DATA_MMAP_MIN_BYTES: int = 1024 * 1024  # Files at least this large are read through mmap.
+    IRA_INCIDENT_TOP_K: int = 5
+    IRA_INCIDENT_MAX_TOP_K: int = 20
+    IRA_INVESTIGATION_INDEX_DIR: str = "data/index/investigations"
+    IRA_INVESTIGATION_TOP_K: int = 4  # Investigations (briefs) per answer.
+    IRA_INVESTIGATION_MAX_TOP_K: int = 12
+    IRA_INVESTIGATION_MIN_SCORE: float = 0.05
+    IRA_BRIEFS_FILE: str = "data/ira_investigation_briefs.json"  # Written by `python -m backend.investigation_briefs`.
+    IRA_BRIEF_BATCH_SIZE: int = 4  # Investigations summarized per LLM call.
+    IRA_BRIEF_MAX_CONCURRENCY: int = 3
+    IRA_SIMILARITY_INDEX_DIR: str = "data/index/similarity"
+    IRA_SIMILARITY_PERMUTATIONS: int = 128
+    IRA_SIMILARITY_BANDS: int = 64  # 2 rows per band: candidates from about 0.15 estimated Jaccard up.
+    IRA_SIMILAR_TOP_K: int = 5
+    IRA_SIMILAR_MIN_SCORE: float = 0.05
+    IRA_PLATFORM_MAX_SECTIONS: int = 2  # Platform document sections returned per request.
+    IRA_METRICS_PERCENTILES: list = [50, 90]  # Resolution-time percentiles reported by default.
+    IRA_METRICS_MAX_GROUPS: int = 20
+    IRA_INGEST_DIR: str = "data/ingest"  # inbox/*.jsonl drops, journal.jsonl and checkpoint.json
+    IRA_INGEST_POLL_SECONDS: float = 5.0
+
+    # CF agent context
+    CF_ENTITLEMENTS_TTL_SECONDS: int = 600
+    CF_CONTEXT_HISTORY_MESSAGES: int = 4  # Recent messages scanned for relevant groups/apps.
+    CF_CONTEXT_MAX_GROUP_NAMES: int = 40
+    CF_CONTEXT_MAX_APPS_PER_GROUP: int = 25
+
     def model_post_init(self, __context):
         # Set Azure REDIRECT_URI based on OS
         if not self.REDIRECT_URI:
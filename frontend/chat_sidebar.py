@@ -3,7 +3,15 @@ import structlog
 from backend.utilities import ansi_to_html, get_llm
 from agents.cloud_foundry_agent import CfAgent
 from agents.ira_agent import IraAgent
-from agents.prompt_suggester import PromptSuggester
+from agents.suggestion_engine import session_suggestions
+from agents.suggestion_refresher import (
+    collect_suggestions,
+    start_suggestion_refresh,
+    suggestion_refresh_pending,
+)
+from core.config import settings
+from backend.usage_tracker import get_session_usage
+from backend.llm_scheduler import llm_scheduler
 
 
 log = structlog.get_logger()
@@ -102,6 +110,45 @@ class ChatSidebar:
                     unsafe_allow_html=True
                 )
 
+    def show_usage_summary(self):
+        usage = get_session_usage()
+        if not usage:
+            return
+        with st.sidebar:
+            st.markdown("---")
+            st.markdown("<h3 style=\"color: #2E3A87;\">📊 Session Usage:</h3>", unsafe_allow_html=True)
+            rows = [
+                {
+                    "Model": entry["model"],
+                    "Context": entry["context"],
+                    "Turns": entry["turns"],
+                    "Tokens in/out": f"{entry['prompt_tokens']}/{entry['completion_tokens']}",
+                    "LLM s/call": round(entry["llm_seconds"] / max(entry["llm_calls"], 1), 2),
+                    "Tools s": round(entry["tool_seconds"], 2),
+                }
+                for entry in usage
+            ]
+            st.dataframe(rows, hide_index=True, use_container_width=True)
+
+            scheduler_metrics = llm_scheduler.metrics()
+            if scheduler_metrics:
+                with st.expander("LLM scheduler (all sessions)"):
+                    st.dataframe(
+                        [
+                            {
+                                "Model": entry["model"],
+                                "Queued": entry["queue_depth"],
+                                "Avg wait s": entry["avg_wait_seconds"],
+                                "p95 wait s": entry["p95_wait_seconds"],
+                                "Shed": entry["shed"],
+                                "429s": entry["rate_limited"],
+                            }
+                            for entry in scheduler_metrics
+                        ],
+                        hide_index=True,
+                        use_container_width=True,
+                    )
+
     def ui_context_selector(self) -> str: 
         log.info("Rendering ui_context_selector")
         with st.sidebar:
@@ -133,44 +180,48 @@ class ChatSidebar:
                 st.session_state.current_suggestion_to_edit = ""
                 st.session_state.injected_user_message = None 
                 # --- End reset modal state ---
-                st.session_state.agent_needs_reinit = True # Flag for agent re-init on context change
+                # No agent re-init needed: agents are shared per model config (agents.agent_factory).
 
-                if st.session_state.get("llm"): 
-                    suggester = PromptSuggester(llm=st.session_state.llm)
-                    st.session_state.suggested_prompts = suggester.generate()
-                else:
-                    st.session_state.suggested_prompts = ["LLM not ready. Please check settings."]
+                # A pending refresh covers every context, so it keeps running across the switch.
+                st.session_state.suggested_prompts = session_suggestions()
                 st.rerun()
             return st.session_state.ui_context # Return current context from session state
 
     def show_suggestions(self): 
-        # Only show suggestions if not in DIRECT mode and LLM is available
-        if st.session_state.get("ui_context") == "DIRECT" or not st.session_state.get("llm"):
+        # Only show suggestions if not in DIRECT mode (the LLM is only needed to refine them)
+        if st.session_state.get("ui_context") == "DIRECT":
             return
 
         with st.sidebar:
             st.markdown("---")
             st.markdown("<h3 style=\"color: #2E3A87;\">💡 AI Suggested Prompts:</h3>", unsafe_allow_html=True)
 
-            # Generate suggestions if not already present (e.g., on first load or after context change)
+            # Build suggestions if not already present (e.g., on first load); no LLM call.
             if not st.session_state.get("suggested_prompts"):
-                if st.session_state.get("llm"):
-                    suggester = PromptSuggester(llm=st.session_state.llm)
-                    st.session_state.suggested_prompts = suggester.generate()
-                else:
-                    st.session_state.suggested_prompts = ["LLM not ready for suggestions."]
-
+                st.session_state.suggested_prompts = session_suggestions()
 
             if st.button("🔄 Refresh Suggestions", key="refresh_suggestions_sidebar_button_main_key"):
                 st.session_state.show_suggestion_modal = False 
                 st.session_state.current_suggestion_to_edit = ""
-                if st.session_state.get("llm"):
-                    suggester = PromptSuggester(llm=st.session_state.llm)
-                    st.session_state.suggested_prompts = suggester.generate()
-                    st.toast("New suggestions generated!")
+                if start_suggestion_refresh(st.session_state.get("llm")):
+                    st.toast("Refining suggestions...")
                 else:
-                    st.toast("LLM not available to generate suggestions.")
-                st.rerun() 
+                    st.toast("LLM not available to refine suggestions.")
+
+            self._suggestion_list()
+
+    def _suggestion_list(self):
+        """Suggestion buttons; polls while a background generation is pending, without blocking the page."""
+        collect_suggestions()
+        polling = suggestion_refresh_pending()
+
+        @st.fragment(run_every=settings.SUGGESTION_POLL_SECONDS if polling else None)
+        def _render():
+            if polling and (collect_suggestions() or not suggestion_refresh_pending()):
+                # Rerun the page once so the fragment stops polling.
+                st.rerun()
+            if suggestion_refresh_pending():
+                st.caption("⏳ Refining suggestions...")
 
             suggestions_list = st.session_state.get("suggested_prompts", [])
             
@@ -181,4 +232,6 @@ class ChatSidebar:
                     st.session_state.current_suggestion_to_edit = prompt_text
                     st.session_state.show_suggestion_modal = True # Flag for chat_window
                     # --- END MODAL TRIGGER LOGIC ---
-                    st.rerun() # Rerun to allow chat_window to display the modal
\ No newline at end of file
+                    st.rerun() # Rerun to allow chat_window to display the modal
+
+        _render()
\ No newline at end of file
@@ -5,7 +5,11 @@ import os, json, platform
 from langchain_core.messages import AIMessage, HumanMessage
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
-from agents.prompt_suggester import PromptSuggester
+from agents.suggestion_engine import session_suggestions
+from agents.suggestion_refresher import cancel_suggestion_refresh
+from backend.usage_tracker import UsageCallbackHandler, record_turn
+from agents.agent_runner import AgentRun, CancellationCallbackHandler, agent_runner
+from core.config import settings
 
 log = structlog.get_logger()
 
@@ -48,10 +52,16 @@ class ChatWindow:
             with st.chat_message(role): 
                 st.write(str(msg.content)) 
 
+        # An agent turn still running off-thread: poll it until it completes or is cancelled.
+        active_run_key = f"{history_key}_active_run"
+        run_in_progress = st.session_state.get(active_run_key) is not None
+        if run_in_progress:
+            self._render_active_run(history_key, active_run_key)
+
         processed_input_this_run = None
 
-        # 2. Process injected message (from modal's submit)
-        if st.session_state.get("injected_user_message"): 
+        # 2. Process injected message (from modal's submit); held back while a run is in progress
+        if st.session_state.get("injected_user_message") and not run_in_progress: 
             processed_input_this_run = st.session_state.pop("injected_user_message")
             log.info(f"Processing injected message for {history_key}: {processed_input_this_run}")
             if st.session_state.get("show_suggestion_modal", False):
@@ -89,7 +99,7 @@ class ChatWindow:
                 st.markdown("---")
 
         # 4. Regular chat input (st.chat_input)
-        chat_input_is_disabled = st.session_state.get("show_suggestion_modal", False)
+        chat_input_is_disabled = st.session_state.get("show_suggestion_modal", False) or run_in_progress
         
         if not processed_input_this_run:
             # input_key here is the one passed from show_agent_window/show_direct_window
@@ -104,27 +114,73 @@ class ChatWindow:
         # 5. Process the determined input
         if processed_input_this_run:
             st.session_state[history_key].append(HumanMessage(content=processed_input_this_run))
-            
+            # Suggestions for the previous turn are stale now; a fresh set starts once this turn completes.
+            cancel_suggestion_refresh()
+
+            response = handle_response_fn(processed_input_this_run)
+            if isinstance(response, AgentRun):
+                # Agent turns run off the script thread; the next rerun polls the run.
+                st.session_state[active_run_key] = response
+                st.rerun()
+
             with st.chat_message("ai"): 
-                with st.spinner("Processing..."):
-                    try:
-                        response = handle_response_fn(processed_input_this_run)
-                    except Exception as e:
-                        log.error(f"Error in handle_response_fn for {history_key}", error=str(e), exc_info=True)
-                        response = f"⚠️ An error occurred: {str(e)}"
-                    st.write(response)
-            st.session_state[history_key].append(AIMessage(content=response))
-            
-            if st.session_state.get("llm"):
                 try:
-                    suggester = PromptSuggester(llm=st.session_state.llm)
-                    st.session_state.suggested_prompts = suggester.generate()
+                    if isinstance(response, str):
+                        st.write(response)
+                    else:
+                        # Streaming handlers return an iterator of text chunks; render them as they arrive.
+                        response = st.write_stream(response)
                 except Exception as e:
-                    log.warning("Failed to refresh suggestions post-interaction", error=str(e))           
-            st.rerun() 
+                    log.error(f"Error in handle_response_fn for {history_key}", error=str(e), exc_info=True)
+                    response = f"⚠️ An error occurred: {str(e)}"
+                    st.write(response)
+            self._complete_turn(history_key, response)
+
+    def _complete_turn(self, history_key: str, response: str):
+        st.session_state[history_key].append(AIMessage(content=response))
+
+        # Refined suggestions only survive while this context's history is unchanged; otherwise built locally.
+        st.session_state.suggested_prompts = session_suggestions()
+        st.rerun()
+
+    def _render_active_run(self, history_key: str, active_run_key: str):
+        """Shows the running agent turn with a Cancel button, re-rendering until it finishes."""
+
+        @st.fragment(run_every=settings.AGENT_RUN_POLL_SECONDS)
+        def _poll_run():
+            run = st.session_state.get(active_run_key)
+            if run is None:
+                return
+            with st.chat_message("ai"):
+                tool_lines = []
+                for event in run.snapshot():
+                    if event.kind == "tool_start":
+                        tool_lines.append(f"🔧 **{event.tool}** `{event.content[:200]}`")
+                    elif event.kind == "tool_end":
+                        tool_lines.append(f"✅ **{event.tool}** returned: {event.content[:300]}")
+                if tool_lines:
+                    with st.status(f"Running tools ({len(tool_lines)} steps)...", expanded=False):
+                        st.markdown("\n\n".join(tool_lines))
+                if run.done:
+                    st.markdown(run.output())
+                elif run.cancelled:
+                    # A tool call or LLM request already in flight still finishes; wait for it.
+                    st.markdown("_Cancelling..._")
+                else:
+                    text = run.streamed_text()
+                    st.markdown(f"{text} ▌" if text else "_Processing..._")
+                    if st.button("⏹️ Cancel", key=f"{history_key}_cancel_run_{run.run_id}"):
+                        run.cancel()
+            if run.done:
+                # Recorded only once the worker has stopped, so the turn shows what actually ran.
+                st.session_state.pop(active_run_key, None)
+                self._complete_turn(history_key, run.output())
+
+        _poll_run()
 
     # Updated signature to accept input_widget_key
-    def show_agent_window(self, chat_context: str, history_key: str, input_widget_key: str):
+    def show_agent_window(self, chat_context, history_key: str, input_widget_key: str):
+        """`chat_context` is the agent context string, or a callable (user_input, chat_history) -> str."""
         log.info(f"Rendering agent chat window for {history_key}", user=st.session_state.get("user_name", ("Unknown", ""))[0])
         user_id_tuple_safe = st.session_state.get("user_id", ("N/A",""))
         user_id_display = user_id_tuple_safe[0] if isinstance(user_id_tuple_safe, tuple) else user_id_tuple_safe
@@ -141,11 +197,37 @@ class ChatWindow:
             log.info("Handling agent response", user_input=user_input)
             agent = st.session_state.get("chat_agent")
             if agent:
-                return agent.interact(user_input=user_input, context=chat_context)
+                usage = self._usage_handler("agent")
+                # Agents are shared across sessions; capture this session's state at submit time.
+                chat_history = list(st.session_state.get(history_key, []))
+                user_id = st.session_state.get("user_id")
+                context = chat_context(user_input, chat_history[:-1]) if callable(chat_context) else chat_context
+
+                def run_agent(run):
+                    try:
+                        yield from agent.stream(
+                            user_input=user_input,
+                            context=context,
+                            chat_history=chat_history,
+                            user_id=user_id,
+                            callbacks=[usage, CancellationCallbackHandler(run.cancel_event)],
+                        )
+                    finally:
+                        record_turn(usage.turn)
+
+                return agent_runner.submit(run_agent)
             return "⚠️ Chat agent not available."
         # Pass input_widget_key as input_key to _render_conversation
         self._render_conversation(history_key, input_widget_key, "Type your message here...", handle_agent_response)
 
+    @staticmethod
+    def _usage_handler(component: str) -> UsageCallbackHandler:
+        return UsageCallbackHandler(
+            component=component,
+            context=st.session_state.get("ui_context", "DIRECT"),
+            model=st.session_state.get("selected_llm_name", "unknown"),
+        )
+
     # Updated signature to accept input_widget_key
     def show_direct_window(self, input_widget_key: str): 
         history_key="chat_history_direct"
@@ -162,25 +244,37 @@ class ChatWindow:
             </div>""", unsafe_allow_html=True)
 
         def handle_direct_response(user_input):
+            # Return a generator so _render_conversation writes chunks as they arrive.
+            usage = self._usage_handler("direct")
+            return stream_direct_response(
+                self._get_direct_response(user_input, st.session_state.get(history_key, []), callbacks=[usage]), usage
+            )
+
+        def stream_direct_response(stream, usage):
+            received_text = False
             try:
-                stream = self._get_direct_response(user_input, st.session_state.get(history_key, []))
-                full_response = "".join(list(stream))
-                if not full_response.strip(): # Check if response is empty or just whitespace
+                for chunk in stream:
+                    if chunk.strip():
+                        received_text = True
+                    yield chunk
+                if not received_text: # Check if response is empty or just whitespace
                     log.warning("Direct LLM response was empty.")
-                    return "🤔 The LLM returned an empty response. Please try rephrasing."
-                return full_response
+                    yield "🤔 The LLM returned an empty response. Please try rephrasing."
             except Exception as e:
+                prefix = "\n\n" if received_text else ""
                 error_message = str(e).lower()
                 if "api key" in error_message or "authentication" in error_message or "unauthorized" in error_message:
                     log.error("Invalid API Key detected", error=str(e), exc_info=True) # Add exc_info
-                    return f"🔑 Invalid API Key. Please check your API Key in the sidebar settings. Error: {error_message}"
+                    yield f"{prefix}🔑 Invalid API Key. Please check your API Key in the sidebar settings. Error: {error_message}"
                 else:
                     log.error("Unexpected error in direct response", error=str(e), exc_info=True) # Add exc_info
-                    return f"⚠️ Unexpected error: {error_message}"
+                    yield f"{prefix}⚠️ Unexpected error: {error_message}"
+            finally:
+                record_turn(usage.turn)
         # Pass input_widget_key as input_key to _render_conversation
         self._render_conversation(history_key, input_widget_key, "Type your message here...", handle_direct_response)
 
-    def _get_direct_response(self, user_input: str, chat_history: list): 
+    def _get_direct_response(self, user_input: str, chat_history: list, callbacks: list = None): 
         template = """
         You are a helpful assistant. Answer the following questions considering the history of the conversation:
         Chat history: {chat_history_str}
@@ -205,9 +299,9 @@ class ChatWindow:
             for chunk in chain.stream({
                 "chat_history_str": simple_history_str, 
                 "user_input": user_input,
-            }):
+            }, config={"callbacks": callbacks}):
                 yield chunk
             log.info("Finished streaming direct response from LLM.") # Log after successful stream
         except Exception as e:
             log.error("Error during LLM stream for direct response", error=str(e), exc_info=True)
-            yield f"⚠️ Error communicating with LLM: {str(e)}"
\ No newline at end of file
+            raise # Classified and rendered by the caller's streaming fallback
\ No newline at end of file
@@ -0,0 +1,43 @@
+import threading
+from agents.agent_runner import AgentRun, AgentRunner
+from agents.agent_streaming import AgentEvent
+
+
+def test_cancelled_run_stays_open_and_keeps_completed_tool_results():
+    runner = AgentRunner(max_workers=1)
+    tool_running, release = threading.Event(), threading.Event()
+
+    def run_events(run):
+        yield AgentEvent(kind="tool_start", content="payments-api", tool="restart_application")
+        tool_running.set()
+        release.wait(5)  # The in-flight tool call is not interrupted by cancelling.
+        yield AgentEvent(kind="tool_end", content="Restart initiated.", tool="restart_application")
+
+    run = runner.submit(run_events)
+    assert tool_running.wait(5)
+    run.cancel()
+    assert run.cancelled and not run.done
+
+    release.set()
+    run.future.result(timeout=5)
+    assert run.done
+    assert "Cancelled by user" in run.output() and "Restart initiated." in run.output()
+
+
+def test_output_is_the_final_answer_not_every_streamed_call():
+    run = AgentRun()
+    for event in [
+        AgentEvent(kind="llm_start"), AgentEvent(kind="token", content="Let me check the app..."),
+        AgentEvent(kind="tool_end", content="{}", tool="get_application_information"),
+        AgentEvent(kind="llm_start"), AgentEvent(kind="token", content="payments-api runs on po-r2."),
+    ]:
+        run.add_event(event)
+    assert run.streamed_text() == "payments-api runs on po-r2."
+
+    run.add_event(AgentEvent(kind="final", content="payments-api runs on po-r2 (org payments)."))
+    assert run.output() == "payments-api runs on po-r2 (org payments)."
+
+
+if __name__ == "__main__":
+    test_cancelled_run_stays_open_and_keeps_completed_tool_results()
+    test_output_is_the_final_answer_not_every_streamed_call()
@@ -0,0 +1,38 @@
+from backend.cf_entitlements import CfEntitlements, format_context, relevant_entries, search
+
+
+def _entitlements():
+    return CfEntitlements(
+        tasks=["RESTART", "START", "STOP", "HEALTH"],
+        group_sites={"payments": ["po-r2"], "billing": ["po-r2", "po-r3"], "search": ["po-r3"]},
+        group_apps={
+            "payments": ["payments-api", "payments-worker"],
+            "billing": ["invoice-service", "billing-ui"],
+            "search": ["search-indexer"],
+        },
+    )
+
+
+def test_only_relevant_groups_are_listed():
+    entitlements = _entitlements()
+
+    assert relevant_entries(entitlements, "restart invoice-service please") == {"billing": ["invoice-service"]}
+    assert relevant_entries(entitlements, "what runs in the payments group?") == {"payments": None}
+
+    context = format_context(entitlements, "check health of invoice-service at po-r3")
+    assert "billing | po-r2,po-r3 | invoice-service" in context
+    assert "payments-api" not in context and "search-indexer" not in context
+    assert "User groups (3): billing, payments, search" in context
+
+
+def test_search_covers_entries_left_out_of_the_context():
+    entitlements = _entitlements()
+
+    assert "search | po-r3 | search-indexer" in search(entitlements, "indexer")
+    assert search(entitlements, "po-r2").count("\n") == 2  # Header plus both groups on that site.
+    assert search(entitlements, "unknown-app").startswith("No groups")
+
+
+if __name__ == "__main__":
+    test_only_relevant_groups_are_listed()
+    test_search_covers_entries_left_out_of_the_context()
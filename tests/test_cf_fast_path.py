@@ -0,0 +1,77 @@
+import time
+import streamlit as st
+from dataclasses import asdict
+from agents.cf_fast_path import PENDING_COMMAND_KEY, CfCommand, CfFastPath, parse_cf_command
+
+
+def test_parse_fully_specified_commands():
+    command = parse_cf_command("restart application npp-chatops-e2e-service at cf site po-r2 for the group npp")
+    assert (command.action, command.application, command.cloud_foundry_site, command.group_name) == (
+        "restart", "npp-chatops-e2e-service", "po-r2", "npp"
+    )
+
+    command = parse_cf_command("Check health for application npp-api at cf site ch2-r1 for the group npp.")
+    assert (command.action, command.application, command.cloud_foundry_site) == ("health", "npp-api", "ch2-r1")
+
+    # Clause order doesn't matter.
+    command = parse_cf_command("stop app npp-api for group npp on site po-r2")
+    assert (command.action, command.cloud_foundry_site, command.group_name) == ("stop", "po-r2", "npp")
+
+
+def test_ambiguous_input_is_left_to_the_agent():
+    assert parse_cf_command("restart application npp-api") is None
+    assert parse_cf_command("restart application npp-api at cf site po-r2") is None
+    assert parse_cf_command("restart application npp-api at cf site po-r2 for the group npp and then stop it") is None
+    assert parse_cf_command("why did npp-api restart at cf site po-r2 for the group npp?") is None
+
+
+class _RecordingFastPath(CfFastPath):
+    """Resolves every command to a fixed org/space and records executions instead of calling CF."""
+
+    def __init__(self):
+        self.executed = []
+
+    def _resolve(self, command):
+        command.cf_organization, command.cf_space = "npp-org", "npp-space"
+        return command
+
+    def _execute(self, command):
+        self.executed.append(command.action)
+        return f"{command.action} done"
+
+
+def _pending_restart():
+    command = CfCommand("restart", "npp-api", "po-r2", "npp", "npp-org", "npp-space")
+    st.session_state[PENDING_COMMAND_KEY] = {"command": asdict(command), "created_at": time.time()}
+
+
+def test_new_command_replaces_a_pending_confirmation():
+    fast_path = _RecordingFastPath()
+    _pending_restart()
+
+    reply = fast_path.handle("stop application npp-api at cf site po-r2 for the group npp")
+
+    assert "**stop**" in reply and fast_path.executed == []
+    assert st.session_state[PENDING_COMMAND_KEY]["command"]["action"] == "stop"
+    assert fast_path.handle("yes") == "stop done" and fast_path.executed == ["stop"]
+
+
+def test_only_a_bare_yes_or_no_answers_a_pending_confirmation():
+    fast_path = _RecordingFastPath()
+    for reply in ("ok, but use po-r3", "sure, wait", "no wait, use the other group"):
+        _pending_restart()
+        assert fast_path.handle(reply) is None
+        assert PENDING_COMMAND_KEY not in st.session_state
+    assert fast_path.executed == []
+
+    _pending_restart()
+    assert fast_path.handle("No.") == "Okay, I will not restart npp-api."
+    _pending_restart()
+    assert fast_path.handle("  Go ahead! ") == "restart done"
+
+
+if __name__ == "__main__":
+    test_parse_fully_specified_commands()
+    test_ambiguous_input_is_left_to_the_agent()
+    test_new_command_replaces_a_pending_confirmation()
+    test_only_a_bare_yes_or_no_answers_a_pending_confirmation()
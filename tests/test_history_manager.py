@@ -0,0 +1,77 @@
+import streamlit as st
+from langchain_core.language_models import FakeListChatModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from agents.history_manager import ChatHistoryManager
+from backend.usage_tracker import USAGE_SESSION_KEY
+
+
+def _history(turns):
+    messages = []
+    for i in range(turns):
+        messages += [HumanMessage(content=f"question {i}"), AIMessage(content=f"answer {i}")]
+    return messages
+
+
+def test_history_is_windowed_and_summarized_in_background_batches():
+    st.session_state.pop("chat_history_test_summary", None)
+    st.session_state.pop(USAGE_SESSION_KEY, None)
+    llm = FakeListChatModel(responses=["first summary", "second summary"])
+    manager = ChatHistoryManager("chat_history_test", model_name="OpenAI gpt-4", llm=llm)
+
+    # The turn doesn't wait for the summary: aged-out turns are sent compacted until folded.
+    history = _history(6) + [HumanMessage(content="current")]
+    windowed = manager.prepare(history, user_input="current")
+    assert [m.content for m in windowed][:2] == ["question 0", "answer 0"]
+    manager.wait()
+    assert st.session_state["chat_history_test_summary"].folded == 6
+    assert sum(entry["llm_calls"] for entry in st.session_state[USAGE_SESSION_KEY].values()) == 1  # Recorded as its own turn.
+
+    windowed = manager.prepare(history, user_input="current")
+    assert isinstance(windowed[0], SystemMessage)
+    assert "first summary" in windowed[0].content
+    assert [m.content for m in windowed[1:]] == ["question 3", "answer 3", "question 4", "answer 4", "question 5", "answer 5"]
+
+    # One newly aged-out turn is not enough for a batch; the second one triggers the next fold.
+    history = history[:-1] + [HumanMessage(content="question 6"), AIMessage(content="answer 6"), HumanMessage(content="next")]
+    windowed = manager.prepare(history, user_input="next")
+    manager.wait()
+    assert "first summary" in windowed[0].content and windowed[1].content == "question 3"
+    assert st.session_state["chat_history_test_summary"].folded == 6
+
+    history = history[:-1] + [HumanMessage(content="question 7"), AIMessage(content="answer 7"), HumanMessage(content="last")]
+    manager.prepare(history, user_input="last")
+    manager.wait()
+    state = st.session_state["chat_history_test_summary"]
+    assert (state.summary, state.folded) == ("second summary", 10)
+
+
+def test_summary_survives_the_verbatim_window_growing_back():
+    st.session_state.pop("chat_history_test_summary", None)
+    manager = ChatHistoryManager("chat_history_test", model_name="OpenAI gpt-4",
+                                 llm=FakeListChatModel(responses=["summary"]))
+    history = _history(4) + [HumanMessage(content="big"), AIMessage(content="y " * 3000), HumanMessage(content="current")]
+    manager.prepare(history, user_input="current")  # The big turn shrinks the verbatim window to one turn.
+    manager.wait()
+    assert st.session_state["chat_history_test_summary"].folded == 8
+
+    history = _history(4) + [HumanMessage(content="big"), AIMessage(content="short now"), HumanMessage(content="current")]
+    windowed = manager.prepare(history, user_input="current")
+    assert "summary" in windowed[0].content
+    assert st.session_state["chat_history_test_summary"].folded == 8
+
+
+def test_long_messages_outside_latest_turn_are_truncated():
+    st.session_state.pop("chat_history_test_summary", None)
+    manager = ChatHistoryManager("chat_history_test", model_name="OpenAI gpt-4", llm=None)
+    history = [HumanMessage(content="q"), AIMessage(content="x" * 20000), HumanMessage(content="q2"), AIMessage(content="ok")]
+
+    windowed = manager.prepare(history)
+
+    assert "[truncated" in windowed[1].content
+    assert windowed[-1].content == "ok"
+
+
+if __name__ == "__main__":
+    test_history_is_windowed_and_summarized_in_background_batches()
+    test_summary_survives_the_verbatim_window_growing_back()
+    test_long_messages_outside_latest_turn_are_truncated()
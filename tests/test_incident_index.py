@@ -0,0 +1,62 @@
+from backend.incident_index import IncidentIndex, IncidentRecord, get_incident_index, tokenize
+from backend.ira_data_loader import parse_history_blocks
+
+
+def _record(n, error_code, model, success, feedback, created_at):
+    return IncidentRecord.from_raw({
+        "id": f"id-{n}", "incident_id": f"INC-{n}", "pattern_id": "offline" if n < 3 else "slow",
+        "success": success, "feedback": feedback, "created_at": created_at,
+        "resolution_metadata": {
+            "error_details": {"error_code": error_code, "error_message": "Failed to reset/reboot device"},
+            "device_info": {"model": model, "type": "Gateway"},
+        },
+    })
+
+
+def _index():
+    index = IncidentIndex()
+    index.add(_record(1, "FAH_RESET_201", "CGA4332COM", False, "Device remains offline after attempted reset", "2025-01-01"))
+    index.add(_record(2, "FAH_RESET_201", "XB7", True, "Came back online after a second reboot", "2025-02-01"))
+    index.add(_record(3, "WEBPA_5210", "CGA4332COM", False, "Slow WebPA responses, device not found", "2025-03-01"))
+    return index
+
+
+def test_bm25_ranks_the_most_relevant_incident_first():
+    results = _index().search("device still offline after reset", k=2)
+
+    assert [r.incident_id for r in results][0] == "INC-1"
+    assert "reset" in tokenize("FAH_RESET_201")
+
+
+def test_filters_narrow_the_candidates():
+    index = _index()
+
+    assert [r.incident_id for r in index.search("reset", error_code="fah_reset_201", success=True)] == ["INC-2"]
+    assert [r.incident_id for r in index.search(device_model="CGA4332COM")] == ["INC-3", "INC-1"]  # Newest first.
+    assert index.search("reset", pattern_id="slow", success=True) == []
+
+
+def test_adding_an_indexed_id_replaces_the_record():
+    index = _index()
+    index.add(_record(1, "FAH_RESET_201", "CGA4332COM", True, "Resolved by a factory reset", "2025-04-01"))
+
+    assert len(index) == 3
+    assert [r.feedback for r in index.search("offline", k=5)] == []
+    assert [r.incident_id for r in index.search("factory", success=True)] == ["INC-1"]
+
+
+def test_history_file_is_parsed_into_incidents_and_solutions():
+    blocks = parse_history_blocks("# Incidents:\n{\"data\": [{\"id\": \"a\"}]}\n\n# Incident Solution:\n​{\"data\": []}")
+    assert blocks == {"Incidents": [{"id": "a"}], "Incident Solution": []}
+
+    index = get_incident_index()
+    rendered = index.render(index.search(error_code="FAH_RESET_201"))
+    assert rendered[0]["incident_id"] == "INC-20241226-001"
+    assert rendered[0]["solution"]["name"] == "Gateway Reset and Reactivation"
+
+
+if __name__ == "__main__":
+    test_bm25_ranks_the_most_relevant_incident_first()
+    test_filters_narrow_the_candidates()
+    test_adding_an_indexed_id_replaces_the_record()
+    test_history_file_is_parsed_into_incidents_and_solutions()
@@ -0,0 +1,46 @@
+from backend.incident_metrics import IncidentMetrics
+from backend.ira_data_loader import IncidentRecord
+
+SOLUTIONS = {"sol-reset": {"id": "sol-reset", "name": "Gateway Reset"}}
+
+
+def _record(n, pattern_name, success, resolution_time, created_at, solution_id="sol-reset"):
+    return IncidentRecord(id=f"id-{n}", incident_id=f"INC-{n}", pattern_id=f"p-{pattern_name}", pattern_name=pattern_name,
+                          solution_id=solution_id, success=success, resolution_time=resolution_time, created_at=created_at)
+
+
+def _metrics():
+    return IncidentMetrics([
+        _record(1, "Device Offline", True, 10.0, "2025-01-05T10:00:00"),
+        _record(2, "Device Offline", False, 20.0, "2025-01-20T10:00:00"),
+        _record(3, "Device Offline", True, 30.0, "2025-02-03T10:00:00"),
+        _record(4, "Slow WebPA", None, None, "", solution_id="sol-unknown"),
+    ], SOLUTIONS)
+
+
+def test_filters_match_names_and_ids_and_aggregate_vectorized():
+    metrics = _metrics()
+
+    offline = metrics.select({"pattern": "device-offline"})
+    assert offline.tolist() == [0, 1, 2]
+    assert metrics.select({"pattern": "p-Slow WebPA"}).tolist() == [3]
+    assert metrics.select({"solution": "gateway reset"}, since="2025-01-10").tolist() == [1, 2]
+
+    stats = metrics.stats(offline, [50, 90])
+    assert stats["incidents"] == 3 and stats["resolved"] == 2
+    assert stats["success_rate"] == 0.667
+    assert (stats["resolution_time_p50"], stats["resolution_time_p90"]) == (20.0, 28.0)
+    assert metrics.stats(metrics.select({"pattern": "Slow WebPA"}), [50])["resolution_time_mean"] is None
+
+
+def test_groups_and_trends():
+    metrics = _metrics()
+    rows = metrics.select({})
+
+    assert [(label, group.size) for label, group in metrics.group(rows, "pattern")] == [("Device Offline", 3), ("Slow WebPA", 1)]
+    assert [(label, group.tolist()) for label, group in metrics.group(rows, "month")] == [("2025-01", [0, 1]), ("2025-02", [2])]
+
+
+if __name__ == "__main__":
+    test_filters_match_names_and_ids_and_aggregate_vectorized()
+    test_groups_and_trends()
@@ -0,0 +1,42 @@
+import tempfile
+from backend.incident_similarity import MinHashLsh, shingles
+from backend.ira_data_loader import IncidentRecord
+
+
+def _record(n, error_code, model, feedback):
+    return IncidentRecord.from_raw({
+        "id": f"id-{n}", "incident_id": f"INC-{n}", "feedback": feedback,
+        "resolution_metadata": {
+            "error_details": {"error_code": error_code, "error_message": "Failed to reset/reboot device"},
+            "device_info": {"model": model, "type": "Gateway"},
+        },
+    })
+
+
+_RECORDS = [
+    _record(1, "FAH_RESET_201", "CGA4332COM", "Device remains offline after attempted reset"),
+    _record(2, "WEBPA_5210", "XB7", "Slow WebPA responses while provisioning the gateway"),
+    _record(3, "TLS_CERT_EXPIRED", "XB8", "Certificate rotation fixed the handshake errors"),
+]
+
+
+def test_nearest_incident_is_found_and_the_index_survives_a_reload():
+    index_dir = tempfile.mkdtemp()
+    lsh = MinHashLsh(index_dir)
+    for record in _RECORDS:
+        assert lsh.insert(record)
+    assert not lsh.insert(_RECORDS[0])  # Unchanged: nothing to do.
+
+    probe = IncidentRecord(id="", incident_id="", error_code="FAH_RESET_201", device_model="CGA4332COM",
+                           feedback="device offline after reset")
+    (best, score), *_ = lsh.query(shingles(probe), k=2)
+    assert best == "id-1" and 0 < score <= 1
+
+    lsh.insert(_record(1, "FAH_RESET_201", "CGA4332COM", "Resolved after a factory reset"))
+    reloaded = MinHashLsh.load(index_dir)
+    assert len(reloaded) == 3
+    assert reloaded.query(shingles(probe), k=1) == lsh.query(shingles(probe), k=1)
+
+
+if __name__ == "__main__":
+    test_nearest_incident_is_found_and_the_index_survives_a_reload()
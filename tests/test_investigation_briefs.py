@@ -0,0 +1,43 @@
+import os
+import tempfile
+from benchmarks.scripted_chat_model import ScriptedChatModel
+from backend.investigation_briefs import brief_for, generate_briefs
+from core.config import settings
+
+
+def _investigation(incident_id, cause):
+    return {
+        "incident_details": {"id": incident_id, "platform": "Lifecycle Platform"},
+        "root_cause_analysis": {"primary_cause": cause, "confidence": 0.9, "evidence": ["log line"]},
+        "remediation": {"actions_taken": ["Escalated."], "status": "Pending resolution"},
+    }
+
+
+def _brief(incident_id):
+    return {"investigation_id": incident_id, "root_cause": f"LLM cause for {incident_id}", "confidence": "High",
+            "key_evidence": ["log line"], "remediation": ["Escalated."], "status": "Pending resolution"}
+
+
+def test_briefs_are_generated_in_batches_and_regenerated_only_on_change():
+    records = [_investigation(f"INC-{n}", f"Cause {n}") for n in range(3)]
+    # Every reply covers all ids; each batch keeps only its own.
+    step = {"tool_calls": [{"name": "BriefBatch", "args": {"briefs": [_brief(f"INC-{n}") for n in range(3)]}}]}
+    llm = ScriptedChatModel(script=[step])
+    original_file = settings.IRA_BRIEFS_FILE
+    settings.IRA_BRIEFS_FILE = os.path.join(tempfile.mkdtemp(), "briefs.json")
+    try:
+        assert brief_for(records[0]) == ({**_brief("INC-0"), "root_cause": "Cause 0", "confidence": "0.9"}, False)
+
+        assert generate_briefs(llm, records, batch_size=2, concurrency=2) == (3, 0)
+        assert llm.calls == 2
+        assert brief_for(records[1]) == (_brief("INC-1"), True)
+
+        records[2]["root_cause_analysis"]["primary_cause"] = "Revised cause"
+        assert generate_briefs(llm, records, batch_size=2, concurrency=2) == (1, 2)
+        assert llm.calls == 3
+    finally:
+        settings.IRA_BRIEFS_FILE = original_file
+
+
+if __name__ == "__main__":
+    test_briefs_are_generated_in_batches_and_regenerated_only_on_change()
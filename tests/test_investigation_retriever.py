@@ -0,0 +1,77 @@
+import tempfile
+import backend.investigation_retriever as investigation_retriever
+from backend.investigation_retriever import InvestigationRetriever, most_recent
+from backend.ira_data_loader import parse_investigations
+
+
+def _investigation(incident_id, cause, actions):
+    return {
+        "executive_summary": f"Activation failure for {incident_id}.",
+        "incident_details": {"id": incident_id, "platform": "Lifecycle Platform"},
+        "root_cause_analysis": {"primary_cause": cause, "confidence": "High"},
+        "remediation": {"actions_taken": actions},
+    }
+
+
+def test_query_returns_the_most_similar_sections():
+    retriever = InvestigationRetriever(index_dir=tempfile.mkdtemp())
+    retriever.sync([
+        _investigation("INC-1", "Device was not registered in WebPA.", ["Escalated to WebPA support."]),
+        _investigation("INC-2", "Expired TLS certificate on the config service.", ["Rotated the certificate."]),
+    ])
+
+    (section, score), = retriever.search("root cause certificate expired", k=1)
+
+    assert (section.investigation_id, section.section) == ("INC-2", "root_cause_analysis.primary_cause")
+    assert 0 < score <= 1
+
+
+def test_changes_are_applied_incrementally_and_persisted():
+    index_dir = tempfile.mkdtemp()
+    retriever = InvestigationRetriever(index_dir=index_dir)
+    original = _investigation("INC-1", "Device was not registered in WebPA.", ["Escalated."])
+    assert retriever.sync([original]) == (5, 0)
+
+    changed = dict(original, remediation={"actions_taken": ["Registered the device manually."]})
+    assert retriever.sync([changed]) == (1, 1)  # Only the remediation section is re-indexed.
+    retriever.save()
+
+    reloaded = InvestigationRetriever.load(index_dir)
+    assert reloaded.sync([changed]) == (0, 0)
+    (section, _), = reloaded.search("registered manually", k=1)
+    assert section.content == {"actions_taken": ["Registered the device manually."]}
+
+
+def test_ingested_investigations_are_persisted():
+    index_dir = tempfile.mkdtemp()
+    original = investigation_retriever._retriever
+    investigation_retriever._retriever = InvestigationRetriever(index_dir=index_dir)
+    try:
+        record = _investigation("INC-9", "Expired TLS certificate on the config service.", ["Rotated the certificate."])
+        investigation_retriever._apply_ingested("investigation", [record])
+
+        reloaded = InvestigationRetriever.load(index_dir)
+        assert reloaded.upsert([record]) == (0, 0)
+    finally:
+        investigation_retriever._retriever = original
+
+
+def test_zero_width_characters_are_stripped():
+    text = '{\u200b\n  "incident_details": {\u200b"id": "INC-1"}\u200b\n}\u200b\n\u200b\n'
+    assert parse_investigations(text) == [{"incident_details": {"id": "INC-1"}}]
+
+
+def test_most_recent_investigations_come_first():
+    records = [_investigation(f"INC-{n}", "cause", []) for n in range(3)]
+    for record, timestamp in zip(records, ["2024-12-26T13:42:03.579Z", "2025-01-02T08:00:00.000Z", None]):
+        record["incident_details"]["timestamp"] = timestamp
+
+    assert [r["incident_details"]["id"] for r in most_recent(records, 2)] == ["INC-1", "INC-0"]
+
+
+if __name__ == "__main__":
+    test_query_returns_the_most_similar_sections()
+    test_changes_are_applied_incrementally_and_persisted()
+    test_ingested_investigations_are_persisted()
+    test_zero_width_characters_are_stripped()
+    test_most_recent_investigations_come_first()
@@ -0,0 +1,47 @@
+import os
+import tempfile
+from backend.ira_data_loader import IraDataLoader, load_incident_history
+from core.config import settings
+
+_HISTORY = """# Incidents:
+{"data": [%s]}
+
+# Incident Solution:
+{"data": [{"id": "sol-1", "name": "Reset"}]}
+"""
+_INCIDENT = '{"id": "%s", "incident_id": "INC-%s", "solution_id": "sol-1"}'
+
+
+def test_files_are_parsed_once_and_reloaded_only_on_change():
+    path = os.path.join(tempfile.mkdtemp(), "history.txt")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(_HISTORY % _INCIDENT % ("1", "1"))
+    parses = []
+
+    def parse(text):
+        parses.append(text)
+        return load_incident_history(text)
+
+    loader = IraDataLoader()
+    loader.register("incidents", path, parse)
+    original_interval = settings.IRA_DATA_CHECK_INTERVAL_SECONDS
+    settings.IRA_DATA_CHECK_INTERVAL_SECONDS = 0.0
+    try:
+        history, version = loader.get_versioned("incidents")
+        assert [r.incident_id for r in history.incidents] == ["INC-1"]
+        assert list(history.solutions) == ["sol-1"]
+        assert loader.get_versioned("incidents") == (history, version)  # Unchanged file: no re-parse.
+        assert len(parses) == 1
+
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(_HISTORY % ", ".join([_INCIDENT % ("1", "1"), _INCIDENT % ("2", "2"), '{"id": "bad"}']))
+        history, new_version = loader.get_versioned("incidents")
+        assert new_version == version + 1
+        assert [r.incident_id for r in history.incidents] == ["INC-1", "INC-2"]  # Invalid record skipped.
+        assert len(parses) == 2
+    finally:
+        settings.IRA_DATA_CHECK_INTERVAL_SECONDS = original_interval
+
+
+if __name__ == "__main__":
+    test_files_are_parsed_once_and_reloaded_only_on_change()
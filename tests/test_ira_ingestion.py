@@ -0,0 +1,75 @@
+import json
+import os
+import tempfile
+from backend.ira_ingestion import IngestionPipeline
+
+
+def _incident(n, **fields):
+    return {"type": "incident", "record": {"id": f"id-{n}", "incident_id": f"INC-{n}", **fields}}
+
+
+def test_valid_records_are_journaled_and_pushed_to_subscribers():
+    pipeline = IngestionPipeline(tempfile.mkdtemp())
+    batches = []
+    pipeline.subscribe(lambda kind, records: batches.append((kind, [r["id"] for r in records])))
+
+    result = pipeline.ingest([
+        _incident(1, success=True),
+        {"type": "incident", "record": {"id": "id-2"}},  # No incident_id.
+        {"type": "solution", "record": {"id": "sol-1", "success_rate": "high"}},
+        {"type": "alert", "record": {}},
+    ])
+
+    assert result.accepted == 1
+    assert len(result.rejected) == 3
+    assert batches == [("incident", ["id-1"])]
+    assert [r["id"] for r in IngestionPipeline(pipeline.ingest_dir).records("incident")] == ["id-1"]  # Replayed from the journal.
+
+
+def test_inbox_files_resume_from_the_checkpoint():
+    ingest_dir = tempfile.mkdtemp()
+    os.makedirs(os.path.join(ingest_dir, "inbox"))
+    drop = os.path.join(ingest_dir, "inbox", "incidents.jsonl")
+    with open(drop, "w", encoding="utf-8") as f:
+        f.write(json.dumps(_incident(1)) + "\n" + json.dumps(_incident(2))[:20])  # Second line still being written.
+
+    assert IngestionPipeline(ingest_dir).poll_inbox(force=True).accepted == 1
+
+    with open(drop, "a", encoding="utf-8") as f:
+        f.write(json.dumps(_incident(2))[20:] + "\nnot json\n")
+    restarted = IngestionPipeline(ingest_dir)
+    result = restarted.poll_inbox(force=True)
+
+    assert result.accepted == 1 and len(result.rejected) == 1
+    assert [r["id"] for r in restarted.records("incident")] == ["id-1", "id-2"]
+    assert restarted.poll_inbox(force=True).accepted == 0  # Nothing new since the checkpoint.
+
+
+def test_failing_subscriber_does_not_block_others_or_reingest():
+    ingest_dir = tempfile.mkdtemp()
+    os.makedirs(os.path.join(ingest_dir, "inbox"))
+    with open(os.path.join(ingest_dir, "inbox", "incidents.jsonl"), "w", encoding="utf-8") as f:
+        f.write(json.dumps(_incident(1)) + "\n")
+    pipeline = IngestionPipeline(ingest_dir)
+    applied = []
+
+    def failing(kind, records):
+        raise RuntimeError("index unavailable")
+
+    pipeline.subscribe(failing)
+    pipeline.subscribe(lambda kind, records: applied.extend(r["id"] for r in records))
+
+    assert pipeline.poll_inbox(force=True).accepted == 1
+    assert applied == ["id-1"]
+
+    # Journaled but the checkpoint was lost (e.g. a crash before it was saved): not ingested twice.
+    os.remove(pipeline.checkpoint_path)
+    restarted = IngestionPipeline(ingest_dir)
+    assert restarted.poll_inbox(force=True).accepted == 0
+    assert [r["id"] for r in restarted.records("incident")] == ["id-1"]
+
+
+if __name__ == "__main__":
+    test_valid_records_are_journaled_and_pushed_to_subscribers()
+    test_inbox_files_resume_from_the_checkpoint()
+    test_failing_subscriber_does_not_block_others_or_reingest()
@@ -0,0 +1,32 @@
+import threading
+import time
+from core.config import settings
+from backend.llm_scheduler import LLMScheduler, LLMSchedulerBusy
+
+
+def test_background_requests_are_shed_while_interactive_ones_wait():
+    settings.LLM_MODEL_RATE_LIMITS["test-model"] = {"requests_per_minute": 60, "tokens_per_minute": 600}
+    try:
+        scheduler = LLMScheduler()
+
+        scheduler.acquire("test-model", "agent", 600)  # Drains the token bucket (refills 10 tokens/s).
+        waiter = threading.Thread(target=scheduler.acquire, args=("test-model", "agent", 5))
+        waiter.start()
+        time.sleep(0.05)
+
+        try:
+            scheduler.acquire("test-model", "suggestion", 5)
+            assert False, "suggestion should have been shed"
+        except LLMSchedulerBusy:
+            pass
+        waiter.join(timeout=5)
+
+        (metrics,) = scheduler.metrics()
+        assert metrics["granted"] == 2 and metrics["shed"] == 1
+        assert metrics["queue_depth"] == 0 and metrics["p95_wait_seconds"] > 0
+    finally:
+        settings.LLM_MODEL_RATE_LIMITS.pop("test-model", None)
+
+
+if __name__ == "__main__":
+    test_background_requests_are_shed_while_interactive_ones_wait()
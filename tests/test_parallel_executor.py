@@ -0,0 +1,61 @@
+import time
+from langchain.agents import BaseMultiActionAgent
+from langchain_core.agents import AgentAction, AgentFinish
+from langchain_core.exceptions import OutputParserException
+from langchain_core.tools import StructuredTool
+from agents.parallel_executor import ParallelAgentExecutor
+
+
+class _TwoLookupsAgent(BaseMultiActionAgent):
+    """Asks for two lookups in one step, then answers with their observations."""
+
+    @property
+    def input_keys(self):
+        return ["input"]
+
+    def plan(self, intermediate_steps, callbacks=None, **kwargs):
+        if intermediate_steps:
+            return AgentFinish({"output": " | ".join(str(observation) for _, observation in intermediate_steps)}, "")
+        return [AgentAction("lookup", {"name": "first"}, ""), AgentAction("lookup", {"name": "second"}, "")]
+
+    async def aplan(self, intermediate_steps, callbacks=None, **kwargs):
+        return self.plan(intermediate_steps, callbacks, **kwargs)
+
+
+class _UnparsableAgent(_TwoLookupsAgent):
+    def plan(self, intermediate_steps, callbacks=None, **kwargs):
+        raise OutputParserException("not a tool call")
+
+
+def _lookup(name: str) -> str:
+    time.sleep(0.3 if name == "first" else 0.1)
+    return f"{name} done"
+
+
+def _executor(agent, **kwargs):
+    return ParallelAgentExecutor(agent=agent, tools=[StructuredTool.from_function(_lookup, name="lookup", description="Looks up a name.")], **kwargs)
+
+
+def test_tool_calls_of_one_step_run_concurrently_in_order():
+    started = time.perf_counter()
+    result = _executor(_TwoLookupsAgent()).invoke({"input": "go"})
+
+    assert result["output"] == "first done | second done"
+    assert time.perf_counter() - started < 0.38  # Sequential calls would take 0.4s.
+
+
+def test_parsing_errors_follow_upstream_handling():
+    # Upstream raises ValueError when handle_parsing_errors is False; a diverging copy would not.
+    try:
+        _executor(_UnparsableAgent(), handle_parsing_errors=False).invoke({"input": "go"})
+        assert False, "expected the parsing error to be raised"
+    except ValueError as e:
+        assert "output parsing error" in str(e)
+
+    result = _executor(_UnparsableAgent(), handle_parsing_errors="Reply with a tool call.", max_iterations=1).invoke({"input": "go"})
+    assert "stopped" in result["output"].lower()
+
+
+if __name__ == "__main__":
+    test_tool_calls_of_one_step_run_concurrently_in_order()
+    test_parsing_errors_follow_upstream_handling()
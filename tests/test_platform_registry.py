@@ -0,0 +1,36 @@
+from backend.platform_registry import Platform, PlatformRegistry, select_sections, split_sections
+
+_DOCUMENT = """The platform activates gateways.
+
+Lifecycle Management:
+
+- Handles account and device lifecycle transitions.
+
+Integration:
+
+- Integrated with ELK for logging.
+"""
+
+
+def test_names_aliases_and_services_resolve_to_the_platform():
+    mpa = Platform(id="mpa", name="MPA Lifecycle Platform", document="unused", aliases=["MPA", "Lifecycle Platform"],
+                   services=["gw-act-events-lifecycle"])
+    registry = PlatformRegistry([mpa])
+
+    assert registry.resolve("mpa") is mpa
+    assert registry.resolve("GW-ACT-EVENTS-LIFECYCLE") is mpa
+    assert registry.resolve("the lifecycle platform logs") is mpa
+    assert registry.resolve("webpa") is None
+
+
+def test_only_relevant_sections_are_selected():
+    sections = split_sections(_DOCUMENT)
+
+    assert list(sections) == ["Overview", "Lifecycle Management", "Integration"]
+    assert select_sections(sections, "where do the logs go? ELK logging", limit=2) == ["Integration"]
+    assert select_sections(sections, "unrelated", limit=2) == []
+
+
+if __name__ == "__main__":
+    test_names_aliases_and_services_resolve_to_the_platform()
+    test_only_relevant_sections_are_selected()
@@ -0,0 +1,51 @@
+from langchain_core.messages import AIMessage, HumanMessage
+from agents.suggestion_engine import build_suggestions, history_fingerprint
+from backend.cf_entitlements import CfEntitlements
+
+ENTITLEMENTS = CfEntitlements(
+    tasks=["RESTART", "HEALTH"],
+    group_sites={"billing": ["po-r2", "po-r3"], "payments": ["po-r2"]},
+    group_apps={"billing": ["invoice-service"], "payments": ["payments-api", "payments-worker"]},
+)
+
+
+def test_cf_suggestions_follow_the_last_command_then_recent_apps():
+    history = [
+        HumanMessage(content="is payments-worker ok?"),
+        AIMessage(content="It is running."),
+        HumanMessage(content="restart application payments-api at cf site po-r2 for the group payments"),
+        AIMessage(content="payments-api restarted."),
+    ]
+
+    suggestions = build_suggestions("CF", history, n=5, entitlements=ENTITLEMENTS)
+
+    assert suggestions == [
+        "What tools are available?",
+        "check health for application payments-api at cf site po-r2 for the group payments",
+        "get info for app payments-api",
+        "check health for application payments-worker at cf site po-r2 for the group payments",
+        "get info for app payments-worker",
+    ]
+
+
+def test_new_users_get_suggestions_from_their_entitlements():
+    suggestions = build_suggestions("CF", [], n=3, entitlements=ENTITLEMENTS)
+
+    assert suggestions == [
+        "What tools are available?",
+        "check health for application invoice-service at cf site po-r2 for the group billing",
+        "get info for app invoice-service",
+    ]
+
+
+def test_fingerprint_changes_only_with_recent_history():
+    history = [HumanMessage(content="hi"), AIMessage(content="hello")]
+
+    assert history_fingerprint(history) == history_fingerprint(list(history))
+    assert history_fingerprint(history) != history_fingerprint(history + [HumanMessage(content="more")])
+
+
+if __name__ == "__main__":
+    test_cf_suggestions_follow_the_last_command_then_recent_apps()
+    test_new_users_get_suggestions_from_their_entitlements()
+    test_fingerprint_changes_only_with_recent_history()
@@ -0,0 +1,74 @@
+from concurrent.futures import wait
+import streamlit as st
+from langchain_core.messages import HumanMessage
+from benchmarks.scripted_chat_model import ScriptedChatModel
+from agents.suggestion_engine import refined_suggestions
+from agents.suggestion_refresher import (
+    cancel_suggestion_refresh,
+    collect_suggestions,
+    start_suggestion_refresh,
+    suggestion_refresh_pending,
+)
+
+BATCH = {"tool_calls": [{"name": "SuggestionBatch", "args": {"contexts": [
+    {"context": "CF", "suggestions": ["What tools are available?", "Check health of payments-api"]},
+    {"context": "IRA", "suggestions": ["Show recent incidents"]},
+]}}]}
+
+
+def _session():
+    for key in list(st.session_state.keys()):
+        del st.session_state[key]
+    st.session_state.ui_context = "CF"
+    st.session_state.suggested_prompts = ["old suggestion"]
+
+
+def test_one_background_call_refines_every_context():
+    _session()
+    llm = ScriptedChatModel(latency_seconds=0.05, script=[BATCH])
+
+    job = start_suggestion_refresh(llm)
+    assert suggestion_refresh_pending() and not collect_suggestions()  # Returns immediately; nothing to show yet.
+
+    job.future.result(timeout=5)
+    assert collect_suggestions()
+    assert st.session_state.suggested_prompts == ["What tools are available?", "Check health of payments-api"]
+    assert llm.calls == 1
+    assert refined_suggestions("IRA") == ["Show recent incidents"]
+
+    # Only the context whose history changed loses its refined suggestions.
+    st.session_state.chat_history_ira = [HumanMessage(content="database timeouts?")]
+    assert refined_suggestions("IRA") is None
+    assert refined_suggestions("CF") is not None
+
+
+def test_new_turn_drops_the_stale_generation():
+    _session()
+    llm = ScriptedChatModel(latency_seconds=0.05, script=[BATCH])
+
+    job = start_suggestion_refresh(llm)
+    cancel_suggestion_refresh()
+    assert job.cancel_event.is_set()
+    wait([job.future], timeout=5)
+
+    assert not collect_suggestions()
+    assert st.session_state.suggested_prompts == ["old suggestion"]
+
+
+def test_contexts_left_out_are_not_stored_as_refined():
+    _session()
+    llm = ScriptedChatModel(latency_seconds=0.01, script=[{"tool_calls": [{"name": "SuggestionBatch", "args": {"contexts": [
+        {"context": "CF", "suggestions": ["What tools are available?"]},
+    ]}}]}])
+
+    start_suggestion_refresh(llm).future.result(timeout=5)
+    assert collect_suggestions()
+
+    assert refined_suggestions("CF") == ["What tools are available?"]
+    assert refined_suggestions("IRA") is None  # Retried by the next refresh.
+
+
+if __name__ == "__main__":
+    test_one_background_call_refines_every_context()
+    test_new_turn_drops_the_stale_generation()
+    test_contexts_left_out_are_not_stored_as_refined()
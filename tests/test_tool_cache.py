@@ -0,0 +1,41 @@
+import streamlit as st
+from agents.tools import cloud_foundry_tools
+from agents.tools.cloud_foundry_tools import CloudFoundryTools
+from agents.tools.tool_cache import TOOL_CACHE_SESSION_KEY, get_tool_cache, memoized_tool
+
+
+def test_backend_errors_are_not_cached():
+    st.session_state.pop(TOOL_CACHE_SESSION_KEY, None)
+    lookup = memoized_tool("get_application_information", CloudFoundryTools.get_application_information)
+    original = cloud_foundry_tools.get_cloud_foundry_app_info
+    try:
+        cloud_foundry_tools.get_cloud_foundry_app_info = lambda application: "Unexpected Error: connection refused"
+        assert lookup(application="payments-api").startswith("Error:")
+        assert get_tool_cache().get("get_application_information", {"application": "payments-api"}) is None
+
+        cloud_foundry_tools.get_cloud_foundry_app_info = lambda application: "[]"
+        assert lookup(application="payments-api") == "Context Retrieved: []"
+        assert lookup(application="payments-api").startswith("[Cached result")
+    finally:
+        cloud_foundry_tools.get_cloud_foundry_app_info = original
+        st.session_state.pop(TOOL_CACHE_SESSION_KEY, None)
+
+
+def test_results_are_not_served_across_revisions():
+    st.session_state.pop(TOOL_CACHE_SESSION_KEY, None)
+    revision, calls = [1], []
+    lookup = memoized_tool("get_incident_history", lambda **kwargs: calls.append(kwargs) or f"{len(calls)} incidents",
+                           revision=lambda: revision[0])
+    try:
+        assert lookup(query="reset") == "1 incidents"
+        assert lookup(query="reset").endswith("1 incidents") and len(calls) == 1
+
+        revision[0] = 2  # New records were ingested.
+        assert lookup(query="reset") == "2 incidents"
+    finally:
+        st.session_state.pop(TOOL_CACHE_SESSION_KEY, None)
+
+
+if __name__ == "__main__":
+    test_backend_errors_are_not_cached()
+    test_results_are_not_served_across_revisions()
@@ -0,0 +1,66 @@
+import json
+import streamlit as st
+from agents import tool_prefetch
+from agents.tool_prefetch import CfToolPrefetcher, ToolPrefetch
+from agents.tools.tool_cache import TOOL_CACHE_SESSION_KEY, get_tool_cache
+from backend.cf_entitlements import CfEntitlements
+
+ENTITLEMENTS = CfEntitlements(
+    tasks=["HEALTH"],
+    group_sites={"payments": ["po-r2"], "billing": ["po-r2", "po-r3"]},
+    group_apps={"payments": ["payments-api"], "billing": ["invoice-service"]},
+)
+
+
+def _app_info(app, group, sites):
+    return json.dumps([{
+        "APPLICATION": app, "GROUP_NAME": group,
+        "DETAILS": [{"CF_SITE": site, "CF_ORGANIZATION": "org", "CF_SPACE": "prod"} for site in sites],
+    }])
+
+
+def test_prefetched_result_is_taken_once_with_normalized_args():
+    prefetch = ToolPrefetch()
+    prefetch.expect("get_application_information", {"application": "payments-api"}).set_result("info")
+
+    assert prefetch.take("get_application_information", {"application": " Payments-API"}) == "info"
+    assert prefetch.take("get_application_information", {"application": "payments-api"}) is None
+
+
+def test_health_is_prefetched_only_for_a_single_deployment():
+    single = CfToolPrefetcher._health_target("payments-api", _app_info("payments-api", "payments", ["po-r2"]), ENTITLEMENTS, "is payments-api up?")
+    assert single == {"application": "payments-api", "group_name": "payments", "cloud_foundry_site": "po-r2",
+                      "cf_organization": "org", "cf_space": "prod"}
+
+    info = _app_info("invoice-service", "billing", ["po-r2", "po-r3"])
+    assert CfToolPrefetcher._health_target("invoice-service", info, ENTITLEMENTS, "is invoice-service up?") is None
+    narrowed = CfToolPrefetcher._health_target("invoice-service", info, ENTITLEMENTS, "is invoice-service up on po-r3?")
+    assert narrowed["cloud_foundry_site"] == "po-r3"
+
+
+def test_nothing_is_registered_after_discard():
+    prefetch = ToolPrefetch()
+    prefetch.discard()
+    prefetch.expect("check_application_health", {"application": "payments-api"}).set_result("late")
+
+    assert prefetch.take("check_application_health", {"application": "payments-api"}) is None
+
+
+def test_cached_app_info_is_not_fetched_again():
+    st.session_state.pop(TOOL_CACHE_SESSION_KEY, None)
+    get_tool_cache().put("get_application_information", {"application": "payments-api"}, "Context Retrieved: []")
+    original = tool_prefetch.get_cf_entitlements
+    try:
+        tool_prefetch.get_cf_entitlements = lambda: ENTITLEMENTS
+        prefetch = CfToolPrefetcher().start("what org is payments-api in?")
+        assert prefetch.take("get_application_information", {"application": "payments-api"}) is None
+    finally:
+        tool_prefetch.get_cf_entitlements = original
+        st.session_state.pop(TOOL_CACHE_SESSION_KEY, None)
+
+
+if __name__ == "__main__":
+    test_prefetched_result_is_taken_once_with_normalized_args()
+    test_health_is_prefetched_only_for_a_single_deployment()
+    test_nothing_is_registered_after_discard()
+    test_cached_app_info_is_not_fetched_again()
@@ -0,0 +1,25 @@
+from langchain_core.language_models import FakeListChatModel
+from langchain_core.output_parsers import StrOutputParser
+from backend.usage_tracker import UsageCallbackHandler, record_turn, get_session_usage
+
+
+def test_turn_usage_is_recorded_and_rolled_up():
+    session_state = {}
+    llm = FakeListChatModel(responses=["first answer", "second answer"])
+
+    for _ in range(2):
+        usage = UsageCallbackHandler(component="direct", context="DIRECT", model="fake-model")
+        (llm | StrOutputParser()).invoke("hello there", config={"callbacks": [usage]})
+        summary = record_turn(usage.turn, session_state=session_state)
+
+    assert summary["iterations"] == 1
+    assert summary["prompt_tokens"] > 0 and summary["completion_tokens"] > 0
+    assert summary["tokens_estimated"]  # The fake model reports no usage metadata.
+
+    (entry,) = get_session_usage(session_state)
+    assert entry["context"] == "DIRECT"
+    assert entry["turns"] == 2 and entry["llm_calls"] == 2
+
+
+if __name__ == "__main__":
+    test_turn_usage_is_recorded_and_rolled_up()